@@ -0,0 +1,20 @@
+"""Small timing helpers shared by the benchmark scripts."""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import timeit
+from typing import Callable
+
+
+def best_of(fn: Callable[[], object], *, repeat: int = 5, number: int = 1) -> float:
+    """Return the best per-call time in seconds over `repeat` runs of `number` calls."""
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def report(label: str, seconds: float, *, baseline: float | None = None) -> None:
+    line = f"{label:<48} {seconds * 1000:10.2f} ms"
+    if baseline is not None and seconds > 0:
+        line += f"  ({baseline / seconds:5.2f}x)"
+    print(line)
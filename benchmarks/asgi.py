@@ -0,0 +1,51 @@
+"""
+Benchmark: sending a page through `ASGIResponse` with per-token messages vs coalesced chunks.
+
+Every `send()` is one server write (and, on a real server, one flow-control wait), so the cost
+per message matters as much as rendering. Run with `python -m benchmarks.asgi`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, MutableMapping
+
+from zen_html import ASGIResponse, H
+
+from ._timing import best_of, report
+from .minify import list_page
+
+
+def serve(node: H, chunk_size: int) -> int:
+    """Run one request in-process; return the number of body messages sent."""
+    messages = 0
+
+    async def receive() -> MutableMapping[str, Any]:
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: MutableMapping[str, Any]) -> None:
+        nonlocal messages
+        if message["type"] == "http.response.body":
+            messages += 1
+        await asyncio.sleep(0)  # a server yields to the loop while the socket drains
+
+    scope = {"type": "http", "method": "GET", "headers": []}
+    asyncio.run(ASGIResponse(node, chunk_size=chunk_size)(scope, receive, send))
+    return messages
+
+
+def main() -> None:
+    node = list_page()
+    print(f"list page: {len(node.html_.encode()):,} bytes")
+    base = best_of(lambda: serve(node, 1), repeat=3)
+    report(f"chunk_size=1, per token ({serve(node, 1):,} messages)", base)
+    for size in (4 * 1024, 16 * 1024, 64 * 1024):
+        seconds = best_of(lambda: serve(node, size), repeat=3)
+        report(f"chunk_size={size // 1024} KiB ({serve(node, size):,} messages)", seconds, baseline=base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: shared style and class values given as dicts and lists against `Style`/`ClassList`.
+
+Builds and renders 10,000 list items that all use the same `style` and `class` attributes,
+once with a dict and a list per node and once with precomputed values, and times the cached
+merges. Run with `python -m benchmarks.attrs`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import ClassList, H, Style
+
+from ._timing import best_of, report
+
+ITEMS = 10_000
+
+STYLE = {
+    "color": "#333",
+    "fontSize": "14px",
+    "lineHeight": 1.5,
+    "marginBottom": "4px",
+    "fontFamily": '"Noto Sans"',
+}
+CLASSES = ["item", "card", "card-compact", "shadow-sm"]
+PRECOMPUTED_STYLE = Style(STYLE)
+PRECOMPUTED_CLASSES = ClassList(CLASSES)
+
+
+def build_dicts() -> H:
+    return H.ul(H.li(f"item {i}", style=STYLE, class_=CLASSES) for i in range(ITEMS))
+
+
+def build_precomputed() -> H:
+    return H.ul(H.li(f"item {i}", style=PRECOMPUTED_STYLE, class_=PRECOMPUTED_CLASSES) for i in range(ITEMS))
+
+
+def main() -> None:
+    dicts = best_of(build_dicts)
+    report("build, dict and list", dicts)
+    report("build, Style and ClassList", best_of(build_precomputed), baseline=dicts)
+
+    plain, precomputed = build_dicts(), build_precomputed()
+    rendered = best_of(lambda: plain.html_)
+    report("render, dict and list", rendered)
+    report("render, Style and ClassList", best_of(lambda: precomputed.html_), baseline=rendered)
+
+    def merges() -> None:
+        for _ in range(ITEMS):
+            PRECOMPUTED_CLASSES | "active"
+            PRECOMPUTED_STYLE | PRECOMPUTED_STYLE
+
+    report("10,000 cached ClassList and Style merges", best_of(merges))
+
+
+if __name__ == "__main__":
+    main()
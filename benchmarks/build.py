@@ -0,0 +1,87 @@
+"""
+Benchmark: static site generation of a product catalog, with a plain loop writing `html_`
+to each file vs `build_site` in one process, across a process pool, and rebuilding without
+changes (every page skipped by the manifest).
+
+Run with `python -m benchmarks.build`. The pool only helps on a machine with several cores.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from zen_html import H, build_site, page
+
+from ._timing import report
+
+PAGES = 2000
+
+
+def products() -> list[dict[str, object]]:
+    return [
+        {"sku": f"sku-{i:05d}", "price": 100 + i % 900, "specs": [f"spec {j}" for j in range(40)]}
+        for i in range(PAGES)
+    ]
+
+
+@page("products/{sku}.html", params=products)
+def product_page(sku: str, price: int, specs: list[str]) -> H:
+    return H.html(
+        H.head(H.meta(charset="utf-8"), H.title(sku)),
+        H.body(
+            H.h1(sku),
+            H.p(f"{price} JPY", class_="price"),
+            H.table(H.tbody(H.tr(H.th(spec), H.td(f"value {n}")) for n, spec in enumerate(specs))),
+        ),
+        lang="en",
+    )
+
+
+def plain_loop(out: Path) -> None:
+    for kwargs in products():
+        path = out / "products" / f"{kwargs['sku']}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("<!DOCTYPE html>" + product_page(**kwargs).html_)
+
+
+def timed(fn: Callable[..., object], *args: object, **kwargs: object) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    jobs = os.cpu_count() or 1
+    root = Path(tempfile.mkdtemp())
+    try:
+        print(f"{PAGES} catalog pages, {jobs} CPU(s)")
+        baseline = timed(plain_loop, root / "loop")
+        report("loop writing html_", baseline)
+        report(
+            "build_site, jobs=1",
+            timed(build_site, ["benchmarks.build"], root / "serial", jobs=1),
+            baseline=baseline,
+        )
+        report(
+            f"build_site, jobs={jobs}",
+            timed(build_site, ["benchmarks.build"], root / "pool", jobs=jobs),
+            baseline=baseline,
+        )
+        report(
+            "build_site again, nothing changed",
+            timed(build_site, ["benchmarks.build"], root / "pool", jobs=jobs),
+            baseline=baseline,
+        )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: streaming compression with different flush policies, and the cost of static page
+chrome (header, footer) with and without `H.static`.
+
+Run with `python -m benchmarks.compress`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Callable, Iterator
+
+from zen_html import H, compress_tokens
+from zen_html._base import _HBase
+
+from ._timing import best_of, report
+from .minify import list_page, table_page
+
+
+def per_token(node: H) -> Iterator[bytes]:
+    """What per-message middleware does: one sync-flushed block per `to_token()` token."""
+    deflate = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for token in node.to_token():
+        yield deflate.compress(token.encode()) + deflate.flush(zlib.Z_SYNC_FLUSH)
+    yield deflate.flush()
+
+
+def buffered(node: H) -> Iterator[bytes]:
+    """Render everything, then compress once (no streaming)."""
+    yield gzip.compress(node.html_.encode(), 6)
+
+
+def site_chrome() -> tuple[H, H]:
+    """A mega-menu header and a sitemap footer, identical on every page."""
+    header = H.header(
+        H.nav(
+            H.ul(
+                H.li(
+                    H.a(f"Category {i}", href=f"/c/{i}"),
+                    H.ul(H.li(H.a(f"Item {i}.{j}", href=f"/c/{i}/{j}")) for j in range(12)),
+                )
+                for i in range(30)
+            ),
+            class_="mega-menu",
+        )
+    )
+    footer = H.footer(
+        H.ul(H.li(H.a(f"Page {i}", href=f"/sitemap/{i}")) for i in range(150)), H.p("(c) 2025 Example")
+    )
+    return header, footer
+
+
+def shell_page(header: _HBase, footer: _HBase, request: int) -> H:
+    return H.html(
+        H.head(H.meta(charset="utf-8"), H.title(f"Result {request}")),
+        H.body(header, H.main(H.p(f"Result {request}.{i}") for i in range(20)), footer),
+    )
+
+
+def static_chrome() -> None:
+    header, footer = site_chrome()
+    static_header, static_footer = H.static(header), H.static(footer)
+    plain = shell_page(header, footer, 1)
+    static = shell_page(static_header, static_footer, 1)
+    assert gzip.decompress(b"".join(compress_tokens(static.to_token()))) == plain.html_.encode()
+    size = len(plain.html_.encode())
+    print(f"\nshell page (static chrome, small dynamic body): {size:,} bytes uncompressed")
+    base = best_of(lambda: b"".join(compress_tokens(shell_page(header, footer, 2).to_token())), repeat=20)
+    report("  plain nodes, compress_tokens", base)
+    spliced = best_of(
+        lambda: b"".join(compress_tokens(shell_page(static_header, static_footer, 2).to_token())), repeat=20
+    )
+    report("  H.static chrome, compress_tokens", spliced, baseline=base)
+    for label, node in (("plain", plain), ("H.static", static)):
+        print(f"  {label:<10} compressed to {len(b''.join(compress_tokens(node.to_token()))):,} bytes")
+
+
+def main() -> None:
+    policies: dict[str, Callable[[H], Iterator[bytes]]] = {
+        "buffer all + gzip.compress": buffered,
+        "per-token sync flush (middleware)": per_token,
+        "compress_tokens, head + end only": lambda n: compress_tokens(n.to_token(), flush_bytes=None),
+        "compress_tokens, head + every 16 KiB": lambda n: compress_tokens(
+            n.to_token(), flush_bytes=16 * 1024
+        ),
+        "compress_tokens, head + every 64 KiB": lambda n: compress_tokens(n.to_token()),
+    }
+    for name, build in {"list page": list_page, "table page": table_page}.items():
+        node = build()
+        size = len(node.html_.encode())
+        print(f"\n{name}: {size:,} bytes uncompressed")
+        print(f"  {'policy':<40} {'time':>9} {'MB/s':>7} {'bytes':>9} {'ratio':>6} {'chunks':>7}")
+        for label, policy in policies.items():
+            chunks = list(policy(node))
+            assert gzip.decompress(b"".join(chunks)) == node.html_.encode()
+            seconds = best_of(lambda: list(policy(node)), repeat=3)
+            out = sum(map(len, chunks))
+            print(
+                f"  {label:<40} {seconds * 1000:7.2f}ms {size / seconds / 1e6:7.1f} {out:>9,}"
+                f" {size / out:6.1f} {len(chunks):>7,}"
+            )
+    static_chrome()
+
+
+if __name__ == "__main__":
+    main()
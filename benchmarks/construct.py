@@ -0,0 +1,54 @@
+"""
+Benchmark: node construction with flat, nested and generator-heavy children.
+
+Children are built once; each case times only the parent's construction (child flattening and
+validation), and `_flatten_children` on its own. Run with `python -m benchmarks.construct`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from zen_html import H
+from zen_html._base import _HBase
+
+from ._timing import best_of, report
+
+ITEMS = 10_000
+
+LEAVES = [H.li(f"item {i}") for i in range(ITEMS)]
+TEXT = [f"text {i} " for i in range(ITEMS)]
+MIXED = [x for i in range(ITEMS // 2) for x in (f"text {i}", H.RAW_STR("<br/>"))]
+# Lists of 10 nodes; NESTED holds 100 tuples of 10 of them.
+GROUPS = [[LEAVES[g * 10 + i] for i in range(10)] for g in range(ITEMS // 10)]
+NESTED = [tuple(GROUPS[r * 10 + c] for c in range(10)) for r in range(ITEMS // 100)]
+FRAGMENTS = [H.fragment(group) for group in GROUPS]
+
+
+def cases() -> dict[str, Callable[[], Any]]:
+    # Nesting deeper than `Children` describes is accepted at runtime, hence `Any`.
+    return {
+        "flat list of nodes": lambda: LEAVES,
+        "flat list of text": lambda: TEXT,
+        "text and raw()": lambda: MIXED,
+        "nested lists and tuples": lambda: NESTED,
+        "fragments": lambda: FRAGMENTS,
+        "generator of nodes": lambda: (leaf for leaf in LEAVES),
+        "nested generators": lambda: ((leaf for leaf in group) for group in GROUPS),
+        "map()": lambda: map(str, range(ITEMS)),
+    }
+
+
+def main() -> None:
+    print(f"{ITEMS} children per parent")
+    for label, make in cases().items():
+        report(f"H.ul({label})", best_of(lambda: H.ul(make()), repeat=7))
+        report(
+            f"  flatten only ({label})", best_of(lambda: tuple(_HBase._flatten_children((make(),))), repeat=7)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: when the main content of a page reaches the client if the page also has slow
+widgets, with the widgets awaited before rendering vs deferred with `H.deferred`.
+
+The harness drives `ASGIResponse` in-process and timestamps every `send()`. The widgets' data
+sources are `asyncio.sleep` calls of different lengths. Run with `python -m benchmarks.deferred`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from zen_html import ASGIResponse, H, astream_tokens
+
+WIDGET_SECONDS = (0.03, 0.08, 0.15)
+
+App = Callable[[MutableMapping[str, Any], Any, Any], Awaitable[None]]
+
+
+async def widget(seconds: float) -> H:
+    await asyncio.sleep(seconds)
+    return H.aside(H.h2(f"{seconds * 1000:.0f} ms widget"), H.ul(H.li(f"entry {i}") for i in range(20)))
+
+
+def page(widgets: list[Any]) -> H:
+    main = H.main(H.h1("Article"), (H.p(f"paragraph {i} " * 10) for i in range(200)))
+    return H.html(H.head(H.title("Article")), H.body(main, *widgets), lang="en")
+
+
+async def awaited(scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+    """Load every widget (concurrently) before rendering anything."""
+    widgets = await asyncio.gather(*(widget(seconds) for seconds in WIDGET_SECONDS))
+    await ASGIResponse(page(list(widgets)), include_doctype=True)(scope, receive, send)
+
+
+async def deferred(scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+    slots = [
+        H.deferred(partial(widget, seconds), fallback="loading", tag="aside") for seconds in WIDGET_SECONDS
+    ]
+    await ASGIResponse(astream_tokens(page(slots)), include_doctype=True)(scope, receive, send)
+
+
+def measure(app: App) -> tuple[float, float]:
+    """Return (time until the main content was sent, time to last byte) in seconds."""
+    stamps: list[tuple[float, bytes]] = []
+
+    async def main() -> None:
+        async def receive() -> MutableMapping[str, Any]:
+            await asyncio.Event().wait()
+            return {}
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.body" and message.get("body"):
+                stamps.append((time.perf_counter() - start, message["body"]))
+
+        start = time.perf_counter()
+        await app({"type": "http", "method": "GET", "headers": []}, receive, send)
+
+    asyncio.run(main())
+    sent = b""
+    for stamp, body in stamps:
+        sent += body
+        if b"</main>" in sent:
+            return stamp, stamps[-1][0]
+    raise AssertionError("the main content was never sent")
+
+
+def main() -> None:
+    widgets = ", ".join(f"{seconds * 1000:.0f}" for seconds in WIDGET_SECONDS)
+    print(f"widget latencies {widgets} ms; median of 10 requests")
+    for label, app in (("widgets awaited first", awaited), ("H.deferred + astream_tokens", deferred)):
+        samples = [measure(app) for _ in range(10)]
+        content = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        print(f"  {label:<28} main content {content * 1000:7.2f} ms   last byte {total * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: diffing 10k-node trees with a single changed cell versus re-rendering them.
+
+Run with `python -m benchmarks.diff`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import H, diff
+
+from ._timing import best_of, report
+
+ROWS = 1000
+COLS = 9
+
+
+def build(changed: int | None = None) -> H:
+    return H.table(
+        H.tbody(
+            H.tr(
+                *(H.td("changed" if (r, c) == (changed, 0) else f"{r}:{c}") for c in range(COLS)),
+                key=r,
+            )
+            for r in range(ROWS)
+        )
+    )
+
+
+def main() -> None:
+    old = build()
+    rebuilt = build(changed=ROWS // 2)
+
+    body = old._children[0]
+    assert isinstance(body, H)
+    rows = list(body._children)
+    rows[ROWS // 2] = H.tr(
+        H.td("changed"), *(H.td(f"{ROWS // 2}:{c}") for c in range(1, COLS)), key=ROWS // 2
+    )
+    shared = H.table(H.tbody(rows))
+
+    print(f"{ROWS * (COLS + 1) + 2} nodes, 1 changed cell")
+    render = best_of(lambda: rebuilt.html_)
+    report("re-render html_", render)
+    report("diff (fully rebuilt tree)", best_of(lambda: diff(old, rebuilt)), baseline=render)
+    report("diff (unchanged rows shared)", best_of(lambda: diff(old, shared)), baseline=render)
+    print(diff(old, rebuilt))
+
+
+if __name__ == "__main__":
+    main()
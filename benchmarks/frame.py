@@ -0,0 +1,87 @@
+"""
+Benchmark: `dataframe_table` versus the previous `iterrows()`-based pivot example and
+`DataFrame.to_html` at 10k, 100k and 1M cells.
+
+Run with `python -m benchmarks.frame [--skip-legacy-above CELLS]`. Requires pandas.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=import-not-found
+
+from __future__ import annotations
+
+import argparse
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from zen_html import H, dataframe_table
+
+from ._timing import best_of, report
+
+COLUMNS = 10
+
+
+def make_frame(cells: int) -> pd.DataFrame:
+    rows = cells // COLUMNS
+    rng = np.random.default_rng(0)
+    data: dict[str, Any] = {f"c{i}": rng.integers(0, 1_000_000, rows) * 1.0 for i in range(COLUMNS - 2)}
+    data["label"] = [f"item <{i}>" for i in range(rows)]
+    data["count"] = np.arange(rows)
+    return pd.DataFrame(data, index=pd.RangeIndex(rows, name="row"))
+
+
+def legacy(df: pd.DataFrame) -> str:
+    """The per-row/per-cell approach `examples.pandas_pivot` used before `dataframe_table`."""
+    header = H.thead(H.tr(H.th("row"), *(H.th(str(c)) for c in df.columns)))
+    body_rows = []
+    for idx, row in df.iterrows():
+        body_rows.append(
+            H.tr(H.th(str(idx)), *(H.td("{:,.0f}".format(v) if k != "label" else v) for k, v in row.items()))
+        )
+    return H.table(header, H.tbody(*body_rows)).html_
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skip-legacy-above", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for cells in (10_000, 100_000, 1_000_000):
+        df = make_frame(cells)
+        formats = {c: "{:,.0f}" for c in df.columns if c != "label"}
+        print(f"\n{cells:,} cells ({len(df):,} rows x {COLUMNS} columns)")
+        repeat = 3 if cells <= 100_000 else 1
+        to_html = best_of(
+            lambda: df.to_html(formatters={c: f.format for c, f in formats.items()}), repeat=repeat
+        )
+        report("DataFrame.to_html", to_html)
+        if cells <= args.skip_legacy_above:
+            report(
+                "iterrows + H.tr/H.td (old example)",
+                best_of(lambda: legacy(df), repeat=repeat),
+                baseline=to_html,
+            )
+        report(
+            "dataframe_table",
+            best_of(lambda: dataframe_table(df, formatters=formats).html_, repeat=repeat),
+            baseline=to_html,
+        )
+
+    # Grouped MultiIndex rows: markup size and time with and without rowspan grouping.
+    rows = 100_000
+    index = pd.MultiIndex.from_product(
+        [[f"region {i}" for i in range(10)], [f"channel {i}" for i in range(100)], range(rows // 1000)],
+        names=["region", "channel", "n"],
+    )
+    grouped = pd.DataFrame({f"c{i}": np.arange(rows) * 1.0 for i in range(4)}, index=index)
+    print(f"\nMultiIndex rows ({rows:,} rows x 3 levels)")
+    for sparsify in (False, True):
+        size = len(dataframe_table(grouped, sparsify=sparsify).html_)
+        seconds = best_of(lambda: dataframe_table(grouped, sparsify=sparsify).html_, repeat=3)
+        report(f"sparsify={sparsify} ({size / 1e6:.1f} MB)", seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: embedding markup-safe strings from other libraries, and embedding nodes elsewhere.
+
+Builds and renders a list of 10,000 items whose content is markup from another library (a
+`str` subclass with `__html__`, like MarkupSafe's `Markup`), once wrapped in `RAW_STR(str(x))`
+as before the `__html__` protocol was supported and once passed as it is. Then compares a
+template engine calling `__html__` on a node with rendering `html_` each time. Run with
+`python -m benchmarks.markup`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import H
+
+from ._timing import best_of, report
+
+ITEMS = 10_000
+
+
+class Markup(str):
+    def __html__(self) -> str:
+        return self
+
+
+SNIPPETS = [Markup(f"<span class='badge'>{i}</span> <em>item</em> " * 8) for i in range(ITEMS)]
+
+
+def main() -> None:
+    wrapped = best_of(lambda: H.ul(H.li(H.RAW_STR(str(snippet))) for snippet in SNIPPETS).html_)
+    report("RAW_STR(str(x)), build and render", wrapped)
+    report(
+        "__html__ strings, build and render",
+        best_of(lambda: H.ul(H.li(s) for s in SNIPPETS).html_),
+        baseline=wrapped,
+    )
+
+    page = H.ul(H.li(snippet) for snippet in SNIPPETS)
+    rendered = best_of(lambda: page.html_)
+    report("node html_ per embedding", rendered)
+    report("node __html__ per embedding", best_of(page.__html__), baseline=rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: size and render time of minified output on typical pages.
+
+Run with `python -m benchmarks.minify`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import gzip
+from datetime import date, timedelta
+from typing import Callable
+
+from zen_html import H, MinifyOptions
+
+from ._timing import best_of, report
+
+
+def layout(title: str, *content: H) -> H:
+    return H.html(
+        H.head(
+            H.meta(charset="utf-8"),
+            H.meta(name="viewport", content="width=device-width, initial-scale=1"),
+            H.title(title),
+            H.link(href="/static/app.css", rel="stylesheet"),
+        ),
+        H.body(H.header(H.nav(H.a("Home", href="/"), H.a("Reports", href="/reports"))), H.main(*content)),
+        lang="en",
+    )
+
+
+def list_page() -> H:
+    return layout(
+        "Products",
+        H.ul(
+            (
+                H.li(
+                    H.a(f"Product {i}", href=f"/products/{i}", class_="product-link"),
+                    H.span(f"{i * 3 % 97} in stock", class_="stock"),
+                    class_="product",
+                )
+                for i in range(2000)
+            ),
+            class_="products",
+        ),
+    )
+
+
+def table_page() -> H:
+    start = date(2024, 1, 1)
+    return layout(
+        "Orders",
+        H.table(
+            H.thead(H.tr(*(H.th(h) for h in ("ID", "Customer", "Date", "Qty", "Total", "Status")))),
+            H.tbody(
+                H.tr(
+                    H.td(str(i), class_="num"),
+                    H.td(f"Customer {i % 300}"),
+                    H.td((start + timedelta(days=i % 365)).isoformat()),
+                    H.td(str(i % 17), class_="num"),
+                    H.td(f"{i * 12.5:,.2f}", class_="num"),
+                    H.td("shipped" if i % 3 else "pending"),
+                )
+                for i in range(2000)
+            ),
+            class_="table table-striped",
+        ),
+    )
+
+
+def table_rows_page() -> H:
+    start = date(2024, 1, 1)
+    rows = [
+        (i, f"Customer {i % 300}", start + timedelta(days=i % 365), i % 17, f"{i * 12.5:,.2f}", "shipped")
+        for i in range(2000)
+    ]
+    num = {"class_": "num"}
+    return layout(
+        "Orders",
+        H.table(
+            H.tbody(H.table_rows(rows, cell_attrs={0: num, 3: num, 4: num})), class_="table table-striped"
+        ),
+    )
+
+
+def form_page() -> H:
+    return layout(
+        "Filter",
+        H.form(
+            H.select(
+                (H.option(f"Region {i}", value=f"r{i}", selected=i == 3) for i in range(500)),
+                name="region",
+                multiple=True,
+            ),
+            H.dl(*(H.fragment(H.dt(f"Field {i}"), H.dd(f"Value   {i}\n")) for i in range(500))),
+            H.button("Apply", type="submit"),
+            action="/filter",
+            method="get",
+        ),
+    )
+
+
+def main() -> None:
+    pages: dict[str, Callable[[], H]] = {
+        "list (2000 items)": list_page,
+        "table (2000 x 6 nodes)": table_page,
+        "table_rows (2000 x 6)": table_rows_page,
+        "form (500 options, 500 dt/dd)": form_page,
+    }
+    minify = MinifyOptions()
+    for name, build in pages.items():
+        page = build()
+        full = page.html_
+        mini = page.minified_html_
+        full_gz = len(gzip.compress(full.encode()))
+        mini_gz = len(gzip.compress(mini.encode()))
+        print(f"\n{name}")
+        print(f"  bytes {len(full):>9,} -> {len(mini):>9,}  (-{1 - len(mini) / len(full):.1%})")
+        print(f"  gzip  {full_gz:>9,} -> {mini_gz:>9,}  (-{1 - mini_gz / full_gz:.1%})")
+        baseline = best_of(lambda: "".join(page.to_token()))
+        report("  render", baseline)
+        report("  render minified", best_of(lambda: "".join(page.to_token(minify))), baseline=baseline)
+
+
+if __name__ == "__main__":
+    main()
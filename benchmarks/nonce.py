@@ -0,0 +1,70 @@
+"""
+Benchmark: per-request CSP nonces on cached markup against re-rendering.
+
+Serves a page with scripts, styles and stylesheet links in a static header and a cached
+document, once without a nonce and once with a new nonce per request, and compares both with
+rendering the page again for each request. Run with `python -m benchmarks.nonce`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import H, ResponseCache, compress_tokens, csp_nonce, new_nonce
+
+from ._timing import best_of, report
+
+ROWS = 2_000
+
+
+def build() -> H:
+    return H.html(
+        H.head(
+            H.link(rel="stylesheet", href="/static/site.css"),
+            H.style(".price { color: red }"),
+            H.script(src="/static/app.js"),
+        ),
+        H.body(
+            H.ul(
+                H.li(H.a(f"item {i}", href=f"/items/{i}"), H.span(f"{i * 7} JPY", class_="price"))
+                for i in range(ROWS)
+            ),
+            H.script("init()"),
+        ),
+    )
+
+
+def main() -> None:
+    page = build()
+    static = H.static(page)
+    entry = ResponseCache().render_entry(page)
+
+    def rerender() -> str:
+        with csp_nonce(new_nonce()):
+            return "".join(page.to_token())
+
+    def cached() -> str:
+        with csp_nonce(new_nonce()):
+            return "".join(static.to_token())
+
+    report("re-render, nonce", best_of(rerender, repeat=9))
+    report("H.static, no nonce", best_of(lambda: "".join(static.to_token()), repeat=9))
+    report("H.static, nonce", best_of(cached, repeat=9))
+
+    def gzip_static() -> bytes:
+        with csp_nonce(new_nonce()):
+            return b"".join(compress_tokens(static.to_token()))
+
+    def gzip_render() -> bytes:
+        with csp_nonce(new_nonce()):
+            return b"".join(compress_tokens(page.to_token()))
+
+    report("gzip re-render, nonce", best_of(gzip_render, repeat=5))
+    report("gzip H.static, nonce", best_of(gzip_static, repeat=9))
+    report("CacheEntry identity, nonce", best_of(lambda: entry.select("", nonce=new_nonce()), repeat=9))
+    report("CacheEntry gzip, no nonce", best_of(lambda: entry.select("gzip"), repeat=9))
+    report("CacheEntry gzip, nonce", best_of(lambda: entry.select("gzip", nonce=new_nonce()), repeat=9))
+
+
+if __name__ == "__main__":
+    main()
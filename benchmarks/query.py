@@ -0,0 +1,70 @@
+"""
+Benchmark: tree queries with and without the cached index.
+
+Compares a manual walk over the tree with `find_by_id` and `find_all` on an indexed tree, and
+times building the index once. Run with `python -m benchmarks.query`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import H
+from zen_html._base import _HBase
+from zen_html._query import _TreeIndex
+
+from ._timing import best_of, report
+
+SECTIONS = 200
+ITEMS = 50
+
+
+def build() -> H:
+    return H.html(
+        H.body(
+            H.section(
+                H.h2(f"section {s}", id=f"s{s}"),
+                H.ul(
+                    H.li(H.a(f"item {i}", href=f"/{s}/{i}", class_="link" if i % 10 else "link hot"))
+                    for i in range(ITEMS)
+                ),
+            )
+            for s in range(SECTIONS)
+        )
+    )
+
+
+def scan_by_id(node: _HBase, value: str) -> _HBase | None:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current._props.get("id") == value:
+            return current
+        stack.extend(reversed([c for c in current._children if isinstance(c, _HBase)]))
+    return None
+
+
+def main() -> None:
+    tree = build()
+    tree.find_all()
+    target = f"s{SECTIONS - 1}"
+    elements = sum(1 for _ in tree.walk())
+
+    print(f"{elements} elements")
+    report("build index", best_of(lambda: _TreeIndex(tree), repeat=5))
+    report("manual walk for an id", best_of(lambda: scan_by_id(tree, target), repeat=5))
+    report("find_by_id (indexed)", best_of(lambda: tree.find_by_id(target), repeat=5))
+    report(
+        "walk() + filter class 'hot'",
+        best_of(
+            lambda: [n for _, n in tree.walk() if "hot" in str(n.props_.get("class", "")).split()], repeat=5
+        ),
+    )
+    report("find_all(class_='hot') (indexed)", best_of(lambda: tree.find_all(class_="hot"), repeat=5))
+    report(
+        "find_all('a', class_='hot') (indexed)", best_of(lambda: tree.find_all("a", class_="hot"), repeat=5)
+    )
+
+
+if __name__ == "__main__":
+    main()
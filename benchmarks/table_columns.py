@@ -0,0 +1,56 @@
+"""
+Benchmark: columnar input with `H.table_columns` versus transposing it into rows.
+
+Run with `python -m benchmarks.table_columns [rows]`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import array
+import sys
+from datetime import date, timedelta
+from typing import Iterable
+
+from zen_html import H
+
+from ._timing import best_of, report
+
+
+def make_columns(count: int) -> dict[str, Iterable[object]]:
+    start = date(2024, 1, 1)
+    return {
+        "id": array.array("q", range(count)),
+        "price": array.array("d", (i * 1.5 for i in range(count))),
+        "name": [f"item <{i}>" for i in range(count)],
+        "day": [start + timedelta(days=i % 365) for i in range(count)],
+        "qty": list(range(count)),
+    }
+
+
+def via_rows(columns: dict[str, Iterable[object]]) -> str:
+    # The previous approach: transpose into row tuples and feed H.table_rows.
+    rows = list(zip(*columns.values()))
+    return H.tbody(H.table_rows(rows, cell_attrs={0: {"class_": "num"}})).html_
+
+
+def columnar(columns: dict[str, Iterable[object]]) -> str:
+    return H.tbody(H.table_columns(columns, cell_attrs={"id": {"class_": "num"}})).html_
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    columns = make_columns(count)
+    assert via_rows(columns) == columnar(columns)
+
+    print(f"{count} rows x {len(columns)} columns (build + render)")
+    baseline = best_of(lambda: via_rows(columns), repeat=3)
+    report("zip to rows + H.table_rows", baseline)
+    fast = best_of(lambda: columnar(columns), repeat=3)
+    report("H.table_columns", fast, baseline=baseline)
+    print(f"{count / fast:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: `H.table_rows` versus an equivalent `H.tr`/`H.td` tree.
+
+Run with `python -m benchmarks.table_rows [rows]`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from zen_html import H
+
+from ._timing import best_of, report
+
+COLUMNS = 5
+
+
+def make_rows(count: int) -> list[tuple[object, ...]]:
+    return [(i, f"item <{i}>", i * 1.5, date(2024, 1, 1 + i % 28), "ok") for i in range(count)]
+
+
+def node_tree(rows: list[tuple[object, ...]]) -> str:
+    return H.tbody(
+        H.tr(
+            H.td(str(r[0]), class_="num"),
+            H.td(str(r[1])),
+            H.td(f"{r[2]:.2f}"),
+            H.td(str(r[3])),
+            H.td(str(r[4])),
+        )
+        for r in rows
+    ).html_
+
+
+def direct(rows: list[tuple[object, ...]]) -> str:
+    return H.tbody(
+        H.table_rows(
+            rows,
+            formatters={2: lambda v: f"{v:.2f}"},
+            cell_attrs={0: {"class_": "num"}},
+        )
+    ).html_
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(count)
+    assert node_tree(rows) == direct(rows)
+
+    print(f"{count} rows x {COLUMNS} columns (build + render)")
+    baseline = best_of(lambda: node_tree(rows), repeat=3)
+    report("H.tr/H.td tree", baseline)
+    fast = best_of(lambda: direct(rows), repeat=3)
+    report("H.table_rows", fast, baseline=baseline)
+    print(f"{count / fast:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
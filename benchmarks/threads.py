@@ -0,0 +1,61 @@
+"""
+Benchmark: throughput of building and rendering pages on 1 to N threads.
+
+Each run renders the same number of pages, split across a thread pool; the pages share a
+static header (`H.static`) and build everything else per page. On a GIL build the throughput
+stays flat; on a free-threaded build (e.g. `python3.13t`) it should grow with the number of
+cores. Run with `python -m benchmarks.threads [max_threads]`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from zen_html import H
+
+PAGES = 400
+
+HEADER = H.static(H.header(H.nav(H.a(f"link {i}", href=f"/section/{i}") for i in range(50))))
+
+
+def render(i: int) -> int:
+    page = H.html(
+        H.head(H.title(f"Product {i}")),
+        H.body(
+            HEADER,
+            H.h1(f"Product {i}"),
+            H.table(H.tbody(H.tr(H.th(f"spec {n}"), H.td(f"value {n * i}")) for n in range(60))),
+        ),
+    )
+    return len(page.html_)
+
+
+def throughput(threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for _ in pool.map(render, range(PAGES), chunksize=PAGES // threads // 4 or 1):
+            pass
+    return PAGES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPU(s)")
+    render(0)
+    base = max(throughput(1) for _ in range(3))
+    print(f"  {1:>3} thread(s) {base:9.0f} pages/s  ( 1.00x)")
+    threads = 2
+    while threads <= max_threads:
+        rate = max(throughput(threads) for _ in range(3))
+        print(f"  {threads:>3} thread(s) {rate:9.0f} pages/s  ({rate / base:5.2f}x)")
+        threads *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: render-time transform pipelines against plain rendering.
+
+Renders a page of about 20,000 elements plainly, through an empty pipeline, through the
+built-in transformers, and through 10 transformers that handle tags the page does not contain
+or every tag. Run with `python -m benchmarks.transform`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import (
+    ExternalLinkRel,
+    H,
+    LazyLoading,
+    PrefixURLs,
+    Transformer,
+    TransformPipeline,
+)
+from zen_html._transform import Attrs
+
+from ._timing import best_of, report
+
+ROWS = 2_000
+
+
+class Touch(Transformer):
+    """Does nothing to the elements it handles; measures the dispatch and attribute copies."""
+
+    def __init__(self, tags: list[str] | None) -> None:
+        self.tags = tags
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        attrs.get("class")
+
+
+def build() -> H:
+    return H.html(
+        H.head(H.link(rel="stylesheet", href="/static/site.css"), H.script(src="/static/app.js")),
+        H.body(
+            H.ul(
+                H.li(
+                    H.a(f"item {i}", href=f"/items/{i}" if i % 4 else f"https://shop{i}.example/"),
+                    H.img(src=f"/img/{i}.png", alt=""),
+                    H.span(f"{i * 7} JPY", class_="price"),
+                    H.p("lorem ipsum ", H.b("dolor"), " sit amet"),
+                    H.p(H.i("consectetur"), " adipiscing"),
+                    H.div(H.span("a"), H.span("b"), class_="tags"),
+                    class_="item",
+                )
+                for i in range(ROWS)
+            )
+        ),
+    )
+
+
+def main() -> None:
+    page = build()
+    pipelines = {
+        "empty pipeline": TransformPipeline(),
+        "LazyLoading": TransformPipeline(LazyLoading()),
+        "3 built-ins": TransformPipeline(
+            PrefixURLs("https://cdn.example.com"), ExternalLinkRel(hosts=["example.com"]), LazyLoading()
+        ),
+        "10 x absent tags": TransformPipeline(*(Touch([f"x-{n}"]) for n in range(10))),
+        "10 x <img>": TransformPipeline(*(Touch(["img"]) for _ in range(10))),
+        "1 x every tag": TransformPipeline(Touch(None)),
+        "10 x every tag": TransformPipeline(*(Touch(None) for _ in range(10))),
+    }
+
+    print(f"{sum(1 for _ in page.walk())} elements")
+    report("plain html_", best_of(lambda: page.html_, repeat=9))
+    for label, pipeline in pipelines.items():
+        report(label, best_of(lambda: pipeline.apply(page).html_, repeat=9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: time to first byte of a page whose body waits for data, with the whole document
+built up front vs a `Document` whose head is flushed before the body is loaded.
+
+The harness drives `ASGIResponse` in-process and timestamps every `send()`, the way a server
+writes to the socket. The "query" is an `asyncio.sleep` (or a `time.sleep` in a sync loader,
+run in the executor). Run with `python -m benchmarks.ttfb`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from zen_html import ASGIResponse, Document, H
+
+QUERY_SECONDS = 0.05
+
+HEAD = [
+    H.meta(charset="utf-8"),
+    H.meta(name="viewport", content="width=device-width, initial-scale=1"),
+    H.link(rel="preload", href="/fonts/inter.woff2", as_="font", crossorigin="anonymous"),
+    H.link(rel="stylesheet", href="/static/app.css"),
+    H.script(src="/static/app.js", defer=True),
+]
+
+App = Callable[[MutableMapping[str, Any], Any, Any], Awaitable[None]]
+
+
+def results(rows: list[tuple[int, str]]) -> H:
+    return H.main(H.ul(H.li(H.a(name, href=f"/items/{i}")) for i, name in rows))
+
+
+async def fetch_rows() -> list[tuple[int, str]]:
+    await asyncio.sleep(QUERY_SECONDS)
+    return [(i, f"Item {i}") for i in range(500)]
+
+
+def fetch_rows_sync() -> list[tuple[int, str]]:
+    time.sleep(QUERY_SECONDS)
+    return [(i, f"Item {i}") for i in range(500)]
+
+
+async def whole_tree(scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+    """The `HtmlDocument` pattern: load the data, build one `H.html` tree, then respond."""
+    rows = await fetch_rows()
+    page = H.html(H.head(*HEAD, H.title("Items")), H.body(results(rows)), lang="en")
+    await ASGIResponse(page, include_doctype=True)(scope, receive, send)
+
+
+async def deferred_async(scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+    async def body() -> H:
+        return results(await fetch_rows())
+
+    await ASGIResponse(Document(body, head=HEAD, title="Items", lang="en"))(scope, receive, send)
+
+
+async def deferred_sync(scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+    document = Document(lambda: results(fetch_rows_sync()), head=HEAD, title="Items", lang="en")
+    await ASGIResponse(document)(scope, receive, send)
+
+
+def measure(app: App) -> tuple[float, float]:
+    """Return (time to first body byte, time to last byte) in seconds for one request."""
+    stamps: list[float] = []
+
+    async def main() -> None:
+        async def receive() -> MutableMapping[str, Any]:
+            await asyncio.Event().wait()
+            return {}
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.body" and message.get("body"):
+                stamps.append(time.perf_counter())
+
+        start = time.perf_counter()
+        await app({"type": "http", "method": "GET", "headers": []}, receive, send)
+        stamps[:] = [stamp - start for stamp in stamps]
+
+    asyncio.run(main())
+    return stamps[0], stamps[-1]
+
+
+def main() -> None:
+    print(f"query latency {QUERY_SECONDS * 1000:.0f} ms; median of 10 requests")
+    for label, app in (
+        ("whole tree after the query", whole_tree),
+        ("Document, async deferred body", deferred_async),
+        ("Document, sync deferred body", deferred_sync),
+    ):
+        samples = [measure(app) for _ in range(10)]
+        ttfb = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        print(f"  {label:<32} TTFB {ttfb * 1000:7.2f} ms   last byte {total * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: updating one attribute deep in a large tree.
+
+Compares rebuilding the whole tree with `replace_at`, which copies only the nodes on the path
+to the change, and times re-hashing the result (untouched subtrees keep their cached hashes).
+Run with `python -m benchmarks.update`.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from zen_html import H
+
+from ._timing import best_of, report
+
+ROWS = 2_000
+ACTIVE = ROWS // 2
+
+
+def build(active: int | None = None) -> H:
+    return H.table(
+        H.tbody(
+            H.tr(
+                H.td(H.a(f"row {i}", href=f"/rows/{i}")),
+                H.td(f"{i * 7} JPY"),
+                class_="active" if i == active else None,
+            )
+            for i in range(ROWS)
+        )
+    )
+
+
+def main() -> None:
+    base = build()
+    base.hash_
+    target = base._children[0]._children[ACTIVE]  # type: ignore[union-attr]
+    assert isinstance(target, H)
+
+    print(f"{ROWS} rows, changing the class of row {ACTIVE}")
+    report("rebuild", best_of(lambda: build(ACTIVE), repeat=7))
+    report(
+        "replace_at + with_props",
+        best_of(lambda: base.replace_at([0, ACTIVE], target.with_props(class_="active")), repeat=7),
+    )
+    report("rebuild + hash_", best_of(lambda: build(ACTIVE).hash_, repeat=7))
+    report(
+        "replace_at + with_props + hash_",
+        best_of(lambda: base.replace_at([0, ACTIVE], target.with_props(class_="active")).hash_, repeat=7),
+    )
+    assert base.replace_at([0, ACTIVE], target.with_props(class_="active")) == build(ACTIVE)
+
+
+if __name__ == "__main__":
+    main()
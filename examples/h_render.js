@@ -1,7 +1,8 @@
 // Renders a dict_-compatible tree into DOM nodes.
+// Fragments (`tag: null`) become DocumentFragments so their children are inserted without a wrapper.
 export function HRender(tree) {
   const renderNode = ({ tag, props = {}, children = [] }) => {
-    const el = document.createElement(tag);
+    const el = tag === null ? document.createDocumentFragment() : document.createElement(tag);
     Object.entries(props).forEach(([key, value]) => {
       if (value === true) {
         el.setAttribute(key, "");
@@ -19,3 +20,51 @@ export function HRender(tree) {
 
   return renderNode(tree);
 }
+
+// Applies patch operations produced by `zen_html.diff(old, new)` to a DOM tree built by HRender.
+// Paths are child indices (text nodes included) from `root`; operations must be applied in order.
+export function HPatch(root, ops) {
+  const toNode = (value) =>
+    typeof value === "string" ? document.createTextNode(value) : HRender(value);
+  const resolve = (path) => path.reduce((node, index) => node.childNodes[index], root);
+
+  for (const op of ops) {
+    const target = resolve(op.path);
+    switch (op.op) {
+      case "replace": {
+        const node = toNode(op.node);
+        if (target === root) {
+          root.replaceWith(node);
+          root = node;
+        } else {
+          target.replaceWith(node);
+        }
+        break;
+      }
+      case "text":
+        target.nodeValue = op.value;
+        break;
+      case "set_attr":
+        target.setAttribute(op.name, op.value === true ? "" : op.value);
+        break;
+      case "remove_attr":
+        target.removeAttribute(op.name);
+        break;
+      case "insert":
+        target.insertBefore(toNode(op.node), target.childNodes[op.index] ?? null);
+        break;
+      case "remove":
+        target.childNodes[op.index].remove();
+        break;
+      case "move": {
+        const node = target.childNodes[op.from];
+        node.remove();
+        target.insertBefore(node, target.childNodes[op.to] ?? null);
+        break;
+      }
+      default:
+        throw new Error(`Unknown patch op: ${op.op}`);
+    }
+  }
+  return root;
+}
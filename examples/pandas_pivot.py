@@ -10,10 +10,11 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+from typing import Sequence
 
 import pandas as pd  # type: ignore[import-not-found]
 
+from zen_html import dataframe_table
 from zen_html.h import H
 
 
@@ -35,38 +36,8 @@ def pivot_table_html(
         aggfunc=aggfunc,
         fill_value=0,
     )
-
-    column_labels: Iterable[str] = (
-        (" / ".join(map(str, col)) if isinstance(col, tuple) else str(col)) for col in pivot.columns
-    )
-
-    header = H.thead(
-        H.tr(
-            H.th(" / ".join(index)),
-            *(H.th(label) for label in column_labels),
-        )
-    )
-
-    def render_cell(value: object) -> str:
-        if callable(format_cell):
-            return format_cell(value)
-        return format_cell.format(value)
-
-    body_rows = []
-    for idx, row in pivot.iterrows():
-        row_label = " / ".join(map(str, idx)) if isinstance(idx, tuple) else str(idx)
-        body_rows.append(
-            H.tr(
-                H.th(row_label),
-                *(H.td(render_cell(value)) for value in row),
-            )
-        )
-
-    return H.table(
-        header,
-        H.tbody(*body_rows),
-        class_="pivot-table",
-    )
+    # Cells are formatted and escaped column by column; no node is built per cell.
+    return dataframe_table(pivot, formatters=format_cell, class_="pivot-table")
 
 
 if __name__ == "__main__":
@@ -86,7 +57,7 @@ if __name__ == "__main__":
 
     node = pivot_table_html(
         data,
-        index=["region"],
+        index=["region", "channel"],
         columns=["quarter"],
         values="sales",
         format_cell="{:,}",
@@ -2,11 +2,20 @@
 # mypy: disable-error-code=no-untyped-def
 # mypy: disable-error-code=unused-ignore
 
-from typing import Iterable, Sequence
+from typing import AsyncIterable, AsyncIterator, Iterable, Sequence
 
+from starlette.concurrency import iterate_in_threadpool
 from starlette.datastructures import URL
-from starlette.responses import StreamingResponse
+from starlette.responses import Response, StreamingResponse
 
+from zen_html import (
+    CacheEntry,
+    MinifyOptions,
+    acompress_tokens,
+    compress_tokens,
+    negotiate_encoding,
+)
+from zen_html._base import _HBase
 from zen_html.h import H
 
 
@@ -25,36 +34,132 @@ def select(name: str, label: str, item_map: dict[str, str], values: list[str]) -
     )
 
 
-HtmlContent = H | Iterable[str]
+# Any node, including fragments (which are not `H` instances).
+HtmlContent = _HBase | Iterable[str] | AsyncIterable[str]
 
 
 class HResponse(StreamingResponse):  # type: ignore[misc]
-    """StreamResponse that renders `H` nodes or raw HTML token iterables."""
+    """StreamResponse that renders `H` nodes or raw HTML token (async) iterables such as `TableStream`."""
 
     def __init__(
         self,
         content: HtmlContent,
         *,
         include_doctype: bool = False,
+        etag: bool = False,
+        minify: MinifyOptions | None = None,
+        compress: bool = False,
         media_type: str = "text/html; charset=utf-8",
         **kwargs,
     ) -> None:
-        stream = self._render(content, include_doctype)
+        stream = self._render(content, include_doctype, minify)
         super().__init__(stream, media_type=media_type, **kwargs)
+        self._tokens = stream
+        self.compress = compress
+        if compress:
+            self.headers["Vary"] = "Accept-Encoding"
+        self.etag: str | None = None
+        if etag and isinstance(content, _HBase):
+            # The content hash covers the tree only, so mix in the doctype and minify flags.
+            suffix = "d" if include_doctype else ""
+            if minify is not None:
+                suffix += f"m{minify.unquoted_attrs:d}{minify.omit_end_tags:d}{minify.collapse_whitespace:d}"
+            self.etag = content.etag_ if not suffix else f'"{content.hash_.hex()}-{suffix}"'
+            self.headers["ETag"] = self.etag
+
+    async def __call__(self, scope, receive, send) -> None:
+        headers = dict(scope.get("headers") or [])
+        encoding = None
+        if self.compress:
+            encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if self.etag is not None:
+            # The compressed body is a representation of its own, with its own entity tag.
+            etag = _coded_etag(self.etag, encoding)
+            self.headers["ETag"] = etag
+            if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+            if _etag_matches(if_none_match, etag):
+                # Answer before the token stream is ever iterated, so nothing is rendered.
+                not_modified = {"ETag": etag}
+                if self.compress:
+                    not_modified["Vary"] = "Accept-Encoding"
+                response = Response(status_code=304, headers=not_modified)
+                await response(scope, receive, send)
+                return
+        if encoding is not None:
+            # Compress while rendering; the head is flushed as soon as it is complete.
+            if isinstance(self._tokens, AsyncIterable) and not isinstance(self._tokens, Iterable):
+                self.body_iterator = acompress_tokens(self._tokens, encoding)
+            else:
+                self.body_iterator = iterate_in_threadpool(compress_tokens(self._tokens, encoding))
+            self.headers["Content-Encoding"] = encoding
+        await super().__call__(scope, receive, send)
 
     @staticmethod
-    def _render(content: HtmlContent, include_doctype: bool) -> Iterable[str]:
+    def _render(
+        content: HtmlContent, include_doctype: bool, minify: MinifyOptions | None = None
+    ) -> Iterable[str] | AsyncIterator[str]:
+        if isinstance(content, AsyncIterable) and not isinstance(content, (_HBase, Iterable)):
+
+            async def async_iterator() -> AsyncIterator[str]:
+                if include_doctype:
+                    yield "<!DOCTYPE html>"
+                async for chunk in content:
+                    yield chunk
+
+            return async_iterator()
+
         def iterator() -> Iterable[str]:
             if include_doctype:
                 yield "<!DOCTYPE html>"
-            if isinstance(content, H):
-                yield from content.to_token()
+            if isinstance(content, _HBase):
+                yield from content.to_token(minify)
             else:
                 yield from content
 
         return iterator()
 
 
+class HCachedResponse(Response):  # type: ignore[misc]
+    """Response serving a `ResponseCache` entry, gzip-encoded when the client accepts it."""
+
+    def __init__(
+        self,
+        entry: CacheEntry,
+        *,
+        accept_encoding: str = "",
+        media_type: str = "text/html; charset=utf-8",
+        **kwargs,
+    ) -> None:
+        body, encoding = entry.select(accept_encoding)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry.gzip_body is not None:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        super().__init__(body, media_type=media_type, headers=headers, **kwargs)
+
+
+def _coded_etag(etag: str, encoding: str | None) -> str:
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# The same on every page: rendered once, and compressed once when HResponse(compress=True).
+_HEAD_BOILERPLATE = H.static(
+    H.meta(charset="utf-8"),
+    H.meta(name="viewport", content="width=device-width, initial-scale=1"),
+    H.meta(httpEquiv="Pragma", content="no-cache"),
+    H.meta(httpEquiv="Cache-Control", content="no-store"),
+)
+
+
 def HtmlDocument(
     *,
     title: str,
@@ -72,12 +177,9 @@ def HtmlDocument(
     script_nodes = [str(i) for i in script or ()]
     return H.html(
         H.head(
-            H.meta(charset="utf-8"),
-            H.meta(name="viewport", content="width=device-width, initial-scale=1"),
+            _HEAD_BOILERPLATE,
             H.meta(name="description", content=description),
             H.meta(name="keywords", content=keywords),
-            H.meta(httpEquiv="Pragma", content="no-cache"),
-            H.meta(httpEquiv="Cache-Control", content="no-store"),
             H.title(title),
             *(H.link(href=href, rel="stylesheet") for href in css_nodes),
             *(H.script(src=src) for src in script_nodes),
@@ -0,0 +1,68 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import copy
+import pickle
+
+import pytest
+
+from zen_html import ClassList, H, MinifyOptions, Style, TransformPipeline
+
+
+def test_style_matches_dict_styles() -> None:
+    style = Style({"color": "red", "fontFamily": '"A" B'}, margin_top=0, padding=None)
+    expected = H.p("x", style={"color": "red", "fontFamily": '"A" B', "margin_top": 0})
+
+    assert style == 'color: red; font-family: "A" B; margin-top: 0'
+    assert style.escaped == "color: red; font-family: &quot;A&quot; B; margin-top: 0"
+    assert dict(style.declarations) == {"color": "red", "font-family": '"A" B', "margin-top": "0"}
+    assert repr(Style(color="red")) == "Style('color: red')"
+
+    node = H.p("x", style=style)
+    assert node._props["style"] is style
+    assert node == expected and node.hash_ == expected.hash_ and node.html_ == expected.html_
+    assert "".join(node.to_token(MinifyOptions())) == "".join(expected.to_token(MinifyOptions()))
+    assert node.dict_ == expected.dict_
+    assert TransformPipeline().apply(node).html_ == expected.html_
+    with pytest.raises(TypeError):
+        Style("color: red")  # type: ignore[arg-type]
+
+
+def test_style_merges_are_cached() -> None:
+    base = Style(color="red", fontSize="12px")
+
+    bold = base | {"fontWeight": "bold", "color": None}
+    assert bold == "font-size: 12px; font-weight: bold"
+    assert base | {"fontWeight": "bold", "color": None} is bold
+    assert base | Style(color="blue") == "color: blue; font-size: 12px"
+    assert base | Style(color="blue") is base | Style(color="blue")
+    assert Style(base, margin=0) == "color: red; font-size: 12px; margin: 0"
+    assert base == "color: red; font-size: 12px"
+
+
+def test_class_list_matches_class_iterables() -> None:
+    classes = ClassList("btn  btn-lg", ["btn-primary", None, "btn"], None)
+    expected = H.button("b", class_=["btn", "btn-lg", "btn-primary"])
+
+    assert classes == "btn btn-lg btn-primary" and classes.names == ("btn", "btn-lg", "btn-primary")
+    assert ClassList('a"b').escaped == "a&quot;b"
+    node = H.button("b", class_=classes)
+    assert node._props["class"] is classes
+    assert node == expected and node.hash_ == expected.hash_ and node.html_ == expected.html_
+    assert H.button("b").with_props(class_=classes)._props["class"] is classes
+    assert node.find_all(class_="btn-lg") == [node]
+    with pytest.raises(TypeError):
+        ClassList([1])  # type: ignore[list-item]
+
+
+def test_class_list_derivations_are_cached() -> None:
+    item = ClassList("item", "card")
+
+    active = item | "active"
+    assert active == "item card active" and item | "active" is active and item.add("active") is active
+    assert item.add("card", "new extra") == "item card new extra"
+    assert active.remove("card item") == "active" and active.remove("card item") is active.remove("card item")
+    assert item == "item card"
+
+    for value in (item, Style(color="red")):
+        assert pickle.loads(pickle.dumps(value)) == value and copy.deepcopy(value) == value
+        assert type(pickle.loads(pickle.dumps(value))) is type(value)
@@ -5,9 +5,11 @@
 # mypy: disable-error-code=no-untyped-def
 
 
+from typing import Iterator
+
 import pytest
 
-from zen_html._base import _HBase
+from zen_html._base import _HBase, _HFragment
 
 
 def test_html_generation_with_nested_children() -> None:
@@ -46,9 +48,54 @@ def test_flatten_iterable_children() -> None:
     assert nested.html_ == "<div>ab<span>c</span></div>"
 
 
+def test_flatten_mixed_iterables_and_subclasses() -> None:
+    class Label(str):
+        pass
+
+    class Items:
+        def __iter__(self):
+            return iter(["x", ("y",)])
+
+    fragment = _HFragment("f1", _HFragment("f2"))
+    children = [
+        (c for c in ["g1", ["g2", (c for c in ["g3"])]]),
+        fragment,
+        map(str, range(2)),
+        {"k": 1}.keys(),
+        Items(),
+        Label("l"),
+        _HBase.RAW_STR("<r>"),
+        [],
+        (),
+    ]
+    node = _HBase("div", children)
+
+    assert node.html_ == "<div>g1g2g3f1f201kxyl<r></div>"
+    assert [type(c) for c in node._children[-2:]] == [Label, _HBase.RAW_STR]
+
+
+def test_flatten_handles_deep_nesting_lazily() -> None:
+    deep: list[object] = ["leaf"]
+    for _ in range(5000):
+        deep = [deep]
+    assert _HBase("div", deep).html_ == "<div>leaf</div>"
+
+    produced: list[int] = []
+
+    def numbers() -> Iterator[str]:
+        for i in range(3):
+            produced.append(i)
+            yield str(i)
+
+    flat = iter(_HBase._flatten_children([numbers()]))
+    assert next(flat) == "0" and produced == [0]
+
+
 def test_invalid_child_type_raises_type_error() -> None:
     with pytest.raises(TypeError):
         _HBase("div", object())
+    with pytest.raises(TypeError):
+        _HBase("div", ["ok", [1]])
 
 
 def test_invalid_dataset_type_raises_value_error() -> None:
@@ -59,3 +106,44 @@ def test_invalid_dataset_type_raises_value_error() -> None:
 def test_invalid_style_type_raises_value_error() -> None:
     with pytest.raises(ValueError):
         _HBase("div", style=123)
+
+
+def test_content_hash_is_structural_and_stable() -> None:
+    node = _HBase("div", "a", _HBase("span", "b"), class_="x", hidden=True)
+
+    # Pinned so the algorithm stays stable across processes and releases.
+    assert node.hash_.hex() == "7884543c7a52ec21b2753b51a2ae6329"
+    assert node.etag_ == f'"{node.hash_.hex()}"'
+    assert node.hash_ == _HBase("div", ["a", _HBase("span", "b")], class_="x", hidden=True).hash_
+
+
+def test_content_hash_distinguishes_content() -> None:
+    base = _HBase("div", "a", title="t")
+    variants = [
+        _HBase("p", "a", title="t"),
+        _HBase("div", "b", title="t"),
+        _HBase("div", _HBase.RAW_STR("a"), title="t"),
+        _HBase("div", "a", title="u"),
+        _HBase("div", "a"),
+        _HBase("div", "a", "", title="t"),
+        _HBase.fragment(_HBase("div", "a", title="t")),
+    ]
+    assert all(base.hash_ != v.hash_ for v in variants)
+    assert len({v.hash_ for v in variants}) == len(variants)
+
+
+def test_nodes_compare_and_hash_by_content() -> None:
+    a = _HBase("li", "x", key=1)
+    b = _HBase("li", "x", key=2)
+
+    assert a == b
+    assert a != _HBase("li", "y")
+    assert len({a, b, _HBase("li", "y")}) == 2
+    assert a != "x"
+
+
+def test_content_hash_is_cached() -> None:
+    child = _HBase("span", "b")
+    first = _HBase("div", child).hash_
+    assert child._hash is not None
+    assert _HBase("div", child).hash_ == first
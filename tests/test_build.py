@@ -0,0 +1,195 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import io
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pytest
+
+from zen_html import (
+    Document,
+    H,
+    MinifyOptions,
+    TableStream,
+    build_site,
+    page,
+    write_html,
+)
+from zen_html._build import MANIFEST_NAME, main
+
+SITE = """
+from zen_html import H, page
+
+PRODUCTS = {products!r}
+
+
+@page("products/{{slug}}.html", params=lambda: ({{"slug": s, "price": p}} for s, p in PRODUCTS.items()))
+def product(slug, price):
+    if price < 0:
+        raise ValueError("negative price")
+    return H.html(H.body(H.h1(slug), H.p(f"{{price}} JPY")))
+
+
+@page("index.html")
+def index():
+    return H.html(H.body(H.ul(H.li(H.a(s, href=f"products/{{s}}.html")) for s in sorted(PRODUCTS))))
+"""
+
+
+Site = Callable[[dict[str, int]], str]
+
+
+@pytest.fixture
+def site(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest) -> Iterator[Site]:
+    """Writes a builder module and returns a function (re)writing it with given products."""
+    name = f"site_{request.node.name.replace('[', '_').replace(']', '').replace('-', '_')}"
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def write(products: dict[str, int]) -> str:
+        (tmp_path / f"{name}.py").write_text(SITE.format(products=products))
+        sys.modules.pop(name, None)
+        return name
+
+    yield write
+    sys.modules.pop(name, None)
+
+
+def test_write_html_streams_nodes_and_token_iterables(tmp_path: Path) -> None:
+    node = H.html(H.body(H.ul(H.li(f"item {i}") for i in range(20000))))
+    path = tmp_path / "a" / "b" / "page.html"
+
+    size = write_html(node, path, include_doctype=True)
+    assert path.read_text() == "<!DOCTYPE html>" + node.html_
+    assert size == path.stat().st_size
+    assert not list(path.parent.glob(".*.tmp"))
+
+    buffer = io.BytesIO()
+    write_html(TableStream(((i, "é") for i in range(3)), flush_rows=1), buffer)
+    assert buffer.getvalue().decode().count("<td>é</td>") == 3
+
+    write_html(node, path, minify=MinifyOptions())
+    assert path.read_text() == node.minified_html_
+    write_html(Document([H.p("x")], title="t"), path)
+    assert path.read_text() == "".join(Document([H.p("x")], title="t"))
+
+
+def test_write_html_keeps_the_old_file_when_rendering_fails(tmp_path: Path) -> None:
+    path = tmp_path / "page.html"
+    path.write_text("old")
+
+    def tokens() -> Iterator[str]:
+        yield "<p>"
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        write_html(tokens(), path)
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["page.html"]
+
+
+def test_build_renders_pages_and_skips_unchanged_ones(site: Site, tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    module = site({"apple": 100, "pear": 200})
+
+    first = build_site([module], out, jobs=1)
+    assert sorted(stats.path for stats in first.rendered) == [
+        "index.html",
+        "products/apple.html",
+        "products/pear.html",
+    ]
+    assert (out / "products" / "apple.html").read_text() == (
+        "<!DOCTYPE html><html><body><h1>apple</h1><p>100 JPY</p></body></html>"
+    )
+    manifest = json.loads((out / MANIFEST_NAME).read_text())
+    assert manifest["pages"]["products/pear.html"]["bytes"] == (out / "products" / "pear.html").stat().st_size
+
+    second = build_site([module], out, jobs=1)
+    assert not second.rendered and len(second.skipped) == 3
+
+    # A changed source file invalidates every page of its builders; here the data changes too.
+    module = site({"apple": 100, "pear": 250})
+    third = build_site([module], out, jobs=1)
+    assert len(third.rendered) == 3
+
+    (out / "products" / "apple.html").unlink()
+    fourth = build_site([module], out, jobs=1)
+    assert [stats.path for stats in fourth.rendered] == ["products/apple.html"]
+    assert len(build_site([module], out, jobs=1, force=True).rendered) == 3
+
+
+def test_only_pages_with_changed_parameters_are_rendered(site: Site, tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    module = site({"apple": 100, "pear": 200})
+    build_site([module], out, jobs=1)
+
+    sys.modules[module].PRODUCTS["pear"] = 210
+    report = build_site([module], out, jobs=1)
+    assert [stats.path for stats in report.rendered] == ["products/pear.html"]
+    assert (out / "products" / "pear.html").read_text().endswith("<p>210 JPY</p></body></html>")
+
+
+def test_failures_stale_pages_and_pruning(site: Site, tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    module = site({"apple": 100, "old": 1})
+    build_site([module], out, jobs=1)
+
+    module = site({"apple": 100, "bad": -1})
+    report = build_site([module], out, jobs=1)
+    assert [(stats.path, stats.error) for stats in report.failed] == [
+        ("products/bad.html", "ValueError: negative price")
+    ]
+    assert report.stale == ["products/old.html"]
+    assert (out / "products" / "old.html").exists()
+    assert "products/bad.html" not in json.loads((out / MANIFEST_NAME).read_text())["pages"]
+
+    # The failed page is retried, and the stale page is no longer known to the manifest.
+    report = build_site([module], out, jobs=1, prune=True)
+    assert [stats.path for stats in report.failed] == ["products/bad.html"] and report.stale == []
+
+    build_site([site({"apple": 100, "old": 1})], out, jobs=1)
+    report = build_site([site({"apple": 100})], out, jobs=1, prune=True)
+    assert report.stale == ["products/old.html"] and not (out / "products" / "old.html").exists()
+
+
+def test_build_in_worker_processes(site: Site, tmp_path: Path) -> None:
+    products = {f"p{i}": i for i in range(40)}
+    module = site(products)
+    calls: list[tuple[int, int]] = []
+
+    report = build_site(
+        [module], tmp_path / "pool", jobs=2, progress=lambda done, total: calls.append((done, total))
+    )
+    build_site([module], tmp_path / "serial", jobs=1)
+
+    assert len(report.rendered) == 41 and report.jobs == 2
+    assert calls[-1] == (41, 41)
+    for path in (tmp_path / "serial").rglob("*.html"):
+        assert (tmp_path / "pool" / path.relative_to(tmp_path / "serial")).read_bytes() == path.read_bytes()
+
+
+def test_page_paths_must_stay_inside_the_output_directory(tmp_path: Path) -> None:
+    builder = page("../{name}.html", params=[{"name": "x"}])(lambda name: H.p(name))
+    with pytest.raises(ValueError):
+        list(builder.pages())
+    assert page("/abs.html")(lambda: H.p()).path == "/abs.html"
+    with pytest.raises(ValueError):
+        list(page("/abs.html")(lambda: H.p()).pages())
+
+
+def test_command_line(site: Site, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    module = site({"apple": 100, "bad": -1})
+    out = tmp_path / "out"
+
+    assert main(["build", module, "-o", str(out), "-j", "1", "-v"]) == 1
+    captured = capsys.readouterr()
+    assert "3 pages in" in captured.out and "2 rendered, 0 skipped, 1 failed" in captured.out
+    assert "FAILED products/bad.html: ValueError: negative price" in captured.out
+    assert "[3/3] 100.0%" in captured.err
+
+    site({"apple": 100})
+    assert main(["build", module, "-o", str(out), "-j", "1", "-q", "--prune"]) == 0
+    captured = capsys.readouterr()
+    assert "2 pages in" in captured.out and "2 rendered, 0 skipped, 0 failed" in captured.out
+    assert not captured.err
@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gzip
+import zlib
+from typing import AsyncIterator
+
+import pytest
+
+from zen_html import (
+    H,
+    StreamCompressor,
+    TableStream,
+    acompress_tokens,
+    compress_tokens,
+    negotiate_encoding,
+)
+
+
+def page() -> H:
+    return H.html(
+        H.head(H.title("Report"), H.meta(charset="utf-8")),
+        H.body(H.ul(H.li(f"item {i}", class_="row") for i in range(3000))),
+    )
+
+
+@pytest.mark.parametrize("level", [0, 1, 6, 9])
+def test_round_trip_with_stdlib_decoders(level: int) -> None:
+    html = page().html_
+    gz = b"".join(compress_tokens(page().to_token(), "gzip", level=level))
+    zl = b"".join(compress_tokens(page().to_token(), "deflate", level=level))
+
+    assert gzip.decompress(gz).decode() == html
+    assert zlib.decompress(zl).decode() == html
+    assert zlib.decompress(b"".join(compress_tokens([], "deflate"))) == b""
+
+
+def test_head_is_flushed_before_body() -> None:
+    chunks = list(compress_tokens(page().to_token(), flush_bytes=None))
+    decoder = zlib.decompressobj(31)
+
+    assert decoder.decompress(chunks[0]) == b"<html><head><title>Report</title><meta charset='utf-8'/></head>"
+    assert len(chunks) == 2
+
+
+def test_flush_bytes_makes_every_chunk_decodable() -> None:
+    chunks = list(compress_tokens(page().to_token(), flush_bytes=16 * 1024, flush_before=()))
+    decoder = zlib.decompressobj(31)
+    decoded = [decoder.decompress(chunk) for chunk in chunks]
+
+    assert len(chunks) > 3
+    assert all(decoded[:-1]) and b"".join(decoded).decode() == page().html_
+    # Each intermediate chunk ends on a sync-flush marker, so its text is complete.
+    assert all(chunk.endswith(b"\x00\x00\xff\xff") for chunk in chunks[:-1])
+
+
+def test_async_sources() -> None:
+    async def rows() -> AsyncIterator[tuple[int, str]]:
+        for i in range(500):
+            yield (i, f"name {i}")
+
+    async def collect() -> bytes:
+        stream = TableStream(rows(), flush_rows=100)
+        return b"".join([chunk async for chunk in acompress_tokens(stream, "deflate")])
+
+    expected = "".join(TableStream([(i, f"name {i}") for i in range(500)]))
+    assert zlib.decompress(asyncio.run(collect())).decode() == expected
+
+
+def test_compressor_rejects_bad_options_and_double_finish() -> None:
+    with pytest.raises(ValueError):
+        StreamCompressor("br")
+    compressor = StreamCompressor()
+    compressor.write("<p>x</p>")
+    compressor.finish()
+    with pytest.raises(RuntimeError):
+        compressor.finish()
+
+
+def test_negotiate_encoding() -> None:
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("deflate, gzip;q=0.5") == "deflate"
+    assert negotiate_encoding("br, *;q=0.1") == "gzip"
+    assert negotiate_encoding("gzip;q=0, *") == "deflate"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
@@ -0,0 +1,205 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, AsyncIterator, MutableMapping
+
+import pytest
+
+from zen_html import ASGIResponse, Document, H, MinifyOptions, astream_tokens
+from zen_html._base import Children, _HBase
+
+
+def sleeper(seconds: float, content: Children) -> Any:
+    async def load() -> Children:
+        await asyncio.sleep(seconds)
+        return content
+
+    return load
+
+
+def collect(content: Any, **kwargs: Any) -> list[str]:
+    async def run() -> list[str]:
+        return [token async for token in astream_tokens(content, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_sync_rendering_shows_the_fallback() -> None:
+    node = H.div(H.deferred(sleeper(1, H.p("late")), fallback=H.p("loading"), class_="slot"))
+
+    assert node.html_ == "<div><div class='slot'><p>loading</p></div></div>"
+
+
+async def load_news() -> Children:
+    return H.p("news")
+
+
+async def load_weather() -> Children:
+    return H.p("weather")
+
+
+def test_placeholders_differ_by_source() -> None:
+    news = H.deferred(load_news, fallback=H.p("wait"))
+    weather = H.deferred(load_weather, fallback=H.p("wait"))
+    assert news != weather and news.hash_ != weather.hash_ and news.etag_ != weather.etag_
+    assert H.div(news) != H.div(weather)
+    # Named module-level loaders count by name, so rebuilt trees still match.
+    assert news == H.deferred(load_news, fallback=H.p("wait"))
+    assert news.with_props(class_="x") == H.deferred(load_news, fallback=H.p("wait"), class_="x")
+
+    first, second = sleeper(0, "a"), sleeper(0, "a")
+    assert H.deferred(first) != H.deferred(second)
+    assert H.deferred(first) == H.deferred(first)
+
+
+def test_templates_follow_the_page_in_completion_order() -> None:
+    page = H.html(
+        H.body(
+            H.deferred(sleeper(0.06, H.p("slow")), fallback="..."),
+            H.ul(H.deferred(sleeper(0.02, H.li("fast")), tag="li")),
+            H.p("end"),
+        )
+    )
+    html = "".join(collect(page))
+
+    assert html.startswith(
+        "<html><body><div id='zh-p0'>...</div><ul><li id='zh-p1'></li></ul><p>end</p><script>function __zenSwap"
+    )
+    assert html.endswith(
+        "<template id='zh-t1'><li>fast</li></template><script>__zenSwap('zh-',1)</script>"
+        "<template id='zh-t0'><p>slow</p></template><script>__zenSwap('zh-',0)</script></body></html>"
+    )
+    assert html.count("function __zenSwap") == 1
+
+
+def test_placeholders_stream_before_loaders_finish_and_load_concurrently() -> None:
+    page = H.body(*(H.deferred(sleeper(0.1, H.p(str(i)))) for i in range(5)), H.p("rest"))
+    stamps: list[tuple[float, str]] = []
+
+    async def run() -> None:
+        start = time.perf_counter()
+        async for token in astream_tokens(page):
+            stamps.append((time.perf_counter() - start, token))
+
+    asyncio.run(run())
+    rest = next(t for t, token in stamps if token == "rest")
+    assert rest < 0.05
+    # Five 100 ms loaders run concurrently.
+    assert stamps[-1][0] < 0.3
+    assert stamps[-1][1] == "</body>"
+
+
+def test_nested_deferred_content_and_minified_output() -> None:
+    inner = H.deferred(sleeper(0, H.b("inner")), tag="span")
+    page = H.ul(H.deferred(sleeper(0, H.li("outer", inner)), tag="li"), H.li("x"))
+    html = "".join(collect(page, minify=MinifyOptions()))
+
+    assert html.startswith("<ul><li id='zh-p0'><li>x</ul>")
+    assert "<template id='zh-t0'><li>outer<span id='zh-p1'></span></li></template>" in html
+    assert html.endswith("<template id='zh-t1'><b>inner</b></template><script>__zenSwap('zh-',1)</script>")
+
+
+def test_failed_loader_keeps_the_fallback(caplog: pytest.LogCaptureFixture) -> None:
+    async def broken() -> Children:
+        raise RuntimeError("boom")
+
+    page = H.body(H.deferred(broken, fallback="unavailable"), H.deferred(sleeper(0, "ok")))
+    with caplog.at_level(logging.ERROR, logger="H"):
+        html = "".join(collect(page, id_prefix="w"))
+
+    assert "<div id='wp0'>unavailable</div>" in html
+    assert "wt0" not in html and "<template id='wt1'>ok</template>" in html
+    assert "failed to load" in caplog.text
+
+
+def test_closing_the_stream_cancels_pending_loaders() -> None:
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def hang() -> Children:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return ""
+
+    async def run() -> None:
+        stream = astream_tokens(H.body(H.deferred(hang), H.p("x")))
+        async for token in stream:
+            if token == "x":
+                await started.wait()
+                break
+        await stream.aclose()  # type: ignore[attr-defined]
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(run())
+
+
+def test_works_with_async_documents_and_asgi_responses() -> None:
+    async def body() -> AsyncIterator[_HBase]:
+        yield H.h1("Report")
+        yield H.deferred(sleeper(0.01, H.p("chart")), fallback="loading chart")
+
+    sent: list[MutableMapping[str, Any]] = []
+
+    async def receive() -> MutableMapping[str, Any]:
+        await asyncio.Event().wait()
+        return {}
+
+    async def send(message: MutableMapping[str, Any]) -> None:
+        sent.append(message)
+
+    response = ASGIResponse(astream_tokens(Document(body, title="R")))
+    asyncio.run(response({"type": "http", "headers": []}, receive, send))
+    html = b"".join(m.get("body", b"") for m in sent[1:]).decode()
+
+    assert "<h1>Report</h1><div id='zh-p0'>loading chart</div><script>" in html
+    assert html.endswith(
+        "<template id='zh-t0'><p>chart</p></template><script>__zenSwap('zh-',0)</script></body></html>"
+    )
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_asgi_response_sends_the_page_before_loaders_finish(encoding: str) -> None:
+    page = H.html(H.body(H.deferred(sleeper(0.2, H.p("late"))), H.p("early")))
+    chunks: list[tuple[float, bytes]] = []
+
+    async def receive() -> MutableMapping[str, Any]:
+        await asyncio.Event().wait()
+        return {}
+
+    async def run() -> None:
+        start = time.perf_counter()
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message.get("body"):
+                chunks.append((time.perf_counter() - start, message["body"]))
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", encoding.encode())]}
+        await ASGIResponse(astream_tokens(page), compress=True)(scope, receive, send)
+
+    asyncio.run(run())
+    decoder = zlib.decompressobj(31 if encoding == "gzip" else 0)
+    decode = decoder.decompress if encoding == "gzip" else bytes
+    early = b"".join(decode(chunk) for stamp, chunk in chunks if stamp < 0.1)
+    late = b"".join(decode(chunk) for stamp, chunk in chunks if stamp >= 0.1)
+
+    assert early.endswith(b"<div id='zh-p0'></div><p>early</p>")
+    assert late.endswith(
+        b"<template id='zh-t0'><p>late</p></template><script>__zenSwap('zh-',0)</script></body></html>"
+    )
+
+
+def test_rejects_bad_arguments() -> None:
+    with pytest.raises(TypeError):
+        H.deferred("not callable")  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        H.deferred(sleeper(0, ""), tag="img")
+    with pytest.raises(ValueError):
+        H.deferred(sleeper(0, ""), id="x")
+    with pytest.raises(ValueError):
+        collect(H.p("x"), id_prefix="1'); alert(1)//")
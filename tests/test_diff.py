@@ -0,0 +1,106 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=no-untyped-def
+# mypy: disable-error-code=index
+# mypy: disable-error-code=union-attr
+
+import copy
+import json
+import random
+from typing import Any
+
+import pytest
+
+from zen_html import H, diff
+from zen_html._diff import PatchOp
+
+
+def apply(tree: dict[str, Any], ops: list[PatchOp]) -> Any:
+    """Reference applier mirroring HPatch in examples/h_render.js, over dict_ trees."""
+    root: dict[str, Any] = {"children": [copy.deepcopy(tree)]}
+
+    def resolve(path: list[int]) -> Any:
+        node = root["children"][0]
+        for index in path:
+            node = node["children"][index]
+        return node
+
+    def parent_of(path: list[int]) -> tuple[Any, int]:
+        return (resolve(path[:-1]), path[-1]) if path else (root, 0)
+
+    for op in json.loads(json.dumps(ops)):
+        kind = op["op"]
+        if kind in ("replace", "text"):
+            parent, index = parent_of(op["path"])
+            parent["children"][index] = op["node"] if kind == "replace" else op["value"]
+        elif kind == "set_attr":
+            resolve(op["path"])["props"][op["name"]] = op["value"]
+        elif kind == "remove_attr":
+            del resolve(op["path"])["props"][op["name"]]
+        elif kind == "insert":
+            resolve(op["path"])["children"].insert(op["index"], op["node"])
+        elif kind == "remove":
+            del resolve(op["path"])["children"][op["index"]]
+        elif kind == "move":
+            children = resolve(op["path"])["children"]
+            children.insert(op["to"], children.pop(op["from"]))
+    return root["children"][0]
+
+
+def check(old: H, new: H) -> list[PatchOp]:
+    ops = diff(old, new)
+    assert apply(old.dict_, ops) == new.dict_
+    return ops
+
+
+def test_identical_trees_produce_no_ops() -> None:
+    shared = H.p("same")
+    assert diff(H.div(shared, "x"), H.div(shared, "x")) == []
+    assert diff(H.div(H.p("a")), H.div(H.p("a"))) == []
+
+
+def test_text_and_attribute_changes() -> None:
+    ops = check(
+        H.div(H.span("old"), class_="a", title="t"),
+        H.div(H.span("new"), class_="b", hidden=True),
+    )
+    assert {"op": "text", "path": [0, 0], "value": "new"} in ops
+    assert {"op": "set_attr", "path": [], "name": "class", "value": "b"} in ops
+    assert {"op": "remove_attr", "path": [], "name": "title"} in ops
+
+
+def test_tag_change_replaces_node() -> None:
+    ops = check(H.div(H.span("x")), H.div(H.em("x")))
+    assert ops == [{"op": "replace", "path": [0], "node": {"tag": "em", "children": ["x"], "props": {}}}]
+
+
+def test_unkeyed_children_are_appended_and_removed() -> None:
+    check(H.ul(H.li("a")), H.ul(H.li("a"), H.li("b"), "tail"))
+    check(H.ul(H.li("a"), H.li("b"), H.li("c")), H.ul(H.li("a")))
+
+
+def test_keyed_reorder_uses_moves() -> None:
+    old = H.ul(*(H.li(str(i), key=i) for i in range(5)))
+    new = H.ul(*(H.li(str(i), key=i) for i in [4, 0, 1, 2, 3]))
+    ops = check(old, new)
+    assert ops == [{"op": "move", "path": [], "from": 4, "to": 0}]
+
+
+def test_random_keyed_edits_round_trip() -> None:
+    rng = random.Random(7)
+    for _ in range(50):
+        old_keys = rng.sample(range(20), rng.randint(0, 12))
+        new_keys = rng.sample(range(20), rng.randint(0, 12))
+        old = H.ul(*(H.li(f"v{k}", key=k) for k in old_keys), "text")
+        new = H.ul(*(H.li(f"v{k}{rng.random() < 0.2}", key=k) for k in new_keys), "text")
+        check(old, new)
+
+
+def test_duplicate_keys_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        diff(H.ul(H.li("a", key=1)), H.ul(H.li("a", key=1), H.li("b", key=1)))
+
+
+def test_key_is_not_rendered() -> None:
+    node = H.li("a", key="row-1")
+    assert node.html_ == "<li>a</li>"
+    assert node.key_ == "row-1"
@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gzip
+from typing import Any, AsyncIterator, Iterable, Iterator, MutableMapping
+
+import pytest
+
+from zen_html import ASGIResponse, Document, H, MinifyOptions, compress_tokens
+
+HEAD = [H.meta(charset="utf-8"), H.link(rel="preload", href="/app.css", as_="style")]
+
+
+def rows() -> list[H]:
+    return [H.p(f"row {i}") for i in range(3)]
+
+
+def expected_html() -> str:
+    tree = H.html(H.head(*HEAD, H.title("T")), H.body(*rows(), class_="page"), lang="en")
+    return "<!DOCTYPE html>" + tree.html_
+
+
+def test_document_renders_like_a_tree() -> None:
+    document = Document(rows, head=HEAD, title="T", lang="en", body_attrs={"class_": "page"})
+
+    assert "".join(document) == expected_html()
+    assert document.head_html_ == expected_html().split("<body")[0]
+
+
+def test_sync_body_is_evaluated_after_the_head_is_yielded() -> None:
+    events: list[str] = []
+
+    def body() -> Iterator[H]:
+        events.append("body")
+        yield H.p("late")
+
+    tokens = iter(Document(body, head=HEAD))
+    events.append(next(tokens)[-7:])
+    events.append(next(tokens))
+    assert events == ["</head>", "<body>"]
+    assert "".join(tokens) == "<p>late</p></body></html>"
+    assert events[-1] == "body"
+
+
+@pytest.mark.parametrize("kind", ["coroutine function", "awaitable", "async generator", "async iterable"])
+def test_async_bodies(kind: str) -> None:
+    async def load() -> list[H]:
+        await asyncio.sleep(0)
+        return rows()
+
+    async def stream() -> AsyncIterator[H]:
+        for row in rows():
+            await asyncio.sleep(0)
+            yield row
+
+    async def collect() -> str:
+        sources: dict[str, Any] = {
+            "coroutine function": lambda: load,
+            "awaitable": load,
+            "async generator": lambda: stream,
+            "async iterable": stream,
+        }
+        body = sources[kind]()
+        document = Document(body, head=HEAD, title="T", lang="en", body_attrs={"class_": "page"})
+        assert not isinstance(document, Iterable)
+        return "".join([token async for token in document])
+
+    assert asyncio.run(collect()) == expected_html()
+
+
+def test_sync_iteration_rejects_async_results() -> None:
+    async def load() -> str:
+        return "x"
+
+    def deferred() -> Any:
+        return load()
+
+    tokens = iter(Document(deferred))
+    next(tokens), next(tokens)
+    with pytest.raises(TypeError):
+        next(tokens)
+
+
+def test_minified_document() -> None:
+    document = Document([H.p("a  b")], head=HEAD, lang="en", minify=MinifyOptions())
+
+    assert "".join(document) == (
+        "<!DOCTYPE html><html lang=en><head><meta charset=utf-8>"
+        "<link rel=preload href=/app.css as=style><body><p>a b</p>"
+    )
+
+
+def test_head_is_flushed_before_the_body_is_built() -> None:
+    sent: list[MutableMapping[str, Any]] = []
+    seen_at_body: list[int] = []
+
+    def body() -> list[H]:
+        seen_at_body.append(len(sent))
+        return rows()
+
+    async def receive() -> MutableMapping[str, Any]:
+        await asyncio.Event().wait()
+        return {}
+
+    async def send(message: MutableMapping[str, Any]) -> None:
+        sent.append(message)
+
+    document = Document(body, head=HEAD, title="T", lang="en", body_attrs={"class_": "page"})
+    asyncio.run(ASGIResponse(document)({"type": "http", "headers": []}, receive, send))
+
+    # The start message and the head chunk were sent before the body was requested.
+    assert seen_at_body == [2]
+    assert sent[1]["body"] == document.head_html_.encode()
+    assert b"".join(m.get("body", b"") for m in sent[1:]) == expected_html().encode()
+
+    seen_at_body.clear()
+    chunks = compress_tokens(Document(body, head=HEAD))
+    first = next(chunks)
+    assert seen_at_body == []
+    assert gzip.decompress(first + b"".join(chunks)).endswith(b"<p>row 2</p></body></html>")
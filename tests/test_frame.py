@@ -0,0 +1,110 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=import-not-found
+# mypy: disable-error-code=no-untyped-def
+
+from datetime import date
+
+import pytest
+
+from zen_html import H, dataframe_table
+
+pd = pytest.importorskip("pandas")
+
+
+def test_dataframe_table_matches_node_tree() -> None:
+    df = pd.DataFrame(
+        {
+            "qty": [1, 2],
+            "price": [1.5, None],
+            "name": ["a<b", None],
+            "when": [date(2024, 1, 2), date(2024, 3, 4)],
+        },
+        index=pd.Index(["x", "y"], name="key"),
+    )
+    node = dataframe_table(
+        df, formatters={"price": "{:.2f}"}, na_rep="-", cell_attrs={"qty": {"class_": "num"}}
+    )
+    expected = H.table(
+        H.thead(H.tr(H.th("key"), H.th("qty"), H.th("price"), H.th("name"), H.th("when"))),
+        H.tbody(
+            H.tr(H.th("x"), H.td("1", class_="num"), H.td("1.50"), H.td("a<b"), H.td("2024-01-02")),
+            H.tr(H.th("y"), H.td("2", class_="num"), H.td("-"), H.td("-"), H.td("2024-03-04")),
+        ),
+    )
+
+    assert node.html_ == expected.html_
+    assert node.dict_ == expected.dict_
+
+
+def test_dataframe_table_without_index_and_header() -> None:
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    node = dataframe_table(df, index=False, header=False, class_="t")
+
+    assert (
+        node.html_
+        == "<table class='t'><tbody><tr><td>1</td><td>x</td></tr><tr><td>2</td><td>y</td></tr></tbody></table>"
+    )
+
+
+def test_dataframe_table_accepts_nodes_and_raw_markup_from_formatters() -> None:
+    df = pd.DataFrame({"link": ["/a", "/b&c"]})
+    node = dataframe_table(df, index=False, header=False, formatters=lambda v: H.a(v, href=v))
+
+    assert "<td><a href='/b&amp;c'>/b&amp;c</a></td>" in node.html_
+
+
+def test_dataframe_table_datetimes_and_missing_values() -> None:
+    df = pd.DataFrame(
+        {"ts": pd.to_datetime(["2024-01-02 03:04:05", None]), "n": pd.array([1, None], dtype="Int64")}
+    )
+    html = dataframe_table(df, index=False, header=False, na_rep="n/a").html_
+
+    assert "<td>2024-01-02T03:04:05</td><td>1</td>" in html
+    assert "<td>n/a</td><td>n/a</td>" in html
+
+
+def test_dataframe_table_rejects_unknown_formatter_columns() -> None:
+    with pytest.raises(KeyError):
+        dataframe_table(pd.DataFrame({"a": [1]}), formatters={"b": "{}"})
+
+
+def test_dataframe_table_groups_multiindex_rows_under_their_parent() -> None:
+    index = pd.MultiIndex.from_tuples(
+        [("A", "x", 1), ("A", "x", 2), ("A", "y", 1), ("B", "y", 1), ("A", "y", 2)], names=["r", "c", "n"]
+    )
+    df = pd.DataFrame({"v": [1, 2, 3, 4, 5]}, index=index)
+    node = dataframe_table(df, header=False)
+    expected = H.table(
+        H.tbody(
+            H.tr(H.th("A", rowspan=3), H.th("x", rowspan=2), H.th("1"), H.td("1")),
+            H.tr(H.th("2"), H.td("2")),
+            H.tr(H.th("y"), H.th("1"), H.td("3")),
+            # "y" repeats under a new parent, and "A" is not merged with a non-adjacent run.
+            H.tr(H.th("B"), H.th("y"), H.th("1"), H.td("4")),
+            H.tr(H.th("A"), H.th("y"), H.th("2"), H.td("5")),
+        )
+    )
+
+    assert node.html_ == expected.html_
+    assert node.dict_ == expected.dict_
+
+
+def test_dataframe_table_groups_multiindex_columns_into_header_rows() -> None:
+    columns = pd.MultiIndex.from_tuples([("Q1", "web"), ("Q1", "shop"), ("Q2", "web"), ("Q1", "app")])
+    df = pd.DataFrame([[1, 2, 3, 4]], columns=columns, index=pd.Index(["APAC"], name="region"))
+    node = dataframe_table(df)
+    expected = H.thead(
+        H.tr(H.th("region", rowspan=2), H.th("Q1", colspan=2), H.th("Q2"), H.th("Q1")),
+        H.tr(H.th("web"), H.th("shop"), H.th("web"), H.th("app")),
+    )
+
+    assert node.html_.startswith("<table>" + expected.html_ + "<tbody><tr><th>APAC</th><td>1</td>")
+
+
+def test_dataframe_table_without_sparsify_repeats_labels() -> None:
+    index = pd.MultiIndex.from_tuples([("A", "x"), ("A", "y")], names=["r", "c"])
+    columns = pd.MultiIndex.from_tuples([("Q1", "web"), ("Q1", "shop")])
+    html = dataframe_table(pd.DataFrame([[1, 2], [3, 4]], index=index, columns=columns), sparsify=False).html_
+
+    assert "<thead><tr><th>r</th><th>c</th><th>Q1 / web</th><th>Q1 / shop</th></tr></thead>" in html
+    assert "<tr><th>A</th><th>y</th><td>3</td><td>4</td></tr>" in html
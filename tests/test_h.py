@@ -202,3 +202,22 @@ def test_invalid_literal_is_removed_in_non_strict_mode() -> None:
         assert "type=" not in html
     finally:
         H.strict_validation = old
+
+
+def test_fragment_renders_children_without_wrapper() -> None:
+    rows = H.fragment(H.tr(H.td("a")), [H.tr(H.td("b"))])
+    assert rows.html_ == "<tr><td>a</td></tr><tr><td>b</td></tr>"
+    assert "".join(rows.to_token()) == rows.html_
+    assert rows.dict_["tag"] is None
+    assert "".join(H.fragment(rows, "!").to_token()) == rows.html_ + "!"
+
+
+def test_fragment_is_spliced_into_parent() -> None:
+    options = H.fragment(children=[H.option("x", value="1"), H.option("y", value="2")])
+    node = H.select(options, H.fragment(H.fragment("tail")))
+    assert node.html_ == "<select><option value='1'>x</option><option value='2'>y</option>tail</select>"
+    assert len(node.dict_["children"]) == 3
+
+
+def test_empty_fragment_is_allowed_inside_void_tag() -> None:
+    assert H("br", H.fragment()).html_ == "<br/>"
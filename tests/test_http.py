@@ -0,0 +1,261 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gzip
+import io
+import threading
+from typing import Any, AsyncIterator, Iterator, MutableMapping
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from zen_html import ASGIResponse, H, ResponseCache, TableStream, WSGIResponse
+
+
+def page(rows: int = 3000) -> H:
+    return H.html(H.head(H.title("t")), H.body(H.ul(H.li(f"row {i}") for i in range(rows))))
+
+
+def run_asgi(
+    app: Any,
+    *,
+    method: str = "GET",
+    headers: dict[str, str] | None = None,
+    disconnect_after: int | None = None,
+) -> list[dict[str, Any]]:
+    """Drive an ASGI app in-process; the client disconnects after `disconnect_after` body messages."""
+    sent: list[dict[str, Any]] = []
+    scope = {
+        "type": "http",
+        "method": method,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+
+    async def main() -> None:
+        body_sent = asyncio.Event()
+
+        async def receive() -> dict[str, Any]:
+            if disconnect_after is None:
+                await asyncio.Event().wait()
+            while sum(m["type"] == "http.response.body" for m in sent) < (disconnect_after or 0):
+                body_sent.clear()
+                await body_sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+            body_sent.set()
+            await asyncio.sleep(0)
+
+        await asyncio.wait_for(app(scope, receive, send), 10)
+
+    asyncio.run(main())
+    return sent
+
+
+def run_wsgi(app: Any, **environ: str) -> tuple[str, dict[str, str], list[bytes]]:
+    env: dict[str, Any] = {"wsgi.input": io.BytesIO(), **environ}
+    setup_testing_defaults(env)
+    started: list[Any] = []
+    body = app(env, lambda status, headers: started.extend((status, headers)))
+    try:
+        chunks = list(body)
+    finally:
+        getattr(body, "close", lambda: None)()
+    return started[0], dict(started[1]), chunks
+
+
+def body_of(messages: list[dict[str, Any]]) -> bytes:
+    return b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+
+
+def test_asgi_streams_node_in_socket_sized_chunks() -> None:
+    node = page()
+    messages = run_asgi(ASGIResponse(node, include_doctype=True, chunk_size=4096))
+    start, *body = messages
+    headers = dict(start["headers"])
+
+    assert start["status"] == 200
+    assert headers[b"content-type"] == b"text/html; charset=utf-8"
+    assert b"content-length" not in headers
+    assert body_of(messages) == b"<!DOCTYPE html>" + node.html_.encode()
+    # The head goes out on its own, then the body in chunks of about chunk_size.
+    assert body[0]["body"] == b"<!DOCTYPE html><html><head><title>t</title></head>"
+    assert all(4096 <= len(m["body"]) < 4096 + 64 for m in body[1:-2])
+    assert body[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_asgi_prerendered_body_has_content_length() -> None:
+    html = page(3).html_
+    for content in (html, html.encode()):
+        start, message = run_asgi(ASGIResponse(content, include_doctype=True))
+        expected = b"<!DOCTYPE html>" + html.encode()
+        assert dict(start["headers"])[b"content-length"] == str(len(expected)).encode()
+        assert message == {"type": "http.response.body", "body": expected}
+
+
+def test_asgi_serves_cache_entries_and_compressed_streams() -> None:
+    entry = ResponseCache().render_entry(page(3))
+    start, message = run_asgi(ASGIResponse(entry), headers={"Accept-Encoding": "gzip"})
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert message["body"] == entry.gzip_body
+
+    messages = run_asgi(ASGIResponse(page(), compress=True), headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert dict(messages[0]["headers"])[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body_of(messages)) == page().html_.encode()
+
+    messages = run_asgi(ASGIResponse(page(), compress=True), headers={"Accept-Encoding": "identity"})
+    assert b"content-encoding" not in dict(messages[0]["headers"])
+
+
+def test_asgi_etag_and_head_skip_rendering() -> None:
+    response = ASGIResponse(H.div("x"), etag=True)
+    etag = response.etag
+    assert etag is not None
+
+    messages = run_asgi(response, headers={"If-None-Match": f"W/{etag}"})
+    assert messages[0]["status"] == 304
+    assert dict(messages[0]["headers"])[b"etag"] == etag.encode()
+    assert body_of(messages) == b""
+
+    class Unrendered:
+        def __iter__(self) -> Iterator[str]:
+            raise AssertionError("rendered")
+
+    messages = run_asgi(ASGIResponse(Unrendered()), method="HEAD")
+    assert messages[0]["status"] == 200 and body_of(messages) == b""
+
+
+def test_asgi_stops_rendering_sync_stream_on_disconnect() -> None:
+    produced = 0
+    closed = threading.Event()
+
+    def rows() -> Iterator[str]:
+        nonlocal produced
+        try:
+            while True:
+                produced += 1
+                yield "<p>row</p>" * 100
+        finally:
+            closed.set()
+
+    messages = run_asgi(ASGIResponse(rows(), chunk_size=1024), disconnect_after=3)
+
+    assert closed.is_set()
+    assert produced < 20
+    assert messages[-1].get("more_body") is True
+
+
+def test_asgi_stops_rendering_async_stream_on_disconnect() -> None:
+    closed = False
+
+    async def rows() -> AsyncIterator[tuple[int]]:
+        nonlocal closed
+        i = 0
+        try:
+            while True:
+                i += 1
+                yield (i,)
+                await asyncio.sleep(0)
+        finally:
+            closed = True
+
+    stream = TableStream(rows(), flush_rows=10)
+    messages = run_asgi(ASGIResponse(stream, chunk_size=256), disconnect_after=2)
+
+    assert closed
+    assert body_of(messages).startswith(b"<table><tbody><tr><td>1</td></tr>")
+
+
+def test_asgi_stops_when_send_fails() -> None:
+    closed = threading.Event()
+
+    def rows() -> Iterator[str]:
+        try:
+            while True:
+                yield "<p>row</p>" * 100
+        finally:
+            closed.set()
+
+    async def main() -> None:
+        async def receive() -> dict[str, Any]:
+            await asyncio.Event().wait()
+            return {}
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.body":
+                raise ConnectionResetError
+
+        await ASGIResponse(rows())({"type": "http", "headers": []}, receive, send)
+
+    asyncio.run(main())
+    assert closed.is_set()
+
+
+def test_wsgi_streams_and_sets_content_length() -> None:
+    status, headers, chunks = run_wsgi(WSGIResponse(page(), chunk_size=8192))
+    assert status == "200 OK"
+    assert "Content-Length" not in headers
+    assert b"".join(chunks) == page().html_.encode()
+    assert len(chunks) > 2
+
+    status, headers, chunks = run_wsgi(WSGIResponse("<p>hi</p>", status_code=404))
+    assert status == "404 Not Found"
+    assert headers["Content-Length"] == "9" and chunks == [b"<p>hi</p>"]
+
+
+def test_wsgi_compression_and_etag() -> None:
+    response = WSGIResponse(page(), compress=True, etag=True)
+    _, headers, chunks = run_wsgi(response, HTTP_ACCEPT_ENCODING="gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(chunks)) == page().html_.encode()
+
+    gzip_etag = headers["ETag"]
+    assert response.etag is not None and gzip_etag == response.etag[:-1] + '-gzip"'
+    assert headers["Vary"] == "Accept-Encoding"
+
+    status, headers, chunks = run_wsgi(response, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzip_etag)
+    assert status == "304 Not Modified" and chunks == [] and headers["ETag"] == gzip_etag
+    # The identity body is another representation and does not match the gzip tag.
+    status, headers, chunks = run_wsgi(response, HTTP_IF_NONE_MATCH=gzip_etag)
+    assert status.startswith("200") and headers["ETag"] == response.etag
+    assert b"".join(chunks) == page().html_.encode()
+
+    cached = WSGIResponse(ResponseCache().render_entry(page()), etag=True)
+    _, zipped, _ = run_wsgi(cached, HTTP_ACCEPT_ENCODING="gzip")
+    _, plain, _ = run_wsgi(cached)
+    assert zipped["ETag"] == plain["ETag"][:-1] + '-gzip"' and zipped["Content-Encoding"] == "gzip"
+    status, _, _ = run_wsgi(cached, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain["ETag"])
+    assert status.startswith("200")
+
+
+def test_wsgi_close_stops_rendering() -> None:
+    closed = False
+
+    def rows() -> Iterator[str]:
+        nonlocal closed
+        try:
+            while True:
+                yield "<p>row</p>"
+        finally:
+            closed = True
+
+    env: dict[str, Any] = {}
+    setup_testing_defaults(env)
+    body = WSGIResponse(rows(), chunk_size=100)(env, lambda *args: None)
+    first = next(iter(body))
+    body.close()  # type: ignore[attr-defined]
+
+    assert first.startswith(b"<p>row</p>") and closed
+
+
+def test_rejects_bad_arguments() -> None:
+    async def rows() -> AsyncIterator[str]:
+        yield ""
+
+    with pytest.raises(ValueError):
+        ASGIResponse("", chunk_size=0)
+    with pytest.raises(TypeError):
+        WSGIResponse(rows())({}, lambda *args: None)
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import pytest
+
+from zen_html import Document, H, MinifyOptions, TransformPipeline, csp_nonce
+
+
+class Markup(str):
+    """Markup-safe string as produced by MarkupSafe or Django's SafeString."""
+
+    def __html__(self) -> str:
+        return self
+
+
+class Widget:
+    """Non-string object rendering itself through `__html__`."""
+
+    def __html__(self) -> str:
+        return "<i>widget</i>"
+
+
+def test_html_strings_are_kept_and_not_escaped() -> None:
+    bold = Markup("<b>a &amp; b</b>")
+    node = H.div(bold, "x<y", Widget(), H.span("s"), title=Markup("a &amp; b"))
+    expected = H.div(
+        H.RAW_STR("<b>a &amp; b</b>"),
+        "x<y",
+        H.RAW_STR("<i>widget</i>"),
+        H.span("s"),
+        title=H.RAW_STR("a &amp; b"),
+    )
+
+    assert node.children_[0] is bold and node.props_["title"] == "a &amp; b"
+    assert node.html_ == "<div title='a &amp; b'><b>a &amp; b</b>x&lt;y<i>widget</i><span>s</span></div>"
+    assert next(token for token in node.to_token() if token == bold) is bold
+    assert (
+        node.minified_html_
+        == "<div title='a &amp; b'><b>a &amp; b</b>x&lt;y<i>widget</i><span>s</span></div>"
+    )
+    assert node == expected and node.hash_ == expected.hash_ and node.dict_ == expected.dict_
+    assert H.div("<b>") != H.div(Markup("<b>"))
+
+    page = H.ul(H.li(Markup("<em>1</em>")), Widget())
+    assert "".join(Document([page], title="t")).endswith(
+        "<ul><li><em>1</em></li><i>widget</i></ul></body></html>"
+    )
+    assert TransformPipeline().apply(page).html_ == page.html_
+    assert (
+        "<td><em>1</em></td><td><i>widget</i></td>"
+        in H.table(H.table_rows([(Markup("<em>1</em>"), Widget())])).html_
+    )
+
+    class Broken:
+        def __html__(self) -> bytes:
+            return b"<b>"
+
+    with pytest.raises(TypeError):
+        H.div(Broken())  # type: ignore[arg-type]
+
+
+def test_table_rows_cells_match_their_node_tree() -> None:
+    rows = [(Markup("<em>1</em>"), Widget()), ("<x>", None)]
+    table_rows = H.tbody(H.table_rows(rows))
+    expected = H.tbody(H.tr(H.td(Markup("<em>1</em>")), H.td(Widget())), H.tr(H.td("<x>"), H.td()))
+
+    assert table_rows.html_ == expected.html_
+    assert table_rows == expected
+    assert table_rows.hash_ == expected.hash_ and table_rows.dict_ == expected.dict_
+
+
+def test_nodes_expose_cached_html() -> None:
+    node = H.div(H.p("a < b"), H.script(src="/a.js"))
+    assert node.__html__() == node.html_
+    assert node.__html__() is node.__html__()
+    assert H.RAW_STR("<b>").__html__() == "<b>"
+
+    assert (
+        node.with_props(id="x").__html__() == "<div id='x'><p>a &lt; b</p><script src='/a.js'></script></div>"
+    )
+    with csp_nonce("n"):
+        assert "nonce='n'" in node.__html__()
+    assert "nonce" not in node.__html__()
+    assert H.div(node).__html__() == f"<div>{node.html_}</div>"
+    assert "".join(node.to_token(MinifyOptions())) == node.minified_html_
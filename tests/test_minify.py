@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from zen_html import H, MinifyOptions, TableStream, dataframe_table
+from zen_html._base import _HBase
+
+
+def test_minified_document() -> None:
+    page = H.html(
+        H.head(H.meta(charset="utf-8"), H.title("Report")),
+        H.body(
+            H.p("Totals  for\n  Q1", class_="lead"),
+            H.ul(H.li(H.a("one", href="/a?x=1&y=2")), H.li("two", title="a b")),
+            H.select(H.option("A", value="a", selected=True), H.option("B", value="b"), name="s"),
+        ),
+        lang="en",
+    )
+
+    assert page.minified_html_ == (
+        "<html lang=en><head><meta charset=utf-8><title>Report</title>"
+        "<body><p class=lead>Totals for Q1"
+        "<ul><li><a href='/a?x=1&amp;y=2'>one</a><li title='a b'>two</ul>"
+        "<select name=s><option value=a selected>A<option value=b>B</select>"
+    )
+
+
+def test_options_can_be_enabled_separately() -> None:
+    node = H.ul(H.li("a  b", class_="x"), H.li("c"))
+
+    assert "".join(node.to_token(MinifyOptions(omit_end_tags=False, collapse_whitespace=False))) == (
+        "<ul><li class=x>a  b</li><li>c</li></ul>"
+    )
+    assert "".join(node.to_token(MinifyOptions(unquoted_attrs=False, collapse_whitespace=False))) == (
+        "<ul><li class='x'>a  b<li>c</ul>"
+    )
+    assert H.br().minified_html_ == "<br>"
+
+
+def test_end_tags_kept_where_position_is_unknown_or_required() -> None:
+    # The root's end tag stays: whatever follows the rendered markup is unknown.
+    assert H.li("a").minified_html_ == "<li>a</li>"
+    # Text or raw HTML after an element may close it differently.
+    assert H.ul(H.li("a"), H.RAW_STR("<li>b</li>")).minified_html_ == "<ul><li>a</li><li>b</li></ul>"
+    # A <p> at the end of an <a> (or followed by phrasing content) must be closed.
+    assert H.div(H.a(H.p("x")), H.p("y"), H.span("z")).minified_html_ == (
+        "<div><a><p>x</p></a><p>y</p><span>z</span></div>"
+    )
+    # So must a <p> at the end of an autonomous custom element.
+    assert H.div(_HBase("my-card", H.p("x")), H.section(H.p("y"))).minified_html_ == (
+        "<div><my-card><p>x</p></my-card><section><p>y</section></div>"
+    )
+    # <li> outside a list is left alone.
+    assert H.div(H.li("a"), H.li("b")).minified_html_ == "<div><li>a</li><li>b</li></div>"
+
+
+def test_whitespace_is_preserved_in_pre_and_textarea() -> None:
+    node = H.div(H.pre("a\n  b"), H.textarea("c  d"), " e \n f ")
+
+    assert node.minified_html_ == "<div><pre>a\n  b</pre><textarea>c  d</textarea> e f </div>"
+
+
+def test_minified_table_rows_and_columns() -> None:
+    rows = [(1, "a  b"), (2, "c")]
+    expected = "<table><tbody><tr><td class=n>1<td>a b<tr><td class=n>2<td>c</table>"
+
+    assert H.table(H.tbody(H.table_rows(rows, cell_attrs={0: {"class_": "n"}}))).minified_html_ == expected
+    columns = H.table_columns({"n": [1, 2], "s": ["a b", "c"]}, cell_attrs={"n": {"class_": "n"}})
+    assert H.table(H.tbody(columns)).minified_html_ == expected
+    # Followed by something other than a row, the last row keeps its end tag.
+    mixed = H.tbody(H.table_rows(rows[:1]), H.RAW_STR("<tr><td>raw</td></tr>"))
+    assert mixed.minified_html_ == "<tbody><tr><td>1<td>a b</tr><tr><td>raw</td></tr></tbody>"
+
+
+def test_minified_table_stream() -> None:
+    stream = TableStream([(1, "x")], header=["N", "Label"], minify=MinifyOptions(), class_="r")
+
+    assert "".join(stream) == "<table class=r><thead><tr><th>N<th>Label<tbody><tr><td>1<td>x</table>"
+
+
+def test_minified_dataframe_table_with_spans() -> None:
+    import pytest
+
+    pd = pytest.importorskip("pandas")
+    index = pd.MultiIndex.from_tuples([("A", "x"), ("A", "y")])
+    html = dataframe_table(pd.DataFrame({"v": [1, 2]}, index=index), header=False).minified_html_
+
+    assert html == "<table><tbody><tr><th rowspan=2>A<th>x<td>1<tr><th>y<td>2</table>"
@@ -0,0 +1,235 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gzip
+import io
+import threading
+import zlib
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from zen_html import (
+    ASGIResponse,
+    Document,
+    H,
+    MinifyOptions,
+    PrefixURLs,
+    ResponseCache,
+    SharedFragmentCache,
+    TransformPipeline,
+    WSGIResponse,
+    abind_nonce,
+    astream_tokens,
+    bind_nonce,
+    compress_tokens,
+    csp_nonce,
+    new_nonce,
+)
+from zen_html._shared_cache import NONCE_SLOTS_KEY
+from zen_html._static import _StaticHTML
+
+
+def page() -> H:
+    return H.html(
+        H.head(
+            H.link(rel="stylesheet", href="/site.css"),
+            H.style("p { color: red }"),
+            H.script(src="/app.js"),
+        ),
+        H.body(H.p("héllo"), H.script("init()", nonce="own")),
+    )
+
+
+def test_nonce_is_added_to_script_style_and_link_tags() -> None:
+    assert page().html_.count("nonce") == 1
+
+    with csp_nonce("abc") as nonce:
+        html = page().html_
+        minified = "".join(page().to_token(MinifyOptions()))
+
+    assert nonce == "abc"
+    assert "<link rel='stylesheet' href='/site.css' nonce='abc'/>" in html
+    assert "<style nonce='abc'>p { color: red }</style>" in html
+    assert "<script src='/app.js' nonce='abc'></script>" in html
+    assert "<script nonce='own'>init()</script>" in html and html.count("nonce=") == 4
+    assert "<link rel=stylesheet href=/site.css nonce='abc'>" in minified
+    assert "<style nonce='abc'>" in minified and "<p>héllo" in minified
+    assert "nonce" not in page().html_.replace("nonce='own'", "")
+
+    with csp_nonce() as fresh:
+        assert fresh != new_nonce() and len(fresh) >= 22
+    with csp_nonce("<'>"):
+        assert H.style().html_ == "<style nonce='&lt;&#x27;&gt;'></style>"
+
+
+def test_static_markup_is_cached_once_for_every_nonce() -> None:
+    header = H.static(H.header(H.script(src="/a.js"), H.p("x"), H.link(rel="icon", href="/i.png")))
+    plain = header.html_
+    cached = next(iter(header.to_token()))
+    assert type(cached) is _StaticHTML and cached == plain
+    assert cached.nonce_slots == (len("<header><script src='/a.js'"), plain.index("/></header>"))
+
+    for nonce in ("n1", "n2"):
+        with csp_nonce(nonce):
+            tokens = list(H.div(header).to_token())
+        html = "".join(tokens)
+        assert html.count(f" nonce='{nonce}'") == 2
+        assert html.replace(f" nonce='{nonce}'", "") == f"<div>{plain}</div>"
+        assert [token for token in tokens if type(token) is _StaticHTML] == list(
+            cached.with_nonce(nonce)[::2]
+        )
+    assert next(iter(header.to_token())) is cached
+
+    with csp_nonce("n1"):
+        minified = "".join(header.to_token(MinifyOptions()))
+        compressed = b"".join(compress_tokens(H.div(header).to_token()))
+    assert minified == (
+        "<header><script src=/a.js nonce='n1'></script><p>x</p><link rel=icon href=/i.png nonce='n1'>"
+        "</header>"
+    )
+    assert zlib.decompress(compressed, 16 + zlib.MAX_WBITS).decode().count("nonce='n1'") == 2
+
+
+def test_cache_entries_store_nonce_free_bodies_and_splice_nonces() -> None:
+    cache = ResponseCache()
+    with csp_nonce("ignored"):
+        entry = cache.get_or_render("home", page)
+    plain = ("<!DOCTYPE html>" + page().html_).encode()
+
+    assert entry.body == plain and gzip.decompress(entry.gzip_body or b"") == plain
+    assert len(entry.nonce_slots) == 3
+    assert entry.select("gzip", nonce=None) == (entry.gzip_body, "gzip")
+
+    body, encoding = entry.select("", nonce="abc")
+    assert encoding is None and body.count(b"nonce='abc'") == 3
+    assert body.replace(b" nonce='abc'", b"") == plain
+    with csp_nonce("abc"):
+        assert body == ("<!DOCTYPE html>" + page().html_).encode()
+
+    zipped, encoding = entry.select("gzip", nonce="xyz")
+    assert encoding == "gzip" and gzip.decompress(zipped) == body.replace(b"abc", b"xyz")
+
+
+def test_responses_render_with_their_nonce() -> None:
+    entry = ResponseCache().render_entry(page())
+
+    def run_asgi(app: Any) -> bytes:
+        sent: list[dict[str, Any]] = []
+        scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+
+        async def receive() -> dict[str, Any]:
+            await asyncio.Event().wait()
+            return {}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        asyncio.run(app(scope, receive, send))
+        body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+        return gzip.decompress(body) if (b"content-encoding", b"gzip") in sent[0]["headers"] else body
+
+    for content in (page(), Document([H.script("x")], title="t"), entry):
+        assert b"nonce='r1'" in run_asgi(ASGIResponse(content, nonce="r1", compress=True))
+    assert run_asgi(ASGIResponse(page(), nonce="r2")).count(b"nonce='r2'") == 3
+
+    async def tokens() -> Any:
+        for token in H.style("p {}").to_token():
+            yield token
+
+    assert run_asgi(ASGIResponse(tokens(), nonce="r3")) == b"<style nonce='r3'>p {}</style>"
+
+    env: dict[str, Any] = {"wsgi.input": io.BytesIO()}
+    setup_testing_defaults(env)
+    body = b"".join(WSGIResponse(page(), nonce="w1", minify=MinifyOptions())(env, lambda *args: None))
+    assert body.count(b"nonce='w1'") == 3 and b"<p>h" in body
+    with pytest.raises(ValueError):
+        WSGIResponse(page(), nonce="w1", etag=True)
+
+
+def test_bind_nonce_applies_in_the_consuming_thread() -> None:
+    results: dict[str, str] = {}
+    streams = {nonce: bind_nonce(H.div(H.script("x"), H.p("y")), nonce) for nonce in ("a", "b", "c")}
+
+    def consume(nonce: str) -> None:
+        results[nonce] = "".join(streams[nonce])
+
+    threads = [threading.Thread(target=consume, args=(nonce,)) for nonce in streams]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {nonce: f"<div><script nonce='{nonce}'>x</script><p>y</p></div>" for nonce in streams}
+    assert H.script().html_ == "<script></script>"
+
+
+def test_streamed_and_transformed_markup_carries_the_nonce() -> None:
+    async def load() -> H:
+        await asyncio.sleep(0)
+        return H.script(src="/late.js")
+
+    tree = H.html(H.body(H.deferred(load, fallback=H.p("wait"))))
+
+    async def stream() -> str:
+        return "".join([token async for token in abind_nonce(astream_tokens(tree), "s1")])
+
+    html = asyncio.run(stream())
+    assert html.count("<script nonce='s1'>") == 2
+    assert "<template id='zh-t0'><script src='/late.js' nonce='s1'></script></template>" in html
+
+    pipeline = TransformPipeline(PrefixURLs("https://cdn.example.com"))
+    with csp_nonce("t1"):
+        transformed = pipeline.apply(H.static(H.script(src="/a.js")), H.link(rel="icon", href="/i.png")).html_
+    assert transformed == (
+        "<script src='https://cdn.example.com/a.js' nonce='t1'></script>"
+        "<link rel='icon' href='https://cdn.example.com/i.png' nonce='t1'/>"
+    )
+    assert (
+        pipeline.apply(H.static(H.script(src="/a.js"))).html_
+        == "<script src='https://cdn.example.com/a.js'></script>"
+    )
+
+
+def test_document_heads_carry_the_nonce_of_each_render() -> None:
+    document = Document(
+        [H.script("body()")], head=[H.script(src="/a.js"), H.link(rel="stylesheet", href="/s.css")]
+    )
+    plain = document.head_html_
+    assert "nonce" not in plain
+
+    html = "".join(bind_nonce(document, "N"))
+    assert "<script src='/a.js' nonce='N'></script><link rel='stylesheet' href='/s.css' nonce='N'/>" in html
+    assert "<script nonce='N'>body()</script>" in html
+    with csp_nonce("M"):
+        assert document.head_html_ == plain.replace("'/a.js'", "'/a.js' nonce='M'").replace(
+            "'/s.css'", "'/s.css' nonce='M'"
+        )
+    assert document.head_html_ == plain
+
+    async def body() -> H:
+        return H.p("x")
+
+    async def stream() -> str:
+        return "".join([token async for token in abind_nonce(Document(body, head=[H.style("p {}")]), "A")])
+
+    assert "<style nonce='A'>p {}</style>" in asyncio.run(stream())
+
+
+def test_shared_fragments_are_stored_without_a_nonce(tmp_path: Any) -> None:
+    footer = H.footer(H.script(src="/f.js"), H.p("©"))
+    with SharedFragmentCache(tmp_path / "fragments", capacity=4096, slots=64) as fragments:
+        with csp_nonce("AAA"):
+            first = fragments.get_or_render(footer)
+        assert bytes(first).decode() == "<footer><script src='/f.js' nonce='AAA'></script><p>©</p></footer>"
+        assert bytes(fragments.get_or_render(footer)).decode() == footer.html_
+        with csp_nonce("BBB"):
+            assert bytes(fragments.get_or_render(footer)) == bytes(first).replace(b"AAA", b"BBB")
+        assert bytes(fragments.get(footer) or b"") == footer.html_.encode()
+        assert fragments.delete(NONCE_SLOTS_KEY + footer.hash_)
+        with csp_nonce("DDD"):
+            assert bytes(fragments.get_or_render(footer)) == bytes(first).replace(b"AAA", b"DDD")
+
+        with csp_nonce("CCC"):
+            assert bytes(fragments.get_or_render(H.p("x"))) == b"<p>x</p>"
@@ -0,0 +1,108 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import pytest
+
+from zen_html import H
+from zen_html._base import _HBase
+
+
+def page() -> H:
+    return H.html(
+        H.body(
+            H.static(H.header(H.a("home", href="/", class_="nav"), id="top")),
+            H.main(
+                "intro ",
+                H.ul(
+                    H.li(H.a(f"item {i}", href=f"/items/{i}", class_=["nav", "item"]), key=i)
+                    for i in range(5)
+                ),
+                H.p(H.a("external", href="https://example.com", class_="external")),
+                id="main",
+            ),
+            H.table(H.tbody(H.table_rows([(1, "a"), (2, "b")]))),
+        )
+    )
+
+
+def test_find_by_id_and_find_all() -> None:
+    tree = page()
+
+    main = tree.find_by_id("main")
+    assert main is not None and main.tag_ == "main" and main.props_["id"] == "main"
+    assert tree.find_by_id("missing") is None
+    assert tree.find_by_id("top") is not None  # inside H.static
+
+    links = tree.find_all("a")
+    assert [link.children_[0] for link in links] == ["home", *(f"item {i}" for i in range(5)), "external"]
+    assert len(tree.find_all(class_="nav")) == 6
+    assert [a.props_["href"] for a in tree.find_all("a", class_="item nav")] == [
+        f"/items/{i}" for i in range(5)
+    ]
+    assert tree.find_all(class_=["item", "external"]) == []
+    assert [li.key_ for li in tree.find_all(key=3)] == [3]
+    assert [td.children_ for td in tree.find_all("td")] == [("1",), ("a",), ("2",), ("b",)]
+    assert tree.find_all("span") == [] and tree.find_all(id="top", tag="footer") == []
+    external = tree.find_all(where=lambda n: str(n.props_.get("href", "")).startswith("https:"))
+    assert [n.children_ for n in external] == [("external",)]
+    assert len(tree.find_all()) == len(list(tree.walk()))
+    assert tree.find_all("html") == [tree]
+    with pytest.raises(TypeError):
+        tree.props_["id"] = "x"  # type: ignore[index]
+
+
+def test_walk_and_paths_work_with_replace_at() -> None:
+    tree = page()
+    walked = list(tree.walk())
+
+    assert walked[0] == ((), tree)
+    assert all(tree.path_of(node) == path for path, node in walked)
+    # The static header and the table rows count as one child each.
+    assert [path for path, node in walked if node.tag_ in ("header", "tr")] == [
+        (0, 0, 0),
+        (0, 2, 0, 0, 0),
+        (0, 2, 0, 0, 1),
+    ]
+
+    rewritten = tree
+    for link in tree.find_all("a", class_="item"):
+        href = str(link.props_["href"])
+        rewritten = rewritten.replace_at(tree.path_of(link), link.with_props(href="/v2" + href))
+    assert [a.props_["href"] for a in rewritten.find_all("a", class_="item")] == [
+        f"/v2/items/{i}" for i in range(5)
+    ]
+    assert tree.find_all("a", class_="item")[0].props_["href"] == "/items/0"
+
+    with pytest.raises(ValueError):
+        tree.path_of(H.a("home", href="/", class_="nav"))
+    assert list(H.fragment(H.b("x"), "y").walk()) == [((0,), H.b("x"))]
+
+
+def cached_index(node: _HBase) -> object:
+    return node._index
+
+
+def test_index_is_cached_and_not_shared_with_derived_nodes() -> None:
+    tree = page()
+    assert cached_index(tree) is None
+
+    first = tree.find_all("li")
+    index = cached_index(tree)
+    assert index is not None and tree.find_all("li") == first and cached_index(tree) is index
+
+    main = tree.find_by_id("main")
+    assert main is not None
+    updated = tree.replace_at(tree.path_of(main), main.with_props(id="content"))
+    assert cached_index(updated) is None
+    assert updated.find_by_id("main") is None and updated.find_by_id("content") is not None
+    assert tree.find_by_id("main") is main
+    assert cached_index(tree.with_props(lang="en")) is None
+
+
+def test_deep_trees_are_indexed_without_recursion() -> None:
+    node: _HBase = H.span("leaf", id="leaf")
+    for _ in range(5000):
+        node = H.div(node)
+
+    leaf = node.find_by_id("leaf")
+    assert leaf is not None and len(node.path_of(leaf)) == 5000
+    assert sum(1 for _ in node.walk()) == 5001
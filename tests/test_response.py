@@ -3,10 +3,13 @@
 # mypy: disable-error-code=no-untyped-def
 # mypy: disable-error-code=unused-ignore
 
+import asyncio
+
 import pytest
 
 from starlette.testclient import TestClient
 
+from zen_html import astream_tokens
 from zen_html.h import H
 from examples.sample import HResponse, HtmlDocument
 
@@ -31,6 +34,13 @@ def test_hresponse_from_tree() -> None:
     assert body == b"<p>hello</p>"
 
 
+def test_hresponse_from_fragment() -> None:
+    response = HResponse(H.fragment(H.li("a"), H.li("b")), etag=True)
+
+    assert collect_body(response) == b"<li>a</li><li>b</li>"
+    assert response.etag is not None
+
+
 def test_hresponse_from_token_stream_with_doctype() -> None:
     response = HResponse(["<div>", "</div>"], include_doctype=True)
     body = collect_body(response)
@@ -52,3 +62,89 @@ def test_hdocumentresponse_includes_doctype_and_structure() -> None:
     assert body.startswith(b"<!DOCTYPE html><html")
     assert b"<title>Example</title>" in body
     assert b"<p>body</p>" in body
+
+
+def test_hresponse_etag_answers_if_none_match_with_304() -> None:
+    page = H.div(H.p("cached"))
+
+    async def app(scope, receive, send):
+        await HResponse(page, include_doctype=True, etag=True)(scope, receive, send)
+
+    client = TestClient(app)
+    first = client.get("/")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.content == b"<!DOCTYPE html><div><p>cached</p></div>"
+
+    second = client.get("/", headers={"If-None-Match": f"W/{etag}"})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    other = client.get("/", headers={"If-None-Match": '"other"'})
+    assert other.status_code == 200
+
+
+def test_hresponse_streams_async_table() -> None:
+    from typing import AsyncIterator
+
+    from zen_html import TableStream
+
+    async def rows() -> AsyncIterator[tuple[int]]:
+        for i in range(3):
+            yield (i,)
+
+    body = collect_body(HResponse(TableStream(rows(), flush_rows=1), include_doctype=True))
+
+    rows_html = b"<tr><td>0</td></tr><tr><td>1</td></tr><tr><td>2</td></tr>"
+    assert body == b"<!DOCTYPE html><table><tbody>" + rows_html + b"</tbody></table>"
+
+
+def test_hresponse_compresses_stream_for_accepting_clients() -> None:
+    # The test client decodes Content-Encoding, so bodies compare against the plain document.
+    page = HtmlDocument(title="t", body=[H.p(f"row {i}") for i in range(2000)])
+
+    async def app(scope, receive, send):
+        await HResponse(page, include_doctype=True, compress=True)(scope, receive, send)
+
+    client = TestClient(app)
+    gzipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    deflated = client.get("/", headers={"Accept-Encoding": "gzip;q=0.5, deflate"})
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+
+    expected = ("<!DOCTYPE html>" + page.html_).encode()
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.content == expected
+    assert deflated.headers["content-encoding"] == "deflate" and deflated.content == expected
+    assert "content-encoding" not in plain.headers and plain.content == expected
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+
+def test_hresponse_etags_differ_per_content_coding() -> None:
+    page = H.div(H.p("cached"))
+
+    async def app(scope, receive, send):
+        await HResponse(page, etag=True, compress=True)(scope, receive, send)
+
+    client = TestClient(app)
+    gzipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["etag"] == page.etag_[:-1] + '-gzip"' and plain.headers["etag"] == page.etag_
+
+    same = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+    assert same.status_code == 304 and same.headers["vary"] == "Accept-Encoding"
+    other = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]})
+    assert other.status_code == 200 and other.content == page.html_.encode()
+
+
+def test_hresponse_streams_deferred_content_out_of_order() -> None:
+    async def load_chart():
+        await asyncio.sleep(0.01)
+        return H.p("chart")
+
+    page = H.html(H.body(H.deferred(load_chart, fallback="loading"), H.p("after")))
+    body = collect_body(HResponse(astream_tokens(page), include_doctype=True))
+
+    assert body.startswith(b"<!DOCTYPE html><html><body><div id='zh-p0'>loading</div><p>after</p>")
+    assert body.endswith(
+        b"<template id='zh-t0'><p>chart</p></template><script>__zenSwap('zh-',0)</script></body></html>"
+    )
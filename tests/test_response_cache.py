@@ -0,0 +1,145 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=no-untyped-def
+
+import gzip
+from concurrent.futures import Executor, Future
+from typing import Callable, Iterable
+
+from zen_html import CacheEntry, H, MemoryCacheBackend, ResponseCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ImmediateExecutor(Executor):
+    def __init__(self) -> None:
+        self.jobs: list[Callable[[], None]] = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.jobs.append(fn)
+        return Future()
+
+    def run_all(self) -> None:
+        jobs, self.jobs = self.jobs, []
+        for job in jobs:
+            job()
+
+
+class DictBackend:
+    """Minimal third-party style backend without LRU or byte accounting."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, CacheEntry] = {}
+
+    def get(self, key: str) -> CacheEntry | None:
+        return self.data.get(key)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.data[key] = entry
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        wanted = set(tags)
+        keys = [k for k, e in self.data.items() if e.tags & wanted]
+        for k in keys:
+            del self.data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+
+def test_render_stores_utf8_and_gzip_bodies() -> None:
+    cache = ResponseCache()
+    entry = cache.get_or_render("home", lambda: H.p("héllo"))
+
+    assert entry.body == "<!DOCTYPE html><p>héllo</p>".encode("utf-8")
+    assert entry.gzip_body is not None
+    assert gzip.decompress(entry.gzip_body) == entry.body
+    assert entry.select("br, gzip;q=0.8") == (entry.gzip_body, "gzip")
+    assert entry.select("gzip;q=0") == (entry.body, None)
+
+
+def test_hit_does_not_rerender() -> None:
+    calls = []
+
+    def render() -> H:
+        calls.append(1)
+        return H.p("x")
+
+    cache = ResponseCache()
+    first = cache.get_or_render("k", render)
+    second = cache.get_or_render("k", render)
+
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_lru_eviction_respects_byte_budget() -> None:
+    backend = MemoryCacheBackend(max_bytes=100)
+    cache = ResponseCache(backend, compress=False)
+    for key in "abc":
+        cache.get_or_render(key, lambda: ["x" * 40], include_doctype=False)
+        if key == "b":
+            backend.get("a")
+
+    assert backend.total_bytes <= 100
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_invalidate_by_tag() -> None:
+    cache = ResponseCache()
+    cache.get_or_render("p42", lambda: H.p("42"), tags=["product:42", "catalog"])
+    cache.get_or_render("p7", lambda: H.p("7"), tags=["product:7", "catalog"])
+
+    assert cache.invalidate("product:42") == 1
+    assert cache.get("p42") is None
+    assert cache.get("p7") is not None
+    assert cache.invalidate("catalog") == 1
+    assert cache.get("p7") is None
+
+
+def test_stale_while_revalidate_serves_old_bytes() -> None:
+    clock = FakeClock()
+    executor = ImmediateExecutor()
+    cache = ResponseCache(ttl=10, stale_while_revalidate=30, executor=executor, clock=clock)
+    version = ["v1"]
+
+    def render() -> H:
+        return H.p(version[0])
+
+    cache.get_or_render("k", render)
+    version[0] = "v2"
+    clock.now = 15
+
+    stale = cache.get_or_render("k", render)
+    assert b"v1" in stale.body
+    cache.get_or_render("k", render)
+    assert len(executor.jobs) == 1
+
+    executor.run_all()
+    assert b"v2" in cache.get_or_render("k", render).body
+
+    clock.now = 100
+    version[0] = "v3"
+    assert b"v3" in cache.get_or_render("k", render).body
+
+
+def test_pluggable_backend() -> None:
+    backend = DictBackend()
+    cache = ResponseCache(backend, compress=False)
+    entry = cache.get_or_render("k", lambda: H.p("hi"), tags=["t"])
+
+    assert backend.data["k"] is entry
+    assert entry.gzip_body is None
+    assert cache.invalidate("t") == 1
+    assert backend.data == {}
@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=no-untyped-def
+
+import multiprocessing
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from zen_html import H, SharedFragmentCache
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="requires fcntl")
+
+
+def _child_put(path: str) -> None:
+    with SharedFragmentCache(path, capacity=4096, slots=64) as cache:
+        cache.put("from-child", b"<p>child</p>")
+
+
+def test_put_and_get_return_zero_copy_views(tmp_path: Path) -> None:
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=4096, slots=64) as cache:
+        assert cache.get("missing") is None
+        view = cache.put("k", b"<p>hello</p>")
+        found = cache.get("k")
+
+        assert isinstance(found, memoryview)
+        assert bytes(found) == b"<p>hello</p>"
+        assert found.obj is view.obj
+        del view, found
+
+
+def test_get_or_render_keys_by_content(tmp_path: Path) -> None:
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=4096, slots=64) as cache:
+        first = cache.get_or_render(H.ul(H.li("a"), H.li("b")))
+        second = cache.get(H.ul(H.li("a"), H.li("b")))
+
+        assert second is not None
+        assert bytes(first) == bytes(second) == b"<ul><li>a</li><li>b</li></ul>"
+        assert cache.get(H.ul(H.li("a"))) is None
+        assert len(cache) == 1
+        del first, second
+
+
+def test_entries_are_shared_between_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "frag.cache")
+    with SharedFragmentCache(path, capacity=4096, slots=64) as cache:
+        proc = multiprocessing.get_context("fork").Process(target=_child_put, args=(path,))
+        proc.start()
+        proc.join()
+
+        found = cache.get("from-child")
+        assert found is not None
+        assert bytes(found) == b"<p>child</p>"
+        del found
+
+
+def test_full_arena_compacts_and_other_instances_follow(tmp_path: Path) -> None:
+    path = tmp_path / "frag.cache"
+    with SharedFragmentCache(path, capacity=100, slots=64) as writer:
+        with SharedFragmentCache(path, capacity=100, slots=64) as reader:
+            old = writer.put("a", b"x" * 40)
+            writer.put("b", b"y" * 40)
+            writer.put("c", b"z" * 40)
+
+            assert bytes(old) == b"x" * 40
+            assert reader.get("a") is None
+            hit = reader.get("c")
+            assert hit is not None
+            assert bytes(hit) == b"z" * 40
+            assert writer.bytes_used <= 100
+            del old, hit
+
+
+def test_delete_and_compact_reclaims_space(tmp_path: Path) -> None:
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=4096, slots=64, keep_ratio=1.0) as cache:
+        cache.put("a", b"a" * 100)
+        cache.put("b", b"b" * 100)
+
+        assert cache.delete("a")
+        assert not cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.bytes_used == 100
+
+        cache.compact()
+        found = cache.get("b")
+        assert found is not None
+        assert bytes(found) == b"b" * 100
+        assert len(cache) == 1
+        del found
+
+
+def test_oversized_fragment_is_rejected(tmp_path: Path) -> None:
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=16, slots=8) as cache:
+        with pytest.raises(ValueError):
+            cache.put("big", b"x" * 17)
+
+
+def test_tiny_slot_tables_are_rejected_or_compact(tmp_path: Path) -> None:
+    for slots in (0, 1):
+        with pytest.raises(ValueError):
+            SharedFragmentCache(tmp_path / f"{slots}.cache", slots=slots)
+
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=4096, slots=2) as cache:
+        for key in "abc":
+            assert bytes(cache.put(key, key.encode())) == key.encode()
+        assert len(cache) == 1 and cache.get("a") is None
+
+
+def test_lock_free_reads_survive_concurrent_compaction(tmp_path: Path) -> None:
+    errors: list[BaseException] = []
+    done = threading.Event()
+    with SharedFragmentCache(tmp_path / "frag.cache", capacity=4096, slots=64, keep_ratio=1.0) as cache:
+        cache.put("a", b"<p>a</p>")
+
+        def read() -> None:
+            try:
+                while not done.is_set():
+                    found = cache.get("a")
+                    assert found is not None and bytes(found) == b"<p>a</p>"
+            except BaseException as exc:
+                errors.append(exc)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # interleave readers with the swap of the mapping
+        try:
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            for reader in readers:
+                reader.start()
+            for _ in range(200):
+                cache.compact()
+            done.set()
+            for reader in readers:
+                reader.join()
+        finally:
+            sys.setswitchinterval(interval)
+    assert errors == []
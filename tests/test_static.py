@@ -0,0 +1,95 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gzip
+import zlib
+from typing import AsyncIterator
+
+import pytest
+
+from zen_html import (
+    H,
+    MinifyOptions,
+    StreamCompressor,
+    acompress_tokens,
+    compress_tokens,
+)
+from zen_html._base import _HBase
+
+HEADER = H.header(H.nav(H.a(f"link {i}", href=f"/p/{i}") for i in range(200)))
+FOOTER = H.footer(H.p("(c) 2025"), H.p("contact"))
+
+
+def page(header: _HBase, footer: _HBase, rows: int = 500) -> H:
+    return H.html(
+        H.head(H.title("t")),
+        H.body(header, H.ul(H.li(f"row {i}") for i in range(rows)), footer),
+    )
+
+
+def test_static_renders_like_its_children() -> None:
+    static = H.static(HEADER, FOOTER)
+    plain = H.fragment(HEADER, FOOTER)
+
+    assert static.html_ == plain.html_
+    assert static.dict_ == plain.dict_
+    assert static.hash_ == plain.hash_
+    assert H.div(static).html_ == H.div(plain).html_
+    # The markup is rendered once and reused.
+    assert next(iter(static.to_token())) is next(iter(static.to_token()))
+
+
+def test_static_minified_output_matches_plain_nodes() -> None:
+    items = [H.li("a"), H.li("b")]
+    options = MinifyOptions()
+
+    assert H.ul(H.static(items), H.li("c")).minified_html_ == "<ul><li>a<li>b</li><li>c</ul>"
+    assert page(H.static(HEADER), H.static(FOOTER)).minified_html_ == page(HEADER, FOOTER).minified_html_
+    assert next(iter(H.static(items).to_token(options))) == "<li>a<li>b</li>"
+
+
+@pytest.mark.parametrize("level", [0, 1, 6, 9])
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_spliced_blocks_decode_with_stdlib(encoding: str, level: int) -> None:
+    static = page(H.static(HEADER), H.static(FOOTER))
+    expected = page(HEADER, FOOTER).html_.encode()
+    decompress = gzip.decompress if encoding == "gzip" else zlib.decompress
+
+    for flush_bytes in (None, 1024):
+        body = b"".join(compress_tokens(static.to_token(), encoding, level=level, flush_bytes=flush_bytes))
+        assert decompress(body) == expected
+
+
+def test_precompressed_blocks_are_reused_verbatim() -> None:
+    static = H.static(HEADER)
+    token = next(iter(static.to_token()))
+    first = b"".join(compress_tokens(page(static, FOOTER).to_token()))
+    second = b"".join(compress_tokens(page(static, FOOTER, rows=3).to_token()))
+
+    block = token.deflated(6)  # type: ignore[attr-defined]
+    assert block in first and block in second
+    assert token.deflated(6) is block  # type: ignore[attr-defined]
+    assert gzip.decompress(second) == page(HEADER, FOOTER, rows=3).html_.encode()
+
+
+def test_static_at_stream_edges() -> None:
+    for node in (H.static(HEADER), H.static(), H.fragment(H.static(HEADER), H.static(FOOTER))):
+        assert gzip.decompress(b"".join(compress_tokens(node.to_token()))) == node.html_.encode()
+
+    compressor = StreamCompressor("deflate")
+    body = compressor.write("<p>") + compressor.write(next(iter(H.static(HEADER).to_token())))
+    body += compressor.write("</p>") + compressor.finish()
+    assert zlib.decompress(body) == f"<p>{HEADER.html_}</p>".encode()
+
+
+def test_async_compression_splices_static_blocks() -> None:
+    node = page(H.static(HEADER), H.static(FOOTER))
+
+    async def tokens() -> AsyncIterator[str]:
+        for token in node.to_token():
+            yield token
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in acompress_tokens(tokens())])
+
+    assert gzip.decompress(asyncio.run(collect())) == node.html_.encode()
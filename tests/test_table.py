@@ -0,0 +1,234 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=index
+
+import array
+import asyncio
+import sqlite3
+import threading
+from datetime import date, datetime, time
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from zen_html import H, TableStream, diff
+
+
+def test_table_rows_match_equivalent_node_tree() -> None:
+    rows = [(1, "a<b", date(2024, 1, 2), None), (2, H.RAW_STR("<i>x</i>"), H.b("bold"), 1.5)]
+    direct = H.table_rows(rows, formatters={0: lambda v: f"#{v}"}, cell_attrs={0: {"class_": ["num", "id"]}})
+    tree = H.fragment(
+        H.tr(H.td("#1", class_="num id"), H.td("a<b"), H.td("2024-01-02"), H.td()),
+        H.tr(H.td("#2", class_="num id"), H.td(H.RAW_STR("<i>x</i>")), H.td(H.b("bold")), H.td("1.5")),
+    )
+
+    assert direct.html_ == tree.html_
+    assert direct.dict_ == tree.dict_
+    assert direct.hash_ == tree.hash_
+
+
+def test_table_rows_from_mappings_with_column_selection() -> None:
+    rows = [{"name": "a", "qty": 1, "skip": "x"}, {"name": "b", "qty": 2, "skip": "y"}]
+    node = H.tbody(H.table_rows(rows, columns=["qty", "name"], cell_tag="th"))
+
+    assert node.html_ == "<tbody><tr><th>1</th><th>a</th></tr><tr><th>2</th><th>b</th></tr></tbody>"
+
+
+def test_table_rows_are_not_materialized_for_rendering() -> None:
+    node = H.table_rows([(1, 2)] * 3)
+    H.tbody(node).html_
+
+    assert node._materialized is None
+    assert len(node) == 3
+
+
+def test_table_rows_reject_unknown_columns_and_invalid_attrs() -> None:
+    with pytest.raises(KeyError):
+        H.table_rows([("a",)], formatters={3: str})
+    with pytest.raises(TypeError):
+        H.table_rows([("a",)], cell_attrs={0: {"class_": [1]}})
+
+
+def test_table_rows_participate_in_diff() -> None:
+    old = H.tbody(H.table_rows([("a", 1), ("b", 2)]))
+    new = H.tbody(H.table_rows([("a", 1), ("b", 3)]))
+
+    assert diff(old, new) == [{"op": "text", "path": [1, 1, 0], "value": "3"}]
+
+
+def test_empty_table_rows() -> None:
+    assert H.table_rows([]).html_ == ""
+    # An empty result renders like a non-empty one: the columns are unknown, not wrong.
+    empty = H.table_rows([], formatters={"price": str}, cell_attrs={"price": {"class_": "num"}})
+    assert H.tbody(empty).html_ == "<tbody></tbody>" and empty.minified_html_ == ""
+    with pytest.raises(KeyError):
+        H.table_rows([], columns=["name"], formatters={"price": str})
+
+
+def test_table_rows_nested_in_parent_look_like_plain_rows() -> None:
+    rows = [("a", 1), ("b", 2)]
+    direct = H.tbody(H.table_rows(rows), H.tr(H.td("total")))
+    tree = H.tbody(H.tr(H.td("a"), H.td("1")), H.tr(H.td("b"), H.td("2")), H.tr(H.td("total")))
+
+    assert direct.html_ == tree.html_
+    assert direct.dict_ == tree.dict_
+    assert direct == tree
+
+
+def _report_db(count: int) -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE report (id INTEGER, name TEXT, amount REAL)")
+    db.executemany("INSERT INTO report VALUES (?, ?, ?)", ((i, f"item <{i}>", i * 1.5) for i in range(count)))
+    return db
+
+
+def test_table_stream_from_sqlite_cursor_matches_table() -> None:
+    db = _report_db(250)
+    cursor = db.execute("SELECT id, name, amount FROM report ORDER BY id")
+    chunks = list(TableStream(cursor, header=True, cell_attrs={2: {"class_": "num"}}, flush_rows=100, id="r"))
+    rows = db.execute("SELECT id, name, amount FROM report ORDER BY id").fetchall()
+    expected = H.table(
+        H.thead(H.tr(H.th("id"), H.th("name"), H.th("amount"))),
+        H.tbody(H.table_rows(rows, cell_attrs={2: {"class_": "num"}})),
+        id="r",
+    )
+
+    assert "".join(chunks) == expected.html_
+    # Opening tag and header, three batches of at most 100 rows (the last one closes the table).
+    assert len(chunks) == 4
+    assert chunks[1].count("<tr>") == 100 and chunks[3].endswith("</tbody></table>")
+
+
+def test_table_stream_pulls_rows_lazily() -> None:
+    pulled = []
+
+    def source() -> Iterator[tuple[int]]:
+        for i in range(10):
+            pulled.append(i)
+            yield (i,)
+
+    chunks = iter(TableStream(source(), flush_rows=3))
+    assert next(chunks) == "<table><tbody>"
+    assert pulled == []
+    assert next(chunks) == "<tr><td>0</td></tr><tr><td>1</td></tr><tr><td>2</td></tr>"
+    assert pulled == [0, 1, 2]
+
+
+def test_table_stream_flushes_by_size() -> None:
+    rows = [f"<tr><td>{str(i) * 10}</td></tr>" for i in range(5)]  # 28 bytes each
+    chunks = list(TableStream(([str(i) * 10] for i in range(5)), flush_bytes=50))
+
+    assert chunks[1:] == [rows[0] + rows[1], rows[2] + rows[3], rows[4] + "</tbody></table>"]
+
+
+def test_table_stream_from_async_source() -> None:
+    async def source() -> AsyncIterator[dict[str, object]]:
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield {"n": i, "label": f"#{i}"}
+
+    async def collect() -> list[str]:
+        return [chunk async for chunk in TableStream(source(), header=["N", "Label"], flush_rows=2)]
+
+    chunks = asyncio.run(collect())
+    expected = H.table(
+        H.thead(H.tr(H.th("N"), H.th("Label"))),
+        H.tbody(H.table_rows([{"n": i, "label": f"#{i}"} for i in range(3)])),
+    )
+
+    assert "".join(chunks) == expected.html_
+    assert len(chunks) == 3
+    with pytest.raises(TypeError):
+        iter(TableStream(source()))
+
+
+def test_table_stream_reads_sync_sources_off_the_event_loop() -> None:
+    threads: list[int] = []
+    closed = False
+
+    def source() -> Iterator[tuple[int]]:
+        nonlocal closed
+        try:
+            for i in range(5):
+                threads.append(threading.get_ident())
+                yield (i,)
+        finally:
+            closed = True
+
+    async def collect(limit: int | None = None) -> list[str]:
+        chunks = []
+        stream = TableStream(source(), flush_rows=2).__aiter__()
+        async for chunk in stream:
+            chunks.append(chunk)
+            if len(chunks) == limit:
+                await stream.aclose()  # type: ignore[attr-defined]
+                break
+        return chunks
+
+    chunks = asyncio.run(collect())
+    assert "".join(chunks) == "".join(TableStream((i,) for i in range(5)))
+    assert threading.get_ident() not in threads
+
+    closed = False
+    assert len(asyncio.run(collect(limit=2))) == 2 and closed
+
+
+def test_table_stream_rejects_missing_description_and_empty_sources() -> None:
+    with pytest.raises(ValueError):
+        TableStream([], header=True)
+    assert "".join(TableStream([])) == "<table><tbody></tbody></table>"
+
+
+def test_table_columns_match_table_rows() -> None:
+    columns: dict[str, list[object] | array.array[int] | array.array[float]] = {
+        "id": array.array("q", [1, 2, 3]),
+        "ratio": array.array("d", [0.5, 1.25, -3.0]),
+        "name": ["a<b", "c", "d&e"],
+        "when": [date(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5, 6), time(7, 8)],
+        "mixed": [None, H.RAW_STR("<i>x</i>"), H.b("y")],
+    }
+    direct = H.table_columns(
+        columns, formatters={"id": lambda v: f"#{v}"}, cell_attrs={"id": {"class_": "num"}}
+    )
+    rows = H.table_rows(
+        zip(*columns.values()), formatters={0: lambda v: f"#{v}"}, cell_attrs={0: {"class_": "num"}}
+    )
+
+    assert direct.html_ == rows.html_
+    assert H.tbody(direct) == H.tbody(rows) and H.tbody(direct).hash_ == H.tbody(rows).hash_
+    assert len(direct) == 3
+
+
+def test_table_columns_from_numpy_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    columns = {
+        "n": np.arange(3),
+        "x": np.array([1.5, 2.0, 0.25], dtype=np.float64),
+        "day": np.array(["2024-01-02", "NaT", "2024-03-04"], dtype="datetime64[D]"),
+        "at": np.array(["2024-01-02T03:04:05.123456789"] * 3, dtype="datetime64[ns]"),
+    }
+    html = H.table_columns(columns).html_
+
+    assert html.startswith("<tr><td>0</td><td>1.5</td><td>2024-01-02</td><td>2024-01-02T03:04:05</td></tr>")
+    assert "<tr><td>1</td><td>2.0</td><td></td>" in html
+
+
+def test_table_columns_format_narrow_floats_like_table_rows() -> None:
+    np = pytest.importorskip("numpy")
+    values = [1.1, 2.5, -0.3]
+    for column in (np.array(values, dtype=np.float32), np.array(values, dtype=np.float16)):
+        direct = H.table_columns({"x": column, "y": column}, formatters={"y": str})
+        rows = H.table_rows(zip(column, column), formatters={1: str})
+        assert direct.html_ == rows.html_ and H.tbody(direct) == H.tbody(rows)
+    assert H.table_columns({"x": np.array(values, dtype=np.float32)}).html_ == (
+        "<tr><td>1.1</td></tr><tr><td>2.5</td></tr><tr><td>-0.3</td></tr>"
+    )
+
+    single = array.array("f", values)
+    assert H.table_columns({"x": single}).html_ == H.table_rows(zip(single)).html_
+
+
+def test_table_columns_validate_names_and_lengths() -> None:
+    with pytest.raises(KeyError):
+        H.table_columns({"a": [1]}, cell_attrs={"b": {"class_": "x"}})
+    with pytest.raises(ValueError):
+        H.table_columns({"a": [1, 2], "b": [1]})
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from zen_html import H, MinifyOptions, compress_tokens, validation
+from zen_html._base import _HBase
+
+THREADS = 8
+
+
+def page(i: int, chrome: _HBase) -> H:
+    return H.html(
+        H.body(
+            chrome,
+            H.h1(f"page {i}"),
+            H.table_rows([(n, f"<{n}>") for n in range(50)]),
+            H.ul(H.li("x") for _ in range(50)),
+        )
+    )
+
+
+def test_shared_nodes_render_identically_on_many_threads() -> None:
+    chrome = H.static(H.header(H.nav(H.a(f"link {i}", href=f"/{i}") for i in range(100))))
+    shared = page(0, chrome)
+    expected = (shared.html_, shared.minified_html_, shared.hash_)
+    barrier = threading.Barrier(THREADS)
+
+    def work(i: int) -> tuple[str, str, bytes, str]:
+        barrier.wait()
+        # Fresh trees hit the lazy caches of their shared parts from every thread at once.
+        own = page(i, chrome)
+        return shared.html_, shared.minified_html_, shared.hash_, own.html_
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(work, range(THREADS)))
+
+    for i, (html, minified, digest, own) in enumerate(results):
+        assert (html, minified, digest) == expected
+        assert own == page(i, chrome).html_
+    assert len({next(iter(chrome.to_token())).deflated(6) for _ in range(THREADS)}) == 1  # type: ignore[attr-defined]
+
+
+def test_compressing_on_threads_shares_static_blocks() -> None:
+    chrome = H.static(H.footer(H.p(f"line {i}") for i in range(200)))
+    barrier = threading.Barrier(THREADS)
+
+    def work(i: int) -> bytes:
+        barrier.wait()
+        return b"".join(compress_tokens(page(i, chrome).to_token(MinifyOptions())))
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        bodies = list(pool.map(work, range(THREADS)))
+    for i, body in enumerate(bodies):
+        assert body == b"".join(compress_tokens(page(i, chrome).to_token(MinifyOptions())))
+
+
+def test_validation_override_is_local_to_the_thread() -> None:
+    barrier = threading.Barrier(2)
+
+    def lenient() -> str:
+        with validation(strict=False):
+            barrier.wait()
+            barrier.wait()
+            return _HBase("meta", "ignored", charset="utf-8").html_
+
+    def strict() -> str:
+        barrier.wait()
+        try:
+            _HBase("meta", "ignored", charset="utf-8")
+        except ValueError as exc:
+            return str(exc)
+        finally:
+            barrier.wait()
+        return "no error"
+
+    with ThreadPoolExecutor(2) as pool:
+        first, second = pool.submit(lenient), pool.submit(strict)
+        assert first.result() == "<meta charset='utf-8'/>"
+        assert "cannot have children" in second.result()
+    assert H.strict_validation is True
+
+
+def test_validation_override_nests_and_reaches_tasks() -> None:
+    with validation(strict=False):
+        with validation(strict=True):
+            with pytest.raises(ValueError):
+                _HBase("br", "x")
+        assert "type=" not in H.button("x", type="invalid").html_  # type: ignore[arg-type]
+
+        async def in_task() -> str:
+            return _HBase("br", "x").html_
+
+        assert asyncio.run(in_task()) == "<br/>"
+    with pytest.raises(ValueError):
+        _HBase("br", "x")
+
+    old = H.strict_validation
+    H.strict_validation = False
+    try:
+        with validation(strict=True), pytest.raises(ValueError):
+            _HBase("br", "x")
+    finally:
+        H.strict_validation = old
@@ -0,0 +1,240 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+import asyncio
+import gc
+import zlib
+
+import pytest
+
+from zen_html import (
+    Document,
+    ExternalLinkRel,
+    H,
+    LazyLoading,
+    MinifyOptions,
+    PrefixURLs,
+    Transformer,
+    TransformPipeline,
+    astream_tokens,
+    compress_tokens,
+)
+from zen_html._base import _HBase
+from zen_html._static import _StaticHTML
+from zen_html._transform import Attrs
+
+CDN = TransformPipeline(
+    PrefixURLs("https://cdn.example.com/"), ExternalLinkRel(hosts=["example.com"]), LazyLoading()
+)
+
+
+class Recorder(Transformer):
+    def __init__(self, tags: list[str] | None = None) -> None:
+        self.tags = tags
+        self.events: list[tuple[str, str]] = []
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        self.events.append(("start", tag))
+
+    def text(self, parent: str, text: str) -> str:
+        self.events.append(("text", text))
+        return text.upper()
+
+    def end(self, tag: str) -> None:
+        self.events.append(("end", tag))
+
+
+def page() -> H:
+    return H.html(
+        H.head(
+            H.link(rel="stylesheet", href="/static/site.css"),
+            H.script(src="/static/app.js"),
+        ),
+        H.body(
+            H.img(src="/img/a.png", alt="a"),
+            H.img(src="//other.example/b.png", alt="b", loading="eager"),
+            H.a("docs", href="https://docs.python.org/", rel="external"),
+            H.a("home", href="https://example.com/"),
+            H.a("page", href="/page"),
+        ),
+    )
+
+
+def test_builtin_transformers() -> None:
+    tree = page()
+    before = tree.html_
+
+    html = CDN.apply(tree).html_
+    assert "<link rel='stylesheet' href='https://cdn.example.com/static/site.css'/>" in html
+    assert "<script src='https://cdn.example.com/static/app.js'></script>" in html
+    assert "<img src='https://cdn.example.com/img/a.png' alt='a' loading='lazy'/>" in html
+    assert "<img src='//other.example/b.png' alt='b' loading='eager'/>" in html
+    assert "<a href='https://docs.python.org/' rel='external noopener'>docs</a>" in html
+    assert "<a href='https://example.com/'>home</a>" in html and "<a href='/page'>page</a>" in html
+    assert tree.html_ == before
+
+    links = H.head(H.link(rel="icon", href="/favicon.ico"), H.link(rel="modulepreload", href="/app.mjs"))
+    assert CDN.apply(links).html_ == (
+        "<head><link rel='icon' href='https://cdn.example.com/favicon.ico'/>"
+        "<link rel='modulepreload' href='https://cdn.example.com/app.mjs'/></head>"
+    )
+    prefix = PrefixURLs("https://cdn.example.com")
+    pages: list[tuple[str | bool, str]] = [
+        ("canonical", "/page"),
+        ("alternate", "/feed"),
+        ("next", "/p/2"),
+        (True, "/x"),
+    ]
+    for rel, href in pages:
+        attrs: Attrs = {"rel": rel, "href": href}
+        prefix.start("link", attrs)
+        assert attrs["href"] == href
+    attrs = {"rel": "Shortcut Icon", "href": "/favicon.ico"}
+    prefix.start("link", attrs)
+    assert attrs["href"] == "https://cdn.example.com/favicon.ico"
+
+    minified = "".join(CDN.apply(tree).to_token(MinifyOptions()))
+    assert "<img src=https://cdn.example.com/img/a.png alt=a loading=lazy>" in minified
+
+
+@pytest.mark.parametrize("minify", [None, MinifyOptions(), MinifyOptions(collapse_whitespace=False)])
+def test_output_without_changes_matches_the_plain_renderer(minify: MinifyOptions | None) -> None:
+    identity = TransformPipeline(Recorder(["nothing"]))
+    tree = H.html(
+        H.body(
+            H.static(H.header(H.p("a  b"))),
+            H.pre("  keep  "),
+            H.ul(H.li("1"), H.li("2 ", H.RAW_STR("<b>raw</b>"))),
+            H.table(H.tbody(H.table_rows([(1, "<x>"), (2, "y")]))),
+            H.table(H.tbody(H.table_columns({"a": [1, 2], "b": ["p", "q"]}))),
+            H.input(type="checkbox", checked=True),
+            H.deferred(lambda: "x", fallback=H.p("wait")),
+        )
+    )
+
+    assert "".join(identity.apply(tree).to_token(minify)) == "".join(tree.to_token(minify))
+    assert "".join(identity.apply(H.li("a"), H.li("b")).to_token(minify)) == "".join(
+        H.fragment(H.li("a"), H.li("b")).to_token(minify)
+    )
+
+
+def test_events_are_dispatched_by_tag() -> None:
+    only_p = Recorder(["p"])
+    every = Recorder()
+    tree = H.div(H.p("x", H.b("y")), H.br(), "z")
+
+    html = TransformPipeline(only_p).apply(tree).html_
+    assert html == "<div><p>X<b>y</b></p><br/>z</div>"
+    assert only_p.events == [("start", "p"), ("text", "x"), ("end", "p")]
+
+    TransformPipeline(every).apply(tree).html_
+    assert [e for e in every.events if e[0] != "text"] == [
+        ("start", "div"),
+        ("start", "p"),
+        ("start", "b"),
+        ("end", "b"),
+        ("end", "p"),
+        ("start", "br"),
+        ("end", "br"),
+        ("end", "div"),
+    ]
+
+    class Drop(Transformer):
+        tags = ["input"]
+
+        def start(self, tag: str, attrs: Attrs) -> None:
+            attrs["disabled"] = False
+            attrs["data-x"] = "<'>"
+
+    node = H.input(type="text", disabled=True)
+    assert TransformPipeline(Drop()).apply(node).html_ == "<input type='text' data-x='&lt;&#x27;&gt;'/>"
+    assert node.props_ == {"type": "text", "disabled": True}
+
+
+def test_static_markup_is_transformed_once_per_pipeline() -> None:
+    recorder = Recorder(["p"])
+    pipeline = TransformPipeline(recorder)
+    header = H.static(H.header(H.p("a")))
+
+    for _ in range(3):
+        tokens = list(pipeline.apply(H.body(header, H.p("b"))).to_token())
+        assert "".join(tokens) == "<body><header><p>A</p></header><p>B</p></body>"
+        assert any(type(token) is _StaticHTML for token in tokens)
+    assert recorder.events.count(("text", "a")) == 1 and recorder.events.count(("text", "b")) == 3
+    assert header.html_ == "<header><p>a</p></header>"
+    assert TransformPipeline(Recorder()).apply(header).html_ == "<header><p>A</p></header>"
+    assert len(header.with_children(H.p("c"))._transformed) == 0
+
+
+def test_pipeline_caches_do_not_keep_pipelines_alive() -> None:
+    header = H.static(H.header(H.p("a")))
+    outer = TransformPipeline(Recorder(["p"]))
+    for _ in range(3):
+        inner = TransformPipeline(Recorder(["a"]))
+        assert outer.apply(inner.apply(header)).html_ == "<header><p>A</p></header>"
+        assert TransformPipeline(Recorder(["p"])).apply(header).html_ == "<header><p>A</p></header>"
+    del inner
+    gc.collect()
+    assert len(outer._nested) == 0 and len(header._transformed) == 0
+
+
+@pytest.mark.parametrize("minify", [None, MinifyOptions()])
+def test_table_rows_render_from_their_data_when_no_transformer_handles_cells(
+    minify: MinifyOptions | None,
+) -> None:
+    rows = [("/a.png", "x"), ("/b.png", "<y>")]
+    table_rows = H.table_rows(rows, formatters={0: lambda src: H.img(src=str(src), alt="")})
+    columns = H.table_columns({"a": [1, 2], "b": ["p", "q"]})
+    tree = H.table(H.tbody(table_rows), H.tfoot(columns))
+
+    html = "".join(CDN.apply(tree).to_token(minify))
+    assert table_rows._materialized is None and columns._materialized is None
+    assert html == "".join(
+        CDN.apply(H.table(H.tbody(table_rows._children), H.tfoot(columns._children))).to_token(minify)
+    )
+    assert html.count("https://cdn.example.com/") == 2 and html.count("lazy") == 2
+
+    cells = Recorder(["td"])
+    assert "".join(TransformPipeline(cells).apply(tree).to_token(minify)).count("<td") == 8
+    assert cells.events.count(("start", "td")) == 8 and table_rows._materialized is not None
+
+
+def test_nested_pipelines_apply_the_inner_transformers_first() -> None:
+    class Append(Transformer):
+        tags = ["a"]
+
+        def __init__(self, suffix: str) -> None:
+            self.suffix = suffix
+
+        def start(self, tag: str, attrs: Attrs) -> None:
+            attrs["href"] = str(attrs["href"]) + self.suffix
+
+    inner = TransformPipeline(Append("-inner"))
+    outer = TransformPipeline(Append("-outer"))
+    tree = outer.apply(H.div(H.a("1", href="a"), inner.apply(H.a("2", href="b"))))
+
+    assert tree.html_ == "<div><a href='a-outer'>1</a><a href='b-inner-outer'>2</a></div>"
+    assert tree == H.fragment(H.div(H.a("1", href="a"), H.a("2", href="b")))
+    assert repr(inner.apply("x")).startswith("TransformPipeline(")
+
+
+def test_pipelines_work_with_documents_compression_and_deferred_content() -> None:
+    async def load() -> _HBase:
+        return H.img(src="/late.png", alt="")
+
+    body = CDN.apply(H.img(src="/a.png", alt=""), H.deferred(load, fallback=H.img(src="/wait.png", alt="")))
+    document = "".join(Document([body], title="t"))
+    assert "src='https://cdn.example.com/a.png'" in document
+
+    async def stream() -> str:
+        return "".join([token async for token in astream_tokens(H.html(H.body(body)))])
+
+    streamed = asyncio.run(stream())
+    assert "src='https://cdn.example.com/wait.png'" in streamed
+    assert (
+        "<template id='zh-t0'><img src='https://cdn.example.com/late.png' alt='' loading='lazy'/>" in streamed
+    )
+
+    compressed = b"".join(compress_tokens(CDN.apply(H.static(H.img(src="/s.png", alt=""))).to_token()))
+    assert zlib.decompress(compressed, 16 + zlib.MAX_WBITS).decode() == (
+        "<img src='https://cdn.example.com/s.png' alt='' loading='lazy'/>"
+    )
@@ -0,0 +1,114 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+# mypy: disable-error-code=arg-type
+
+import pytest
+
+from zen_html import H, diff, validation
+from zen_html._base import _HBase
+
+
+def nav(active: int | None = None) -> H:
+    return H.nav(
+        H.ul(
+            H.li(H.a(f"item {i}", href=f"/{i}"), class_=["item", "active"] if i == active else "item")
+            for i in range(5)
+        ),
+        id="menu",
+    )
+
+
+def test_with_props_adds_changes_and_removes_attributes() -> None:
+    link = H.a(H.b("x"), href="/a", title="t", class_="link")
+    updated = link.with_props(
+        class_=["link", "active"], title=None, dataset={"itemId": 3}, style={"color": "red"}
+    )
+
+    assert updated.html_ == (
+        "<a href='/a' class='link active' data-item-id='3' style='color: red'><b>x</b></a>"
+    )
+    assert link.html_ == "<a href='/a' title='t' class='link'><b>x</b></a>"
+    assert updated._children is link._children
+    assert type(updated) is H
+    assert updated == H.a(
+        H.b("x"), href="/a", class_="link active", dataset={"itemId": 3}, style="color: red"
+    )
+    assert H.button("b", disabled=True).with_props(disabled=False).html_ == "<button>b</button>"
+    for removed in (None, False):
+        unstyled = updated.with_props(style=removed)
+        assert unstyled.html_ == "<a href='/a' class='link active' data-item-id='3'><b>x</b></a>"
+        assert unstyled == H.a(H.b("x"), href="/a", class_="link active", dataset={"itemId": 3})
+        assert H.p("x", style=removed).html_ == "<p>x</p>"
+
+    keyed = link.with_props(key="k")
+    assert keyed.key_ == "k" and link.key_ is None and keyed.with_props(key=None).key_ is None
+
+
+def test_with_props_validates_only_the_changes() -> None:
+    image = H.img(src="/a.png", alt="a")
+
+    assert image.with_props(alt="b").html_ == "<img src='/a.png' alt='b'/>"
+    with pytest.raises(ValueError):
+        H.button("b", type="submit").with_props(type="bogus")
+    with pytest.raises(ValueError):
+        image.with_props(src=None)
+    with pytest.raises(TypeError):
+        H.a("x").with_props(key=1.5)
+    with validation(strict=False):
+        kept = H.button("b", type="submit").with_props(type="bogus", name="n")
+    assert kept.html_ == "<button type='submit' name='n'>b</button>"
+
+
+def test_with_children_shares_props_and_keeps_validation() -> None:
+    item = H.li("old", class_="item", key=1)
+    updated = item.with_children("new ", [H.b("bold")], H.fragment("a", "b"))
+
+    assert updated.html_ == "<li class='item'>new <b>bold</b>ab</li>"
+    assert updated._props is item._props and updated.key_ == 1
+    with pytest.raises(ValueError):
+        H.br().with_children("x")
+    with pytest.raises(TypeError):
+        H.fragment("a").with_props(class_="x")
+    with pytest.raises(TypeError):
+        H.table_rows([(1,)]).with_children(H.tr())
+
+
+def test_replace_at_copies_only_the_path() -> None:
+    menu = nav()
+    menu.hash_
+    items = menu._children[0]._children  # type: ignore[union-attr]
+    target = items[2]
+    assert isinstance(target, _HBase)
+
+    active = menu.replace_at([0, 2], target.with_props(class_=["item", "active"]))
+
+    # Untouched subtrees keep their cached hashes; the copies along the path recompute theirs.
+    assert items[0]._hash is not None and active._hash is None  # type: ignore[union-attr]
+    assert active == nav(active=2) and active.html_ == nav(active=2).html_
+    assert menu == nav()
+    new_items = active._children[0]._children  # type: ignore[union-attr]
+    assert all(new_items[i] is items[i] for i in (0, 1, 3, 4))
+    assert new_items[2]._children is target._children  # type: ignore[union-attr]
+    assert diff(menu, active) == [{"op": "set_attr", "path": [0, 2], "name": "class", "value": "item active"}]
+
+
+def test_replace_at_paths() -> None:
+    node = H.div("text", H.p("a", H.b("b")), H.p("c"))
+
+    assert node.replace_at([-1], H.p("z")).html_ == "<div>text<p>a<b>b</b></p><p>z</p></div>"
+    assert node.replace_at([1, 1, 0], "B").html_ == "<div>text<p>a<b>B</b></p><p>c</p></div>"
+    assert node.replace_at([0], [H.i("x"), "y"]).html_ == "<div><i>x</i>y<p>a<b>b</b></p><p>c</p></div>"
+    with pytest.raises(ValueError):
+        node.replace_at([], "x")
+    with pytest.raises(IndexError):
+        node.replace_at([3], "x")
+    with pytest.raises(TypeError):
+        node.replace_at([0, 0], "x")
+
+
+def test_updated_static_nodes_render_their_new_children() -> None:
+    static = H.static(H.p("a"))
+    assert static.html_ == "<p>a</p>"
+
+    updated = static.with_children(H.p("b"))
+    assert updated.html_ == "<p>b</p>" and static.html_ == "<p>a</p>"
+    assert H.div(static).replace_at([0], H.p("c")).html_ == "<div><p>c</p></div>"
@@ -1,6 +1,70 @@
 # Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
 
-from ._base import raw
+from ._attrs import ClassList, Style
+from ._base import raw, validation
+from ._build import BuildReport, PageBuilder, PageStats, build_site, page, write_html
+from ._compress import (
+    StreamCompressor,
+    acompress_tokens,
+    compress_tokens,
+    negotiate_encoding,
+)
+from ._deferred import astream_tokens
+from ._diff import diff
+from ._document import Document
+from ._frame import dataframe_table
+from ._http import ASGIResponse, WSGIResponse
+from ._minify import MinifyOptions
+from ._nonce import abind_nonce, bind_nonce, csp_nonce, new_nonce
+from ._response_cache import CacheBackend, CacheEntry, MemoryCacheBackend, ResponseCache
+from ._shared_cache import SharedFragmentCache, fragment_key
+from ._table import TableStream
+from ._transform import (
+    ExternalLinkRel,
+    LazyLoading,
+    PrefixURLs,
+    Transformer,
+    TransformPipeline,
+)
 from .h import H
 
-__all__ = ["H", "raw"]
+__all__ = [
+    "ASGIResponse",
+    "BuildReport",
+    "CacheBackend",
+    "CacheEntry",
+    "ClassList",
+    "Document",
+    "ExternalLinkRel",
+    "H",
+    "LazyLoading",
+    "MemoryCacheBackend",
+    "MinifyOptions",
+    "PageBuilder",
+    "PageStats",
+    "PrefixURLs",
+    "ResponseCache",
+    "SharedFragmentCache",
+    "StreamCompressor",
+    "Style",
+    "TableStream",
+    "TransformPipeline",
+    "Transformer",
+    "WSGIResponse",
+    "abind_nonce",
+    "acompress_tokens",
+    "astream_tokens",
+    "bind_nonce",
+    "build_site",
+    "compress_tokens",
+    "csp_nonce",
+    "dataframe_table",
+    "diff",
+    "fragment_key",
+    "negotiate_encoding",
+    "new_nonce",
+    "page",
+    "raw",
+    "validation",
+    "write_html",
+]
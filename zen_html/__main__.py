@@ -0,0 +1,6 @@
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from ._build import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+"""
+_attrs.py
+
+This module provides precomputed `style` and `class` attribute values. A dict passed as
+`style=` or an iterable passed as `class_=` is converted again for every node; a `Style` or
+`ClassList` is converted and escaped once when it is created and passed through as it is by
+every tag helper, so a value shared by thousands of nodes costs nothing per node:
+
+    PRICE = Style(color="red", fontWeight="bold")
+    ITEM = ClassList("item", "card")
+    H.li(H.span(price, style=PRICE), class_=ITEM | "active" if selected else ITEM)
+
+Both are immutable `str` subclasses equal to the attribute text, so nodes built with them are
+equal to (and hash like) nodes built from the equivalent dict, list or string. Derived values
+(`|`, `add`, `remove`) are cached on the value they are derived from.
+
+Classes:
+    Style: Precomputed `style` attribute value.
+    ClassList: Precomputed `class` attribute value.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Iterable, Mapping, TypeVar
+
+from ._base import (
+    _escape_attr,
+    _normalize_class_attr,
+    _PreparedAttr,
+    _to_html_prop_name,
+)
+
+# Each value keeps at most this many derived values, so merges with ever-changing operands
+# cannot grow the cache without bound.
+_DERIVED_CACHE_SIZE = 64
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class Style(_PreparedAttr):
+    """
+    Immutable `style` attribute value, converted and escaped once.
+
+    Declarations are given as for a `style=` dict: camelCase and snake_case names become CSS
+    property names and None leaves a property out. Later declarations override earlier ones.
+
+    Args:
+        declarations (Style | Mapping[str, object] | None): Declarations to start from.
+        **more (object): Further declarations, e.g. ``fontSize="12px"``.
+
+    Example:
+        >>> Style({"color": "red"}, fontSize="12px")
+        Style('color: red; font-size: 12px')
+    """
+
+    __slots__ = ("_declarations", "_derived")
+
+    _declarations: tuple[tuple[str, str], ...]
+    _derived: dict[tuple[tuple[str, str | None], ...], Style]
+
+    def __new__(cls, declarations: Style | Mapping[str, object] | None = None, /, **more: object) -> Style:
+        items: dict[str, str] = {}
+        if isinstance(declarations, Style):
+            items.update(declarations._declarations)
+        elif isinstance(declarations, Mapping):
+            _update_declarations(items, declarations)
+        elif declarations is not None:
+            raise TypeError(f"Style declarations must be a Style or a mapping: {type(declarations)!r}")
+        _update_declarations(items, more)
+        return cls._from_items(tuple(items.items()))
+
+    @classmethod
+    def _from_items(cls, items: tuple[tuple[str, str], ...]) -> Style:
+        text = "; ".join(f"{name}: {value}" for name, value in items)
+        self = str.__new__(cls, text)
+        self.escaped = _escape_attr(text)
+        self._declarations = items
+        self._derived = {}
+        return self
+
+    @property
+    def declarations(self) -> Mapping[str, str]:
+        """The CSS declarations, by property name."""
+        return MappingProxyType(dict(self._declarations))
+
+    def __or__(self, other: Style | Mapping[str, object]) -> Style:
+        """Return this style with the declarations of `other` added or overriding (None removes)."""
+        updates: tuple[tuple[str, str | None], ...]
+        if isinstance(other, Style):
+            updates = other._declarations
+        elif isinstance(other, Mapping):
+            updates = tuple(
+                (_to_html_prop_name(name), None if value is None else str(value))
+                for name, value in other.items()
+            )
+        else:
+            return NotImplemented
+        merged = self._derived.get(updates)
+        if merged is None:
+            items = dict(self._declarations)
+            for name, value in updates:
+                if value is None:
+                    items.pop(name, None)
+                else:
+                    items[name] = value
+            merged = Style._from_items(tuple(items.items()))
+            _remember(self._derived, updates, merged)
+        return merged
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return Style._from_items, (self._declarations,)
+
+
+class ClassList(_PreparedAttr):
+    """
+    Immutable `class` attribute value, joined and escaped once.
+
+    Accepts what `class_=` accepts: strings (which may hold several names separated by spaces)
+    and iterables of strings, with None skipped. Repeated names are kept once, in order.
+
+    Args:
+        *classes (str | Iterable[str | None] | None): Class names.
+
+    Example:
+        >>> ClassList("btn", ["btn-primary", None]) | "active"
+        ClassList('btn btn-primary active')
+    """
+
+    __slots__ = ("_names", "_derived")
+
+    _names: tuple[str, ...]
+    _derived: dict[tuple[str, tuple[str, ...]], ClassList]
+
+    def __new__(cls, *classes: str | Iterable[str | None] | None) -> ClassList:
+        names: dict[str, None] = {}
+        for value in classes:
+            if value is not None:
+                names.update(dict.fromkeys(_normalize_class_attr(value).split()))
+        return cls._from_names(tuple(names))
+
+    @classmethod
+    def _from_names(cls, names: tuple[str, ...]) -> ClassList:
+        text = " ".join(names)
+        self = str.__new__(cls, text)
+        self.escaped = _escape_attr(text)
+        self._names = names
+        self._derived = {}
+        return self
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """The class names, in order."""
+        return self._names
+
+    def add(self, *names: str) -> ClassList:
+        """Return this list with `names` appended (names already present keep their place)."""
+        key = ("add", names)
+        derived = self._derived.get(key)
+        if derived is None:
+            derived = ClassList(self, *names)
+            _remember(self._derived, key, derived)
+        return derived
+
+    def remove(self, *names: str) -> ClassList:
+        """Return this list without `names` (each may hold several, separated by spaces)."""
+        key = ("remove", names)
+        derived = self._derived.get(key)
+        if derived is None:
+            removed = set(" ".join(names).split())
+            derived = ClassList._from_names(tuple(name for name in self._names if name not in removed))
+            _remember(self._derived, key, derived)
+        return derived
+
+    def __or__(self, other: str) -> ClassList:
+        """Same as `add(other)`."""
+        if not isinstance(other, str):
+            return NotImplemented
+        return self.add(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return ClassList._from_names, (self._names,)
+
+
+def _update_declarations(items: dict[str, str], declarations: Mapping[str, object]) -> None:
+    for name, value in declarations.items():
+        prop = _to_html_prop_name(name)
+        if value is None:
+            items.pop(prop, None)
+        else:
+            items[prop] = str(value)
+
+
+def _remember(cache: dict[_K, _V], key: _K, value: _V) -> None:
+    # Idempotent single-store publication, safe without a lock (see `_HBase`).
+    if len(cache) < _DERIVED_CACHE_SIZE:
+        cache[key] = value
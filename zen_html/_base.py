@@ -7,25 +7,61 @@ for HTML tag specifications.
 
 Classes:
     _HBase: Represents an HTML node with children, attributes, and rendering capabilities.
+    SupportsHTML: Protocol of markup-safe objects from other libraries (`__html__`).
 
 Functions:
     html_tag: A decorator for defining HTML tag helper methods.
     raw: Wraps pre-escaped HTML to bypass auto-escaping.
+    validation: Overrides `strict_validation` for the current thread or asyncio task.
 """
 
 # Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
 
 from __future__ import annotations
 
+import hashlib
 import html
 import logging
 import re
 import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import replace
 from datetime import date, datetime, time
-from typing import Callable, ClassVar, Iterable, ParamSpec, TypedDict, TypeVar, cast
-
+from types import GeneratorType, MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    Mapping,
+    ParamSpec,
+    Protocol,
+    Sequence,
+    TypedDict,
+    TypeGuard,
+    TypeVar,
+    cast,
+)
+
+from ._minify import (
+    UNKNOWN,
+    WHITESPACE_PRESERVING,
+    MinifyOptions,
+    _Unknown,
+    collapse_whitespace,
+    end_tag_omissible,
+    unquoted_attr_ok,
+)
 from ._tag_spec import normalized_tag_spec
 
+if TYPE_CHECKING:
+    from ._deferred import DeferredSource, _HDeferred
+    from ._query import _TreeIndex
+    from ._static import _HStatic
+    from ._table import _HColumnRows, _HTableRows
+
 VOID_TAGS: set[str] = {
     "area",
     "base",
@@ -83,6 +119,35 @@ def _build_tag_rules() -> dict[str, _TagRule]:
 
 _TAG_RULES: dict[str, _TagRule] = _build_tag_rules()
 
+_N = TypeVar("_N", bound="_HBase")
+
+# Per-context override of `_HBase.strict_validation`; None defers to the class attribute.
+_STRICT_VALIDATION: ContextVar[bool | None] = ContextVar("zen_html_strict_validation", default=None)
+
+# Elements that get the CSP nonce of the current render (see `zen_html._nonce`).
+NONCE_TAGS: frozenset[str] = frozenset({"script", "style", "link"})
+_CSP_NONCE: ContextVar[str | None] = ContextVar("zen_html_csp_nonce", default=None)
+
+
+@contextmanager
+def validation(strict: bool) -> Iterator[None]:
+    """
+    Override `H.strict_validation` for nodes constructed inside the block.
+
+    Assigning `H.strict_validation` changes the setting for every thread. The override is a
+    context variable instead: it applies to the current thread or asyncio task only (tasks
+    created inside the block inherit it), so concurrent renders with different settings do not
+    interfere. Blocks can be nested.
+
+    Args:
+        strict (bool): Raise on invalid attributes or children (True) or log a warning (False).
+    """
+    token = _STRICT_VALIDATION.set(strict)
+    try:
+        yield
+    finally:
+        _STRICT_VALIDATION.reset(token)
+
 
 class _HBase:
     """
@@ -90,12 +155,21 @@ class _HBase:
 
     Attributes:
         strict_validation (ClassVar[bool]): If True, raises exceptions for invalid attributes or children.
+            Process-wide default; use `validation()` to override it for one thread or task.
         logger (ClassVar[logging.Logger]): Logger for validation warnings.
 
+    Nodes are immutable once constructed and can be shared between threads, also on free-threaded
+    builds: rendering only reads them, and lazily cached values (`hash_`, `H.static` markup, table
+    row nodes, the query index, the `__html__` markup) are computed idempotently and published
+    with a single attribute or dict store, so a race at worst computes a value twice. Token
+    iterators are single-consumer.
+
     Methods:
         to_token: Generates HTML tokens for the node.
         html_: Returns the HTML string representation of the node.
+        __html__: Returns the cached HTML, for template engines using the `__html__` protocol.
         dict_: Returns a dictionary representation of the node.
+        find_all: Returns the elements of the subtree matching tag, id, class or key.
     """
 
     class RAW_STR(str):
@@ -110,8 +184,15 @@ class _HBase:
                 raise TypeError("RAW_STR value must be a string")
             super().__init__()
 
+        def __html__(self) -> str:
+            return self
+
     strict_validation: ClassVar[bool] = True
     logger: ClassVar[logging.Logger] = logging.getLogger("H")
+    _key: str | int | None = None
+    _hash: bytes | None = None
+    _index: _TreeIndex | None = None
+    _html_markup: str | None = None
 
     def __init__(
         self,
@@ -128,62 +209,198 @@ class _HBase:
         else:
             flattened = self._flatten_children(children)
         self._children = tuple(flattened)
-        class_value = props.get("class_")
-        if class_value is not None:
-            props["class_"] = _normalize_class_attr(class_value)
-        elif "class" in props and props["class"] is not None:
-            props["class"] = _normalize_class_attr(props["class"])
-        dataset = props.pop("dataset", None)
-        match dataset:
-            case None:
-                pass
-            case dict():
-                for dk, dv in dataset.items():
-                    key = f"data-{_to_html_prop_name(dk)}"
-                    props[key] = _to_dataset_value(dv)
-            case _:
-                raise ValueError(f"dataset must be dict: {type(dataset)}")
-
-        style = props.pop("style", None)
-        match style:
-            case None:
-                pass
-            case dict():
-                props["style"] = "; ".join(
-                    f"{_to_html_prop_name(k)}: {v}" for k, v in style.items() if v is not None
-                )
-            case str():
-                props["style"] = style
-            case _:
-                raise ValueError("style must be dict or str:", {type(style)})
+        key = props.pop("key", None)
+        if key is not None:
+            self._key = _check_key(key)
+        props = self._validate_constraints(_normalize_props(props))
+        processed_props: dict[str, str | bool] = {
+            name: value for name, value in _processed_props(props) if value is not False
+        }
+        self._props = processed_props
+
+    def with_props(self: _N, **props: PropVal) -> _N:
+        """
+        Return a copy of the node with some attributes added, changed or removed (None or False).
 
-        props = self._validate_constraints(props)
+        Only the given attributes are normalized and validated; the children and the other
+        attributes are shared with this node, not copied or re-flattened. `key=` sets the key.
 
-        processed_props: dict[str, str | bool] = {}
-        for k, v in props.items():
-            if v is None:
-                continue
-            value = _to_html_value(v)
+        Args:
+            **props (PropVal): Attributes as for the tag helper, e.g. ``class_="active"``.
+
+        Returns:
+            _N: A new node of the same type.
+        """
+        if isinstance(self, _HFragment):
+            raise TypeError("Fragments have no attributes")
+        clone = self._derive()
+        if "key" in props:
+            key = props.pop("key")
+            clone._key = None if key is None else _check_key(key)
+        checked = clone._validate_constraints(_normalize_props(props), existing=self._props)
+        merged = dict(self._props)
+        for name, value in _processed_props(checked):
             if value is False:
-                continue
-            processed_props[_to_html_prop_name(k)] = value
-        self._props = processed_props
+                merged.pop(name, None)
+            else:
+                merged[name] = value
+        clone._props = merged
+        return clone
+
+    def with_children(self: _N, *children: Children) -> _N:
+        """
+        Return a copy of the node with new children and the same tag, attributes and key.
+
+        The children are flattened as by the tag helper; attributes are neither copied nor
+        validated again. Nodes among the children are shared, together with their cached
+        hashes and rendered markup.
+        """
+        clone = self._derive()
+        clone._children = tuple(self._flatten_children(children))
+        if self._tag in VOID_TAGS and clone._children:
+            if self._handle_violation(ValueError(f"Void element <{self._tag}> cannot have children")):
+                clone._children = ()
+        return clone
 
-    def _validate_constraints(self, props: dict[str, PropVal]) -> dict[str, PropVal]:
+    def replace_at(self: _N, path: Sequence[int], new: Children) -> _N:
+        """
+        Return a copy of the tree with the child at `path` replaced by `new`.
+
+        `path` lists child indices from this node down, indexing the children each node was
+        built with (a fragment given as a child is spliced in; `H.static` and table-rows nodes
+        count as one child). Only the nodes along the path are copied; every other subtree is
+        shared with this tree, so hashes and static markup cached there are reused.
+
+        Args:
+            path (Sequence[int]): Non-empty list of child indices; negative indices count from
+                the end.
+            new (Children): The replacement: a node, text, or several children (an iterable
+                or a fragment), which are spliced in place of the old child.
+
+        Returns:
+            _N: The new root, of the same type as this node.
+        """
+        if not path:
+            raise ValueError("path must not be empty")
+        index, rest = path[0], path[1:]
+        children: list[Children] = list(self._children)
+        if rest:
+            child = children[index]
+            if not isinstance(child, _HBase):
+                raise TypeError(f"path {list(path)} passes through a text child: {child!r}")
+            children[index] = child.replace_at(rest, new)
+        else:
+            children[index] = new
+        return self.with_children(*children)
+
+    def _derive(self: _N) -> _N:
+        # A shallow copy sharing children, props and subclass state. Only the content hash, the
+        # query index and the `__html__` markup are dropped; subclasses that cache rendered output
+        # drop that as well.
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.pop("_hash", None)
+        clone.__dict__.pop("_index", None)
+        clone.__dict__.pop("_html_markup", None)
+        return clone
+
+    def walk(self) -> Iterator[tuple[tuple[int, ...], _HBase]]:
+        """
+        Yield this node and every element below it with its path, in document order.
+
+        Paths index the children each node was built with, as `replace_at` does; this node's
+        path is `()`. Fragment-like nodes (`H.static`, table rows) are walked through but not
+        yielded. The walk is lazy and does not build the query index.
+
+        Returns:
+            Iterator[tuple[tuple[int, ...], _HBase]]: `(path, node)` pairs.
+        """
+        from ._query import walk_tree
+
+        return walk_tree(self)
+
+    def find_by_id(self, id: str) -> _HBase | None:
+        """
+        Return the first element of this subtree (this node included) with the given `id`.
+
+        Like all queries, the first call indexes the subtree and caches the index on this node;
+        later lookups take constant time. See `find_all`.
+        """
+        return self._tree_index().find_by_id(id)
+
+    def find_all(
+        self,
+        tag: str | None = None,
+        *,
+        id: str | None = None,
+        class_: str | Iterable[str] | None = None,
+        key: str | int | None = None,
+        where: Callable[[_HBase], bool] | None = None,
+    ) -> list[_HBase]:
+        """
+        Return the elements of this subtree (this node included) matching all given criteria.
+
+        The first query on a node indexes its subtree by id, tag, class and key, and caches the
+        index on the node. A query then only visits the elements listed under its most selective
+        indexed criterion, so its cost grows with the number of candidates, not the tree size.
+        Nodes are immutable, so the index never goes stale; nodes derived with `with_props`,
+        `with_children` or `replace_at` are indexed anew when queried.
+
+        Args:
+            tag (str | None): Tag name, e.g. ``"a"``.
+            id (str | None): Value of the `id` attribute.
+            class_ (str | Iterable[str] | None): Class names the element must all have; a
+                string may hold several, separated by spaces.
+            key (str | int | None): The node's `key=`.
+            where (Callable[[_HBase], bool] | None): Predicate checked on the candidates left
+                by the other criteria.
+
+        Returns:
+            list[_HBase]: Matching elements in document order. Use `path_of` for their paths.
+        """
+        classes = class_.split() if isinstance(class_, str) else () if class_ is None else class_
+        return self._tree_index().find_all(tag, id, classes, key, where)
+
+    def path_of(self, node: _HBase) -> tuple[int, ...]:
+        """
+        Return the path from this node to `node`, as used by `replace_at` and `walk`.
+
+        The lookup uses the query index and takes time proportional to the depth of `node`. A
+        node shared by several positions in the tree resolves to the first of them.
+
+        Raises:
+            ValueError: If `node` (the object itself, not an equal node) is not in this subtree.
+        """
+        return self._tree_index().path_of(node)
+
+    def _tree_index(self) -> _TreeIndex:
+        index = self._index
+        if index is None:
+            from ._query import _TreeIndex
+
+            # Built once and published with a single store, like `hash_`.
+            index = self._index = _TreeIndex(self)
+        return index
+
+    def _validate_constraints(
+        self, props: dict[str, PropVal], existing: Iterable[str] = ()
+    ) -> dict[str, PropVal]:
+        # `existing` holds the attributes already set when `props` only updates a node.
         spec = _TAG_RULES.get(self._tag)
         if spec is None:
             return props
 
         checked = dict(props)
-        provided: set[str] = set()
+        provided: set[str] = set(existing)
         if self._tag in VOID_TAGS and self._children:
             if self._handle_violation(ValueError(f"Void element <{self._tag}> cannot have children")):
                 self._children = ()
 
         for pk, pv in list(checked.items()):
+            html_name = _to_html_prop_name(pk)
             if pv is None:
+                provided.discard(html_name)
                 continue
-            html_name = _to_html_prop_name(pk)
             provided.add(html_name)
             allowed = spec["choices"].get(html_name)
             if allowed:
@@ -214,61 +431,346 @@ class _HBase:
 
         return checked
 
+    @classmethod
+    def fragment(cls, *_children: Children, children: Children | None = None) -> _HFragment:
+        """
+        Group sibling nodes without a wrapper element.
+
+        A fragment renders only its children and is spliced into its parent on construction,
+        so `H.tbody(H.fragment(rows))` produces the same tree as `H.tbody(rows)`.
+        """
+        return _HFragment(*_children, children_kw=children)
+
+    @classmethod
+    def static(cls, *_children: Children, children: Children | None = None) -> _HStatic:
+        """
+        Group children whose markup is the same on every request (site header, footer, ...).
+
+        The children are rendered once and the markup is reused by every later render. With
+        `compress_tokens`, the markup is also compressed only once: its deflate blocks are
+        spliced into each response. See `zen_html._static._HStatic`.
+        """
+        from ._static import _HStatic
+
+        return _HStatic(*_children, children_kw=children)
+
+    @classmethod
+    def deferred(
+        cls, source: DeferredSource, *, fallback: Children = (), tag: str = "div", **props: PropVal
+    ) -> _HDeferred:
+        """
+        A placeholder for content that is loaded asynchronously (a slow widget, for instance).
+
+        `astream_tokens` sends the placeholder with its `fallback` in place, keeps streaming the
+        page while `source` runs, and sends the loaded content at the end of the document with a
+        script that swaps it in. Synchronous rendering shows the fallback. See
+        `zen_html._deferred._HDeferred`.
+        """
+        from ._deferred import _HDeferred
+
+        return _HDeferred(source, fallback=fallback, tag=tag, **props)
+
+    @classmethod
+    def table_rows(
+        cls,
+        rows: Iterable[Sequence[object] | Mapping[str, object]],
+        *,
+        columns: Sequence[str | int] | None = None,
+        formatters: Mapping[str | int, Callable[[object], object]] | None = None,
+        cell_attrs: Mapping[str | int, Mapping[str, object]] | None = None,
+        cell_tag: str = "td",
+    ) -> _HTableRows:
+        """
+        Render rows of data as `<tr>` elements without building per-cell nodes.
+
+        The output is identical to `H.tr(H.td(...), ...)` for every row, but rows are formatted
+        straight into markup during `to_token()`. See `zen_html._table._HTableRows`.
+        """
+        from ._table import _HTableRows
+
+        return _HTableRows(
+            rows, columns=columns, formatters=formatters, cell_attrs=cell_attrs, cell_tag=cell_tag
+        )
+
+    @classmethod
+    def table_columns(
+        cls,
+        columns: Mapping[str, Iterable[object]],
+        *,
+        formatters: Mapping[str, Callable[[object], object]] | None = None,
+        cell_attrs: Mapping[str, Mapping[str, object]] | None = None,
+        cell_tag: str = "td",
+    ) -> _HColumnRows:
+        """
+        Render columnar data (lists, `array.array`, NumPy arrays, ...) as `<tr>` elements.
+
+        Each column is formatted in bulk with `format_column`, and rows are assembled by joining
+        the pre-formatted cells, so no row tuples or per-cell nodes are created. The output is
+        identical to `H.table_rows` over the same data. All columns must have the same length.
+        """
+        from ._table import TableColumn, _format_column, _HColumnRows
+
+        formatters = formatters or {}
+        cell_attrs = cell_attrs or {}
+        unknown = (set(formatters) | set(cell_attrs)) - set(columns)
+        if unknown:
+            raise KeyError(f"Unknown columns: {sorted(unknown)}")
+        formatted = {name: _format_column(values, formatters.get(name)) for name, values in columns.items()}
+        return _HColumnRows(
+            [
+                TableColumn(cell_tag, cell_attrs.get(name, {}), cells)
+                for name, (cells, _) in formatted.items()
+            ],
+            [values for cells, values in formatted.values()],
+        )
+
     @classmethod
     def _handle_violation(cls, exc: Exception) -> bool:
-        if cls.strict_validation:
+        strict = _STRICT_VALIDATION.get()
+        if cls.strict_validation if strict is None else strict:
             raise exc
         cls.logger.warning("%s", exc)
         return True
 
     @classmethod
     def _flatten_children(cls, children: Iterable[Children]) -> Iterable[Child]:
-        for c in children:
-            match c:
-                case _HBase.RAW_STR():
-                    yield c
-                case str():
+        # Iterative, with a stack of iterators instead of a generator frame per nesting level.
+        # The common child types are dispatched on their exact type; only unusual iterables
+        # reach the (slow) `Iterable` ABC check. Stays lazy: a `Document` streams generators.
+        stack: list[Iterator[Children]] = []
+        it: Iterator[Children] = iter(children)
+        while True:
+            for c in it:
+                t = type(c)
+                if t is str or t is _RAW_STR:
+                    yield cast(Child, c)
+                elif t is list or t is tuple or t is GeneratorType:
+                    stack.append(it)
+                    it = iter(cast(Iterable[Children], c))
+                    break
+                elif isinstance(c, _HBase):
+                    if t is _HFragment:
+                        # Fragment children are already flat; splice them without descending.
+                        yield from c._children
+                    else:
+                        yield c
+                elif isinstance(c, str):
+                    # Markup-safe strings (`__html__`) are kept as they are, like RAW_STR.
                     yield c
-                case _HBase():
-                    yield c
-                case _ if isinstance(c, Iterable):
-                    yield from cls._flatten_children(c)
-                case _:
+                elif hasattr(t, "__html__"):
+                    yield _markup_of(c)
+                elif isinstance(c, Iterable):
+                    stack.append(it)
+                    it = iter(c)
+                    break
+                else:
                     raise TypeError(f"Invalid child type: {c}:{type(c)!r}")
+            else:
+                if not stack:
+                    return
+                it = stack.pop()
 
-    def to_token(self) -> Iterable[str]:
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            yield from self._minified_tokens(minify, None, UNKNOWN)
+            return
         yield f"<{self._tag}"
         for k, v in self._props.items():
             if v is True:
                 yield f" {k}"
             else:
-                escaped = v if isinstance(v, _HBase.RAW_STR) else _escape_attr(str(v))
+                escaped = _attr_markup(v)
                 yield f" {k}='{escaped}'"
+        if self._tag in NONCE_TAGS:
+            nonce = _nonce_attr(self._props)
+            if nonce:
+                yield nonce
         if self._tag in VOID_TAGS:
             yield "/>"
             return
         yield ">"
-        for child in self._children:
-            if isinstance(child, _HBase.RAW_STR):
-                yield str(child)
+        yield from self._children_tokens()
+        yield f"</{self._tag}>"
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        # `parent` and `following` describe the node's position (see `end_tag_omissible`).
+        tag = self._tag
+        if self._props or tag in NONCE_TAGS:
+            parts = [f"<{tag}"]
+            for k, v in self._props.items():
+                if v is True:
+                    parts.append(f" {k}")
+                    continue
+                escaped = _attr_markup(v)
+                if minify.unquoted_attrs and unquoted_attr_ok(escaped):
+                    parts.append(f" {k}={escaped}")
+                else:
+                    parts.append(f" {k}='{escaped}'")
+            if tag in NONCE_TAGS:
+                parts.append(_nonce_attr(self._props))
+            parts.append(">")
+            yield "".join(parts)
+        else:
+            yield f"<{tag}>"
+        if tag in VOID_TAGS:
+            return
+        if minify.collapse_whitespace and tag in WHITESPACE_PRESERVING:
+            minify = replace(minify, collapse_whitespace=False)
+        children = self._children
+        last = len(children) - 1
+        for i, child in enumerate(children):
+            if _is_markup(child):
+                yield child
             elif isinstance(child, str):
-                yield _escape_text(child)
+                text = _escape_text(child)
+                yield collapse_whitespace(text) if minify.collapse_whitespace else text
             else:
+                yield from child._minified_tokens(
+                    minify, tag, _sibling_tag(children[i + 1]) if i < last else None
+                )
+        if not (minify.omit_end_tags and end_tag_omissible(tag, parent, following)):
+            yield f"</{tag}>"
+
+    def _leading_tag(self) -> str | None | _Unknown:
+        """The tag a parser sees first when this node follows a sibling."""
+        return self._tag
+
+    def _content_children(self) -> tuple[Child, ...]:
+        # Fragment subclasses that render lazily (e.g. table rows) are kept as single children for
+        # to_token(); structural views (dict_, hash_, diff, pretty output) see their rows spliced in.
+        children = self._children
+        for child in children:
+            if isinstance(child, _HFragment):
+                break
+        else:
+            return children
+        expanded: list[Child] = []
+        for child in children:
+            if isinstance(child, _HFragment):
+                expanded.extend(child._content_children())
+            else:
+                expanded.append(child)
+        return tuple(expanded)
+
+    def _children_tokens(self) -> Iterable[str]:
+        for child in self._children:
+            if type(child) is str:
+                yield _escape_text(child)
+            elif isinstance(child, _HBase):
                 yield from child.to_token()
-        yield f"</{self._tag}>"
+            elif _is_markup(child):
+                yield child
+            else:
+                yield _escape_text(child)
 
     @property
     def html_(self) -> str:
         return "".join(self.to_token())
 
+    @property
+    def minified_html_(self) -> str:
+        """The HTML rendered with every `MinifyOptions` step enabled."""
+        return "".join(self.to_token(MinifyOptions()))
+
+    def __html__(self) -> str:
+        """
+        The rendered HTML, for libraries and template engines using the `__html__` protocol
+        (MarkupSafe, Jinja2, ...), which insert it without escaping.
+
+        Rendered once and cached like `hash_`; with a CSP nonce set (see `csp_nonce`), the node
+        is rendered again so that the markup carries that nonce.
+        """
+        if _CSP_NONCE.get() is not None:
+            return "".join(self.to_token())
+        markup = self._html_markup
+        if markup is None:
+            markup = self._html_markup = "".join(self.to_token())
+        return markup
+
     @property
     def dict_(self) -> dict[str, object]:
         return {
             "tag": self._tag,
-            "children": [_serialize_child(child) for child in self._children],
+            "children": [_serialize_child(child) for child in self._content_children()],
             "props": {k: _serialize_prop_value(v) for k, v in self._props.items()},
         }
 
+    @property
+    def tag_(self) -> str:
+        """The element's tag name; empty for fragments."""
+        return self._tag
+
+    @property
+    def props_(self) -> Mapping[str, str | bool]:
+        """Read-only view of the processed attributes, keyed by HTML name (``"class"``, ...)."""
+        return MappingProxyType(self._props)
+
+    @property
+    def children_(self) -> tuple[Child, ...]:
+        """The children the node was built with, after flattening; the indices `replace_at` uses."""
+        return self._children
+
+    @property
+    def key_(self) -> str | int | None:
+        """Identity given via `key=`; used to match children when diffing. Never rendered."""
+        return self._key
+
+    @property
+    def hash_(self) -> bytes:
+        """
+        Structural content hash of the node (16-byte BLAKE2b digest).
+
+        Combines the tag, the processed props and the hashes of all children, so equal markup
+        yields equal hashes across processes and Python versions. Computed lazily and cached;
+        children reuse their own cached hashes. `key=` is not part of the content.
+        """
+        digest = self._hash
+        if digest is None:
+            digest = self._hash = hashlib.blake2b(b"".join(self._hash_parts()), digest_size=16).digest()
+        return digest
+
+    def _hash_parts(self) -> list[bytes]:
+        # The hashed content of `hash_`; subclasses append what else sets them apart.
+        parts = [
+            b"F" if isinstance(self, _HFragment) else b"E",
+            _hash_text(self._tag),
+            len(self._props).to_bytes(4, "little"),
+        ]
+        for k, v in self._props.items():
+            parts.append(_hash_text(k))
+            if v is True:
+                parts.append(b"T")
+            else:
+                parts.append(b"R" if _is_markup(v) else b"S")
+                parts.append(_hash_text(str(v)))
+        children = self._content_children()
+        parts.append(len(children).to_bytes(4, "little"))
+        for child in children:
+            if isinstance(child, _HBase):
+                parts.append(b"N")
+                parts.append(child.hash_)
+            else:
+                parts.append(b"R" if _is_markup(child) else b"S")
+                parts.append(_hash_text(child))
+        return parts
+
+    @property
+    def etag_(self) -> str:
+        """Strong HTTP ETag derived from `hash_`, computed without rendering."""
+        return f'"{self.hash_.hex()}"'
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, _HBase):
+            return NotImplemented
+        return self.hash_ == other.hash_
+
+    def __hash__(self) -> int:
+        return int.from_bytes(self.hash_[:8], "little")
+
     def __str__(self) -> str:
         return self.html_
 
@@ -285,15 +787,15 @@ class _HBase:
             if v is True:
                 parts.append(f" {k}")
             else:
-                escaped = v if isinstance(v, _HBase.RAW_STR) else _escape_attr(str(v))
+                escaped = _attr_markup(v)
                 parts.append(f" {k}='{escaped}'")
         attrs = "".join(parts)
         if self._tag in VOID_TAGS:
             return f"{pad}<{self._tag}{attrs} />"
 
         inner_parts = []
-        for c in self._children:
-            if isinstance(c, _HBase.RAW_STR):
+        for c in self._content_children():
+            if _is_markup(c):
                 inner_parts.append("  " * (indent + 1) + str(c))
             elif isinstance(c, str):
                 inner_parts.append("  " * (indent + 1) + _escape_text(c))
@@ -314,7 +816,7 @@ class _HBase:
         pad2 = "  " * (indent + 1)
         pad3 = "  " * (indent + 2)
 
-        lines.append(f"{pad2}'tag': {self._tag!r},")
+        lines.append(f"{pad2}'tag': {(self._tag or None)!r},")
 
         if self._props:
             lines.append(f"{pad2}'props': {{")
@@ -325,8 +827,8 @@ class _HBase:
             lines.append(f"{pad2}'props': {{}},")
 
         lines.append(f"{pad2}'children': [")
-        for c in self._children:
-            if isinstance(c, _HBase.RAW_STR):
+        for c in self._content_children():
+            if _is_markup(c):
                 lines.append(f"{pad3}  {str(c)!r},")
             elif isinstance(c, str):
                 lines.append(f"{pad3}  {_escape_text(str(c))!r},")
@@ -338,14 +840,145 @@ class _HBase:
         return "\n".join(lines)
 
 
+class _HFragment(_HBase):
+    """
+    A node that renders its children without emitting a tag of its own.
+
+    Fragments keep `html_`, `to_token`, `dict_` and streaming available for lists of siblings
+    (several `<tr>` or `<option>` nodes, for instance). When nested inside another node, the
+    fragment's already-flattened children are spliced into the parent directly.
+    """
+
+    def __init__(self, *children: Children, children_kw: Children | None = None):
+        self._tag = ""
+        if children_kw is not None and children:
+            raise ValueError("Provide children either positionally or via 'children' keyword, not both")
+        source = (children_kw,) if children_kw is not None else children
+        self._children = tuple(self._flatten_children(source))
+        self._props = {}
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        return self._children_tokens()
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        # The children take the fragment's place in its parent.
+        return _minified_children(self._children, minify, parent, following)
+
+    def _leading_tag(self) -> str | None | _Unknown:
+        return _sibling_tag(self._children[0]) if self._children else UNKNOWN
+
+    @property
+    def dict_(self) -> dict[str, object]:
+        return {
+            "tag": None,
+            "children": [_serialize_child(child) for child in self._content_children()],
+            "props": {},
+        }
+
+    def __repr__(self) -> str:
+        return f"H.fragment(children={self._children!r})"
+
+    def _pretty_html(self, indent: int = 0) -> str:
+        pad = "  " * indent
+        parts = []
+        for c in self._content_children():
+            if _is_markup(c):
+                parts.append(pad + str(c))
+            elif isinstance(c, str):
+                parts.append(pad + _escape_text(c))
+            else:
+                parts.append(c._pretty_html(indent))
+        return "\n".join(parts)
+
+
+class SupportsHTML(Protocol):
+    """Objects of other libraries that render themselves as markup (MarkupSafe's `__html__`)."""
+
+    def __html__(self) -> str: ...
+
+
 Child = _HBase | str | _HBase.RAW_STR
-Children = Child | Iterable[Child]
+# Module-level alias for the exact-type checks in `_flatten_children`.
+_RAW_STR = _HBase.RAW_STR
+Children = Child | SupportsHTML | Iterable[Child | SupportsHTML]
+
+
+def _sibling_tag(child: Child) -> str | None | _Unknown:
+    # Text and raw HTML may start with anything (whitespace, a comment), so they are unknown.
+    return child._leading_tag() if isinstance(child, _HBase) else UNKNOWN
+
+
+def _minified_children(
+    children: Sequence[Child], minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+) -> Iterable[str]:
+    last = len(children) - 1
+    for i, child in enumerate(children):
+        if _is_markup(child):
+            yield child
+        elif isinstance(child, str):
+            text = _escape_text(child)
+            yield collapse_whitespace(text) if minify.collapse_whitespace else text
+        else:
+            next_tag = _sibling_tag(children[i + 1]) if i < last else following
+            yield from child._minified_tokens(minify, parent, next_tag)
 
 
 _P = ParamSpec("_P")
 _S = TypeVar("_S", bound=_HBase)
 
 
+def _check_key(key: object) -> str | int:
+    if not isinstance(key, (str, int)) or isinstance(key, bool):
+        raise TypeError(f"key must be str or int: {type(key)!r}")
+    return key
+
+
+def _normalize_props(props: dict[str, PropVal]) -> dict[str, PropVal]:
+    """Expand `class_`, `dataset` and `style` values into plain attribute values (in place)."""
+    class_value = props.get("class_")
+    if class_value is not None:
+        props["class_"] = _normalize_class_attr(class_value)
+    elif "class" in props and props["class"] is not None:
+        props["class"] = _normalize_class_attr(props["class"])
+    dataset = props.pop("dataset", None)
+    match dataset:
+        case None:
+            pass
+        case dict():
+            for dk, dv in dataset.items():
+                key = f"data-{_to_html_prop_name(dk)}"
+                props[key] = _to_dataset_value(dv)
+        case _:
+            raise ValueError(f"dataset must be dict: {type(dataset)}")
+
+    if "style" not in props:
+        return props
+    style = props.pop("style")
+    match style:
+        case None | False:
+            # Kept as "no attribute", so that `with_props` removes an existing style.
+            props["style"] = None
+        case dict():
+            props["style"] = "; ".join(
+                f"{_to_html_prop_name(k)}: {v}" for k, v in style.items() if v is not None
+            )
+        case str():
+            props["style"] = style
+        case _:
+            raise ValueError("style must be dict or str:", {type(style)})
+    return props
+
+
+def _processed_props(props: Mapping[str, PropVal]) -> Iterator[tuple[str, str | bool]]:
+    # HTML names and rendered values; None and False mean "no attribute" and come out as False.
+    for k, v in props.items():
+        yield _to_html_prop_name(k), False if v is None else _to_html_value(v)
+
+
 def html_tag(fn: Callable[_P, _S]) -> Callable[_P, _S]:
     """
     A decorator for defining HTML tag helper methods.
@@ -372,6 +1005,11 @@ def html_tag(fn: Callable[_P, _S]) -> Callable[_P, _S]:
     return classmethod(wrapper)  # type: ignore[arg-type, return-value]
 
 
+def _hash_text(value: str) -> bytes:
+    data = value.encode("utf-8", "surrogatepass")
+    return len(data).to_bytes(8, "little") + data
+
+
 def _to_html_prop_name(name: str) -> str:
     if name in PROP_NAME_MAP:
         return PROP_NAME_MAP[name]
@@ -392,8 +1030,10 @@ def _to_html_value(v: PropVal | object) -> str | bool:
         return v.isoformat(timespec="seconds")
     if isinstance(v, bool):
         return v
-    if isinstance(v, _HBase.RAW_STR):
+    if isinstance(v, _PreparedAttr) or _is_markup(v):
         return v
+    if hasattr(type(v), "__html__"):
+        return _markup_of(v)
     return str(v)
 
 
@@ -427,10 +1067,57 @@ def _escape_text(value: str) -> str:
     return html.escape(value, quote=False)
 
 
+def _is_markup(value: object) -> TypeGuard[str]:
+    """True for strings inserted without escaping: `RAW_STR` and markup-safe `__html__` strings."""
+    t = type(value)
+    return t is not str and isinstance(value, str) and hasattr(t, "__html__")
+
+
+def _markup_of(value: object) -> str:
+    # The markup of a non-string `__html__` object, marked so that it is not escaped.
+    markup = value.__html__()  # type: ignore[attr-defined]
+    if not isinstance(markup, str):
+        raise TypeError(f"__html__() must return str: {type(markup)!r}")
+    return markup if _is_markup(markup) else _HBase.RAW_STR(markup)
+
+
 def _escape_attr(value: str) -> str:
     return html.escape(value, quote=True)
 
 
+class _PreparedAttr(str):
+    """Base of attribute values that carry their escaped markup (`Style`, `ClassList`)."""
+
+    __slots__ = ("escaped",)
+
+    escaped: str
+
+
+def _attr_markup(value: str | bool) -> str:
+    # The escaped form of a rendered attribute value: RAW_STR and `__html__` strings are markup
+    # already and prepared values escaped themselves once.
+    if type(value) is str:
+        return _escape_attr(value)
+    if isinstance(value, _PreparedAttr):
+        return value.escaped
+    if _is_markup(value):
+        return value
+    return _escape_attr(str(value))
+
+
+def _nonce_attr(props: Mapping[str, object]) -> str:
+    # The `nonce` attribute of a start tag in NONCE_TAGS, empty when no nonce is set for the
+    # current render or the element sets its own.
+    nonce = _CSP_NONCE.get()
+    if nonce is None or "nonce" in props:
+        return ""
+    return _format_nonce_attr(nonce)
+
+
+def _format_nonce_attr(nonce: str) -> str:
+    return f" nonce='{_escape_attr(nonce)}'"
+
+
 def _repr_prop_value(value: str | bool) -> str:
     if isinstance(value, (_HBase.RAW_STR, str)):
         return repr(_escape_attr(str(value)))
@@ -440,13 +1127,13 @@ def _repr_prop_value(value: str | bool) -> str:
 def _serialize_child(child: Child) -> object:
     if isinstance(child, _HBase):
         return child.dict_
-    if isinstance(child, _HBase.RAW_STR):
+    if _is_markup(child):
         return str(child)
     return _escape_text(child)
 
 
 def _serialize_prop_value(value: str | _HBase.RAW_STR | bool) -> object:
-    if isinstance(value, _HBase.RAW_STR):
+    if _is_markup(value):
         return str(value)
     if isinstance(value, str):
         return _escape_attr(str(value))
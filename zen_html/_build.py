@@ -0,0 +1,558 @@
+"""
+_build.py
+
+This module builds static sites. A page builder is a function decorated with `page`, which
+declares where its pages go and the parameters of every page it produces:
+
+    @page("products/{slug}.html", params=lambda: ({"slug": p.slug, "product": p} for p in load()))
+    def product(slug: str, product: Product) -> H:
+        return H.html(...)
+
+`build_site` (and `python -m zen_html build`) finds the builders in the given modules and
+renders their pages across a process pool, each straight into its file with `write_html`. A
+manifest in the output directory records, per page, a hash of its parameters and of the code
+that renders it (the builder's module source and zen_html itself); pages whose hashes match
+and whose file still exists are skipped on the next build.
+
+Classes:
+    PageBuilder: A function producing pages, with their output paths and parameters.
+    PageStats: Outcome of one page in a build.
+    BuildReport: Outcome of a build.
+
+Functions:
+    page: Decorator turning a function into a `PageBuilder`.
+    write_html: Renders a node or token stream straight into a file.
+    build_site: Renders the pages of the builders found in some modules.
+    main: Command-line entry point (`python -m zen_html build`).
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import functools
+import hashlib
+import importlib
+import json
+import marshal
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from types import ModuleType
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping, Sequence, Union
+
+from ._base import _HBase
+from ._minify import MinifyOptions
+from ._response_cache import DOCTYPE
+
+PageContent = Union[_HBase, Iterable[str]]
+PageParams = Union[Iterable[Mapping[str, Any]], Callable[[], Iterable[Mapping[str, Any]]]]
+
+MANIFEST_NAME = ".zen_html-manifest.json"
+_MANIFEST_VERSION = 1
+
+# write_html() joins tokens into writes of about this many characters.
+_WRITE_CHARS = 64 * 1024
+# Pages handed to a worker process at a time, at most.
+_MAX_BATCH = 64
+
+
+def write_html(
+    content: PageContent,
+    target: str | os.PathLike[str] | IO[bytes],
+    *,
+    include_doctype: bool = False,
+    minify: MinifyOptions | None = None,
+) -> int:
+    """
+    Render a node or a token stream into a file without building the whole document string.
+
+    Tokens are encoded and written in batches of about 64K characters. When `target` is a
+    path, its directory is created if needed and the markup is written to a temporary file
+    that replaces the target once it is complete, so a reader never sees a partial page.
+
+    Args:
+        content (PageContent): A node (rendered with `to_token()`), or a sync iterable of
+            rendered tokens such as a `Document` or a `TableStream`.
+        target (str | os.PathLike[str] | IO[bytes]): A file path or a binary file object.
+        include_doctype (bool): Start with ``<!DOCTYPE html>``.
+        minify (MinifyOptions | None): Render a node minified.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if not isinstance(target, (str, os.PathLike)):
+        return _write_tokens(content, target, include_doctype, minify)
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporary, "wb") as file:
+            size = _write_tokens(content, file, include_doctype, minify)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    os.replace(temporary, path)
+    return size
+
+
+def _write_tokens(
+    content: PageContent, file: IO[bytes], include_doctype: bool, minify: MinifyOptions | None
+) -> int:
+    tokens = content.to_token(minify) if isinstance(content, _HBase) else content
+    batch: list[str] = [DOCTYPE] if include_doctype else []
+    chars = 0
+    size = 0
+    for token in tokens:
+        batch.append(token)
+        chars += len(token)
+        if chars >= _WRITE_CHARS:
+            size += file.write("".join(batch).encode())
+            batch.clear()
+            chars = 0
+    if batch:
+        size += file.write("".join(batch).encode())
+    return size
+
+
+class PageBuilder:
+    """
+    A function rendering the pages of a static site, with their output paths and parameters.
+
+    Calling the builder calls the function. Builders are usually created with `page`.
+
+    Args:
+        fn (Callable[..., PageContent]): Returns the content of one page (a node, a `Document`
+            or another sync token iterable) for one set of keyword arguments.
+        path (str): Output path relative to the output directory, formatted with each page's
+            parameters, e.g. ``"products/{slug}.html"``. It must stay inside the directory.
+        params (PageParams | None): The keyword arguments of every page: an iterable of
+            mappings, or a zero-argument callable returning one (called when the site is
+            built). None produces a single page without arguments. The values are hashed to
+            detect changed pages and are sent to worker processes, so they must be picklable.
+        include_doctype (bool): Prepend ``<!DOCTYPE html>`` to node content (a `Document`
+            writes its own).
+        minify (MinifyOptions | None): Render nodes minified.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., PageContent],
+        path: str,
+        *,
+        params: PageParams | None = None,
+        include_doctype: bool = True,
+        minify: MinifyOptions | None = None,
+    ) -> None:
+        self.fn = fn
+        self.path = path
+        self.params = params
+        self.include_doctype = include_doctype
+        self.minify = minify
+        functools.update_wrapper(self, fn)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> PageContent:
+        return self.fn(*args, **kwargs)
+
+    def pages(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield the relative output path and the keyword arguments of every page."""
+        params = self.params() if callable(self.params) else self.params
+        for kwargs in ({},) if params is None else params:
+            yield _relative_path(self.path.format(**kwargs)), dict(kwargs)
+
+    def render(self, kwargs: Mapping[str, Any], target: str | os.PathLike[str] | IO[bytes]) -> int:
+        """Render the page for `kwargs` into `target` with `write_html`; return its size in bytes."""
+        content = self.fn(**kwargs)
+        include_doctype = self.include_doctype and isinstance(content, _HBase)
+        return write_html(content, target, include_doctype=include_doctype, minify=self.minify)
+
+    def __repr__(self) -> str:
+        return f"PageBuilder({self.fn.__qualname__}, {self.path!r})"
+
+
+def page(
+    path: str,
+    *,
+    params: PageParams | None = None,
+    include_doctype: bool = True,
+    minify: MinifyOptions | None = None,
+) -> Callable[[Callable[..., PageContent]], PageBuilder]:
+    """
+    Decorator declaring a module-level function as a page builder. See `PageBuilder`.
+
+        @page("tags/{tag}.html", params=[{"tag": "python"}, {"tag": "html"}])
+        def tag_page(tag: str) -> H:
+            return H.html(H.body(H.h1(tag)))
+    """
+
+    def decorate(fn: Callable[..., PageContent]) -> PageBuilder:
+        return PageBuilder(fn, path, params=params, include_doctype=include_doctype, minify=minify)
+
+    return decorate
+
+
+@dataclass(frozen=True)
+class PageStats:
+    """
+    Outcome of one page in a build.
+
+    Attributes:
+        path (str): Output path relative to the output directory.
+        status (str): ``"rendered"``, ``"skipped"`` (unchanged) or ``"failed"``.
+        bytes (int): Size of the page file.
+        seconds (float): Time spent rendering and writing the page (0 when skipped).
+        error (str | None): The exception raised by a failed page.
+    """
+
+    path: str
+    status: str
+    bytes: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class BuildReport:
+    """
+    Outcome of a build.
+
+    Attributes:
+        pages (list[PageStats]): Every page of the site, in build order.
+        seconds (float): Wall-clock time of the build.
+        jobs (int): Number of worker processes (1 renders in the calling process).
+        stale (list[str]): Pages recorded by the previous build that no builder produces now.
+    """
+
+    pages: list[PageStats]
+    seconds: float
+    jobs: int
+    stale: list[str] = field(default_factory=list)
+
+    @property
+    def rendered(self) -> list[PageStats]:
+        return [stats for stats in self.pages if stats.status == "rendered"]
+
+    @property
+    def skipped(self) -> list[PageStats]:
+        return [stats for stats in self.pages if stats.status == "skipped"]
+
+    @property
+    def failed(self) -> list[PageStats]:
+        return [stats for stats in self.pages if stats.status == "failed"]
+
+    def summary(self, slowest: int = 5) -> str:
+        """Counts, sizes and render times of the build, with its slowest pages."""
+        rendered = self.rendered
+        lines = [
+            f"{len(self.pages)} pages in {self.seconds:.2f} s with {self.jobs} job(s): "
+            f"{len(rendered)} rendered, {len(self.skipped)} skipped, {len(self.failed)} failed"
+        ]
+        if rendered:
+            render_seconds = [stats.seconds for stats in rendered]
+            lines.append(
+                f"  wrote {sum(stats.bytes for stats in rendered) / 1e6:.2f} MB at "
+                f"{len(rendered) / max(self.seconds, 1e-9):.0f} pages/s; per page "
+                f"{sum(render_seconds) / len(rendered) * 1000:.2f} ms mean, "
+                f"{max(render_seconds) * 1000:.2f} ms max"
+            )
+            for stats in sorted(rendered, key=lambda stats: stats.seconds, reverse=True)[:slowest]:
+                lines.append(f"  {stats.seconds * 1000:9.2f} ms {stats.bytes:>10,d} B  {stats.path}")
+        for stats in self.failed:
+            lines.append(f"  FAILED {stats.path}: {stats.error}")
+        if self.stale:
+            lines.append(f"  {len(self.stale)} page(s) no longer produced by any builder")
+        return "\n".join(lines)
+
+
+def build_site(
+    modules: Sequence[str | ModuleType],
+    out_dir: str | os.PathLike[str],
+    *,
+    jobs: int | None = None,
+    manifest: str | os.PathLike[str] | None = None,
+    force: bool = False,
+    prune: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+) -> BuildReport:
+    """
+    Render the pages of every `PageBuilder` defined at the top level of `modules`.
+
+    Pages are rendered in batches across `jobs` worker processes, which import the builders'
+    modules by name. A page is skipped when the manifest holds the same parameter and code
+    hashes for it and its file exists. Code changes outside the builder's module (helpers
+    imported from elsewhere, templates read from files) are not detected; pass `force=True`
+    to rebuild everything after such changes. A page that raises is reported as failed and
+    left out of the manifest, so it is retried by the next build.
+
+    Args:
+        modules (Sequence[str | ModuleType]): Modules, or their dotted names, to search.
+        out_dir (str | os.PathLike[str]): Output directory.
+        jobs (int | None): Worker processes; None uses `os.cpu_count()`, 1 renders in the
+            calling process.
+        manifest (str | os.PathLike[str] | None): Manifest file; defaults to
+            ``<out_dir>/.zen_html-manifest.json``.
+        force (bool): Render every page regardless of the manifest.
+        prune (bool): Delete the files of pages that are no longer produced.
+        progress (Callable[[int, int], None] | None): Called with (done, total) as pages are
+            rendered.
+
+    Returns:
+        BuildReport: Per-page results and timings.
+    """
+    start = time.perf_counter()
+    out = Path(out_dir)
+    manifest_path = Path(manifest) if manifest is not None else out / MANIFEST_NAME
+    recorded = _load_manifest(manifest_path)
+    previous = {} if force else recorded
+    entries: dict[str, dict[str, Any]] = {}
+    results: dict[str, PageStats] = {}
+    todo: list[tuple[str, str, list[tuple[str, dict[str, Any]]]]] = []
+    hashes: dict[str, tuple[str, str]] = {}
+
+    for module_name, attr, builder in _discover(modules):
+        code = _code_hash(builder)
+        pending: list[tuple[str, dict[str, Any]]] = []
+        for path, kwargs in builder.pages():
+            if path in hashes:
+                raise ValueError(f"Two pages are written to {path!r}")
+            hashes[path] = (_input_hash(kwargs), code)
+            entry = previous.get(path)
+            if (
+                entry is not None
+                and (entry["input"], entry["code"]) == hashes[path]
+                and (out / path).is_file()
+            ):
+                entries[path] = entry
+                results[path] = PageStats(path, "skipped", entry["bytes"])
+            else:
+                results[path] = PageStats(path, "pending")
+                pending.append((path, kwargs))
+        if pending:
+            todo.append((module_name, attr, pending))
+
+    jobs = jobs or os.cpu_count() or 1
+    total = sum(len(pages) for _, _, pages in todo)
+    for stats in _render(todo, str(out), jobs, total, progress):
+        results[stats.path] = stats
+        if stats.status == "rendered":
+            input_hash, code = hashes[stats.path]
+            entries[stats.path] = {
+                "input": input_hash,
+                "code": code,
+                "bytes": stats.bytes,
+                "seconds": stats.seconds,
+            }
+
+    stale = sorted(set(recorded) - set(hashes))
+    if prune:
+        for path in stale:
+            (out / path).unlink(missing_ok=True)
+    _save_manifest(manifest_path, entries)
+    return BuildReport(list(results.values()), time.perf_counter() - start, jobs, stale)
+
+
+def _render(
+    todo: list[tuple[str, str, list[tuple[str, dict[str, Any]]]]],
+    out_dir: str,
+    jobs: int,
+    total: int,
+    progress: Callable[[int, int], None] | None,
+) -> Iterator[PageStats]:
+    done = 0
+    if jobs == 1 or total <= 1:
+        for module_name, attr, pages in todo:
+            for item in pages:
+                for stats in _render_batch(out_dir, module_name, attr, [item]):
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+                    yield stats
+        return
+    # Several batches per worker keep the processes busy until the end of the build.
+    size = max(1, min(_MAX_BATCH, -(-total // (jobs * 4))))
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(list(sys.path),)) as pool:
+        futures = [
+            pool.submit(_render_batch, out_dir, module_name, attr, batch)
+            for module_name, attr, pages in todo
+            for batch in _batches(pages, size)
+        ]
+        for future in as_completed(futures):
+            batch = future.result()
+            done += len(batch)
+            if progress is not None:
+                progress(done, total)
+            yield from batch
+
+
+def _batches(
+    pages: list[tuple[str, dict[str, Any]]], size: int
+) -> Iterator[list[tuple[str, dict[str, Any]]]]:
+    it = iter(pages)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _init_worker(path: list[str]) -> None:
+    # Workers that are spawned rather than forked must find the builders' modules too.
+    sys.path[:] = path
+
+
+def _render_batch(
+    out_dir: str, module_name: str, attr: str, pages: list[tuple[str, dict[str, Any]]]
+) -> list[PageStats]:
+    builder = getattr(importlib.import_module(module_name), attr)
+    results = []
+    for path, kwargs in pages:
+        start = time.perf_counter()
+        try:
+            size = builder.render(kwargs, Path(out_dir, path))
+        except Exception as exc:
+            results.append(PageStats(path, "failed", error=f"{type(exc).__name__}: {exc}"))
+        else:
+            results.append(PageStats(path, "rendered", size, time.perf_counter() - start))
+    return results
+
+
+def _discover(modules: Sequence[str | ModuleType]) -> Iterator[tuple[str, str, PageBuilder]]:
+    for module in modules:
+        if isinstance(module, str):
+            module = importlib.import_module(module)
+        found = False
+        for attr, value in vars(module).items():
+            if isinstance(value, PageBuilder) and value.fn.__module__ == module.__name__:
+                found = True
+                yield module.__name__, attr, value
+        if not found:
+            raise ValueError(f"No page builders found in module {module.__name__!r}")
+
+
+def _relative_path(path: str) -> str:
+    pure = PurePosixPath(path.replace("\\", "/"))
+    if pure.is_absolute() or ".." in pure.parts or not pure.parts:
+        raise ValueError(f"Page path must be relative and stay inside the output directory: {path!r}")
+    return str(pure)
+
+
+@functools.lru_cache(maxsize=None)
+def _library_hash() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for source in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _code_hash(builder: PageBuilder) -> str:
+    digest = hashlib.blake2b(_library_hash().encode(), digest_size=16)
+    module = sys.modules.get(builder.fn.__module__)
+    source = getattr(module, "__file__", None)
+    digest.update(
+        Path(source).read_bytes() if source else marshal.dumps(getattr(builder.fn, "__code__", None))
+    )
+    digest.update(
+        repr((builder.fn.__qualname__, builder.path, builder.include_doctype, builder.minify)).encode()
+    )
+    return digest.hexdigest()
+
+
+def _input_hash(kwargs: Mapping[str, Any]) -> str:
+    data = json.dumps(
+        kwargs, sort_keys=True, default=_json_default, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    # Objects without a stable encoding fall back to repr; one that includes an address makes
+    # the page render every time, which is safe.
+    if isinstance(value, _HBase):
+        return value.hash_.hex()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(repr, value))
+    if isinstance(value, Mapping):
+        return dict(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return repr(value)
+
+
+def _load_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _MANIFEST_VERSION:
+        return {}
+    pages = data.get("pages")
+    return pages if isinstance(pages, dict) else {}
+
+
+def _save_manifest(path: Path, pages: Mapping[str, Mapping[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    data = {"version": _MANIFEST_VERSION, "pages": dict(sorted(pages.items()))}
+    temporary.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the `python -m zen_html` command line; return the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m zen_html", description="ZenHtml command line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Render the pages of static site builders.")
+    build.add_argument("modules", nargs="+", help="Dotted names of modules defining @page builders.")
+    build.add_argument("-o", "--out", default="build", help="Output directory (default: build).")
+    build.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    build.add_argument("--manifest", default=None, help=f"Manifest file (default: <out>/{MANIFEST_NAME}).")
+    build.add_argument("--force", action="store_true", help="Render every page, ignoring the manifest.")
+    build.add_argument("--prune", action="store_true", help="Delete pages that are no longer produced.")
+    build.add_argument("--slowest", type=int, default=5, help="Number of slowest pages to list (default: 5).")
+    build.add_argument("-v", "--verbose", action="store_true", help="List every rendered page.")
+    build.add_argument("-q", "--quiet", action="store_true", help="Do not report progress.")
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be positive")
+    # Like `python -m`, resolve builder modules from the current directory.
+    if "" not in sys.path and os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    report = build_site(
+        args.modules,
+        args.out,
+        jobs=args.jobs,
+        manifest=args.manifest,
+        force=args.force,
+        prune=args.prune,
+        progress=None if args.quiet else _ProgressPrinter(sys.stderr),
+    )
+    if args.verbose:
+        for stats in report.rendered:
+            print(f"{stats.seconds * 1000:9.2f} ms {stats.bytes:>10,d} B  {stats.path}")
+    print(report.summary(args.slowest))
+    return 1 if report.failed else 0
+
+
+class _ProgressPrinter:
+    """Progress callback printing at most a few lines per second."""
+
+    def __init__(self, stream: IO[str], interval: float = 0.5) -> None:
+        self._stream = stream
+        self._interval = interval
+        self._start = self._last = time.perf_counter()
+
+    def __call__(self, done: int, total: int) -> None:
+        now = time.perf_counter()
+        if done < total and now - self._last < self._interval:
+            return
+        self._last = now
+        rate = done / max(now - self._start, 1e-9)
+        print(
+            f"[{done:>{len(str(total))}}/{total}] {done / total:6.1%}  {rate:,.0f} pages/s", file=self._stream
+        )
@@ -0,0 +1,336 @@
+"""
+_compress.py
+
+This module compresses rendered HTML while it streams. Tokens from `to_token()` (or any text
+chunks) are batched, deflated with stdlib `zlib`, and sync-flushed only at useful boundaries,
+so the client can start on `<head>` early without every tiny token turning into its own
+compressed block.
+
+The deflate stream is raw; the gzip (RFC 1952) or zlib (RFC 1950, the HTTP "deflate" coding)
+header and trailer are written here, with the checksum tracked alongside. Static subtrees
+(`H.static`) yield tokens that carry their own precompressed deflate blocks; those blocks are
+spliced into the stream between flush points instead of being compressed again. An async
+source that is about to wait (see `zen_html._deferred`) yields an empty `_Flush` token first, so
+that what it has produced so far reaches the client instead of waiting in a buffer.
+
+Classes:
+    StreamCompressor: Incremental gzip/deflate encoder for text chunks.
+    _Flush: Empty token asking the consumer to send everything buffered so far.
+
+Functions:
+    compress_tokens: Compresses a token iterable into a stream of byte chunks.
+    acompress_tokens: The same for async iterables.
+    negotiate_encoding: Picks a content coding from an `Accept-Encoding` header.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import struct
+import zlib
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+
+from ._static import _StaticHTML
+
+ENCODINGS: tuple[str, ...] = ("gzip", "deflate")
+
+# Text is handed to zlib in batches of about this many characters.
+_BATCH_CHARS = 8 * 1024
+# compress_tokens() joins this many tokens before writing them.
+_BATCH_TOKENS = 256
+
+# Largest distance a deflate back-reference can reach.
+_WINDOW = 32 * 1024
+
+# Minimal gzip header: deflate method, no flags, no mtime, default XFL, unknown OS.
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+
+class _Flush(str):
+    """
+    An empty token that marks a point where the producer is about to wait.
+
+    It adds nothing to joined markup; `StreamCompressor` and the response chunkers flush their
+    buffers when they see it.
+    """
+
+
+_FLUSH = _Flush()
+
+
+class StreamCompressor:
+    """
+    Incremental gzip or deflate encoder for text.
+
+    `write()` returns the compressed bytes that are ready (often none); `finish()` returns the
+    rest. The output is flushed (`Z_SYNC_FLUSH`) before any chunk starting with one of the
+    `flush_before` prefixes and after every `flush_bytes` bytes of input, so everything written
+    up to those points can be decoded by the client right away.
+
+    Markup from `H.static` nodes is not compressed here: the stream is flushed to a byte
+    boundary, the static node's cached deflate blocks are copied in, and compression continues
+    with a fresh compressor primed (`zdict`) with the end of the static markup, which the client
+    has just decoded. Only the checksum is computed over the static bytes.
+
+    Args:
+        encoding (str): `"gzip"` or `"deflate"` (zlib-wrapped, as HTTP defines it).
+        level (int): zlib compression level, 0-9.
+        flush_bytes (int | None): Flush after this many uncompressed bytes; None flushes only at
+            `flush_before` boundaries and the end.
+        flush_before (Sequence[str]): Flush before chunks starting with these prefixes. The
+            default `"<body"` flushes once the document head is complete (whether or not its
+            end tag is rendered).
+    """
+
+    def __init__(
+        self,
+        encoding: str = "gzip",
+        level: int = 6,
+        *,
+        flush_bytes: int | None = 64 * 1024,
+        flush_before: Sequence[str] = ("<body",),
+    ):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding!r}")
+        if flush_bytes is not None and flush_bytes < 1:
+            raise ValueError("flush_bytes must be positive or None")
+        self.encoding = encoding
+        self._level = level
+        self._deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._flush_bytes = flush_bytes
+        self._flush_before = tuple(flush_before)
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._since_flush = 0
+        self._checksum = 0 if encoding == "gzip" else 1
+        self._size = 0
+        self._started = False
+        self._finished = False
+
+    def write(self, chunk: str) -> bytes:
+        """Add a chunk of text; return the compressed bytes ready to send (possibly empty)."""
+        if type(chunk) is _StaticHTML:
+            return self._splice(chunk)
+        if type(chunk) is _Flush:
+            return self.flush() if self._pending or self._since_flush else b""
+        out = b""
+        if self._flush_before and chunk.startswith(self._flush_before) and (self._pending or self._size):
+            out = self.flush()
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        if self._pending_chars >= _BATCH_CHARS:
+            out += self._compress_pending()
+            if self._flush_bytes is not None and self._since_flush >= self._flush_bytes:
+                out += self._sync_flush()
+        return out
+
+    def flush(self) -> bytes:
+        """Compress everything written so far and make it decodable by the client."""
+        return self._compress_pending() + self._sync_flush()
+
+    def finish(self) -> bytes:
+        """Compress the rest and close the stream with its trailer."""
+        if self._finished:
+            raise RuntimeError("StreamCompressor is already finished")
+        self._finished = True
+        out = self._compress_pending() + self._deflate.flush(zlib.Z_FINISH)
+        return self._header() + out + self._trailer()
+
+    def _compress_pending(self) -> bytes:
+        if not self._pending:
+            return b""
+        data = "".join(self._pending).encode()
+        self._pending.clear()
+        self._pending_chars = 0
+        self._since_flush += len(data)
+        self._update_checksum(data)
+        out = self._deflate.compress(data)
+        return self._header() + out if out else b""
+
+    def _splice(self, html: _StaticHTML) -> bytes:
+        data = html.data
+        if not data:
+            return b""
+        out = self._compress_pending()
+        if self._since_flush:
+            # The old compressor is dropped after this, so a sync flush is enough to end its
+            # blocks on a byte boundary.
+            out += self._deflate.flush(zlib.Z_SYNC_FLUSH)
+        self._update_checksum(data)
+        # The spliced blocks have no history of their own; the compressor that continues after
+        # them may refer back into the static markup, which the decoder's window now holds.
+        self._deflate = zlib.compressobj(self._level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=data[-_WINDOW:])
+        self._since_flush = 0
+        return self._header() + out + html.deflated(self._level)
+
+    def _update_checksum(self, data: bytes) -> None:
+        self._size += len(data)
+        if self.encoding == "gzip":
+            self._checksum = zlib.crc32(data, self._checksum)
+        else:
+            self._checksum = zlib.adler32(data, self._checksum)
+
+    def _sync_flush(self) -> bytes:
+        self._since_flush = 0
+        return self._header() + self._deflate.flush(zlib.Z_SYNC_FLUSH)
+
+    def _header(self) -> bytes:
+        if self._started:
+            return b""
+        self._started = True
+        if self.encoding == "gzip":
+            return _GZIP_HEADER
+        # CMF: deflate with a 32K window; FLG: the level hint, padded so the pair is a multiple of 31.
+        cmf = 0x78
+        flevel = 0 if self._level in (0, 1) else 1 if self._level < 6 else 2 if self._level == 6 else 3
+        flg = flevel << 6
+        flg |= 31 - ((cmf << 8) | flg) % 31
+        return bytes((cmf, flg))
+
+    def _trailer(self) -> bytes:
+        if self.encoding == "gzip":
+            return struct.pack("<II", self._checksum, self._size & 0xFFFFFFFF)
+        return struct.pack(">I", self._checksum)
+
+
+def compress_tokens(
+    tokens: Iterable[str],
+    encoding: str = "gzip",
+    *,
+    level: int = 6,
+    flush_bytes: int | None = 64 * 1024,
+    flush_before: Sequence[str] = ("<body",),
+) -> Iterator[bytes]:
+    """
+    Compress a stream of text tokens, yielding non-empty byte chunks.
+
+    Args:
+        tokens (Iterable[str]): E.g. `node.to_token()` or a `TableStream`.
+        encoding, level, flush_bytes, flush_before: See `StreamCompressor`.
+
+    Returns:
+        Iterator[bytes]: A complete gzip or zlib stream, in pieces.
+    """
+    compressor = StreamCompressor(encoding, level, flush_bytes=flush_bytes, flush_before=flush_before)
+    markers = tuple(flush_before)
+    it = iter(tokens)
+    # Up to the first flush marker, tokens are pulled one at a time: the head is flushed before
+    # anything after it is produced (such as a deferred `Document` body). Then they are batched.
+    head: list[str] = []
+    for token in islice(it, _BATCH_TOKENS):
+        if type(token) is _StaticHTML or token.startswith(markers):
+            yield from _write(compressor, "".join(head))
+            head.clear()
+            yield from _write(compressor, token)
+            if type(token) is not _StaticHTML:
+                break
+        else:
+            head.append(token)
+    yield from _write(compressor, "".join(head))
+    while batch := list(islice(it, _BATCH_TOKENS)):
+        for part in _batch_chunks(batch, markers):
+            out = compressor.write(part)
+            if out:
+                yield out
+    yield compressor.finish()
+
+
+async def acompress_tokens(
+    tokens: AsyncIterable[str],
+    encoding: str = "gzip",
+    *,
+    level: int = 6,
+    flush_bytes: int | None = 64 * 1024,
+    flush_before: Sequence[str] = ("<body",),
+) -> AsyncIterator[bytes]:
+    """Like `compress_tokens`, for async token sources."""
+    compressor = StreamCompressor(encoding, level, flush_bytes=flush_bytes, flush_before=flush_before)
+    markers = tuple(flush_before)
+    batch: list[str] = []
+    async for token in tokens:
+        static = type(token) is _StaticHTML or type(token) is _Flush
+        if batch and (static or len(batch) >= _BATCH_TOKENS or token.startswith(markers)):
+            out = compressor.write("".join(batch))
+            batch.clear()
+            if out:
+                yield out
+        if static:
+            out = compressor.write(token)
+            if out:
+                yield out
+        else:
+            batch.append(token)
+    if batch:
+        out = compressor.write("".join(batch))
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+def _write(compressor: StreamCompressor, chunk: str) -> Iterator[bytes]:
+    if chunk:
+        out = compressor.write(chunk)
+        if out:
+            yield out
+
+
+def _batch_chunks(batch: list[str], markers: Sequence[str]) -> Iterator[str]:
+    # Tokens are joined in bulk; static markup stays a token of its own so that write() can
+    # splice it, and text is split at a flush marker so that write() sees it.
+    if _StaticHTML not in map(type, batch):
+        yield from _split_at_marker("".join(batch), markers)
+        return
+    run: list[str] = []
+    for token in batch:
+        if type(token) is _StaticHTML:
+            if run:
+                yield from _split_at_marker("".join(run), markers)
+                run.clear()
+            yield token
+        else:
+            run.append(token)
+    if run:
+        yield from _split_at_marker("".join(run), markers)
+
+
+def _split_at_marker(chunk: str, markers: Sequence[str]) -> tuple[str, ...]:
+    # Text and attribute values are escaped, so markers only match real markup (or RAW_STR).
+    cut = _first_marker(chunk, markers)
+    return (chunk[:cut], chunk[cut:]) if cut > 0 else (chunk,)
+
+
+def _first_marker(chunk: str, markers: Sequence[str]) -> int:
+    positions = [pos for marker in markers if (pos := chunk.find(marker)) > 0]
+    return min(positions) if positions else -1
+
+
+def negotiate_encoding(accept_encoding: str, supported: Sequence[str] = ENCODINGS) -> str | None:
+    """
+    Choose a content coding from an `Accept-Encoding` header value.
+
+    Codings are weighed by their `q` value (`*` covers codings not listed); ties go to the
+    order of `supported`. Returns None when the response should not be encoded.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        param = params.strip()
+        if param.startswith("q="):
+            try:
+                q = float(param[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    best: str | None = None
+    best_q = 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
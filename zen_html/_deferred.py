@@ -0,0 +1,257 @@
+"""
+_deferred.py
+
+This module provides out-of-order streaming for slow parts of a page. A deferred node
+(`H.deferred(load, fallback=...)`) renders as a placeholder element holding its fallback
+content. `astream_tokens` streams a document and, whenever it reaches a placeholder, starts the
+node's loader as an asyncio task and carries on with the rest of the page. Once the document
+has been streamed (up to, but not including, `</body>`), each resolved subtree is sent, in the
+order the loaders finish, as a `<template>` followed by a small script that swaps it into the
+placeholder's position.
+
+Rendered synchronously (`to_token()`, `html_`), a deferred node shows its fallback only.
+
+Classes:
+    _HDeferred: Placeholder node for content loaded asynchronously.
+    _DeferredSlot: Token marking a placeholder in a token stream.
+
+Functions:
+    astream_tokens: Streams a document, resolving its deferred nodes concurrently.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import re
+from itertools import count
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Union,
+)
+
+from ._base import (
+    VOID_TAGS,
+    Children,
+    PropVal,
+    _hash_text,
+    _HBase,
+    _HFragment,
+    _nonce_attr,
+)
+from ._compress import _FLUSH
+from ._minify import UNKNOWN, MinifyOptions, _Unknown
+
+if TYPE_CHECKING:
+    from ._transform import TransformPipeline
+
+DeferredSource = Union[Awaitable[Children], Callable[[], Union[Children, Awaitable[Children]]]]
+
+# Defined once per response, before the first template. Moves the template's content into the
+# placeholder's position; `p` is the id prefix and `n` the slot number.
+SWAP_SCRIPT = (
+    "<script>function __zenSwap(p,n){var t=document.getElementById(p+'t'+n),"
+    "e=document.getElementById(p+'p'+n);if(e)e.replaceWith(t.content);t.remove()}</script>"
+)
+
+# Used in ids and inside the swap script's string literals, so it is kept to safe characters.
+_ID_PREFIX = re.compile(r"[A-Za-z][\w-]*")
+
+# Sync token sources yield to the event loop this often, so loaders progress while rendering.
+_YIELD_EVERY = 256
+
+
+class _DeferredSlot(str):
+    """
+    The placeholder markup of a deferred node, as yielded by `to_token()`.
+
+    It is the plain fallback markup to everything that joins tokens; `astream_tokens` replaces
+    it with an identified placeholder and schedules the node's loader. The loaded content is
+    rendered like the placeholder: with the same minify options and transform pipeline.
+    """
+
+    def __new__(
+        cls,
+        value: str,
+        node: _HDeferred,
+        minify: MinifyOptions | None,
+        pipeline: TransformPipeline | None = None,
+    ) -> _DeferredSlot:
+        return super().__new__(cls, value)
+
+    def __init__(
+        self,
+        value: str,
+        node: _HDeferred,
+        minify: MinifyOptions | None,
+        pipeline: TransformPipeline | None = None,
+    ) -> None:
+        super().__init__()
+        self.node = node
+        self.minify = minify
+        self.pipeline = pipeline
+
+
+class _HDeferred(_HBase):
+    """
+    A placeholder element whose real content is loaded asynchronously.
+
+    Args:
+        source (DeferredSource): A callable returning the content (children) or an awaitable of
+            it, e.g. an `async def` function. It is called once per `astream_tokens` render. An
+            awaitable may be given directly, but can then be rendered only once.
+        fallback (Children): Shown until the content arrives, and in synchronous rendering.
+        tag (str): The placeholder element. Use one that is valid where the node is placed
+            (`"tr"` in a table body, `"li"` in a list, `"span"` in text).
+        **props (PropVal): Props for the placeholder element. `id` is assigned per response.
+
+    `hash_` and equality also cover the source, so placeholders loading different content never
+    compare equal or share an ETag. A module-level function counts by its qualified name, which
+    is stable across processes; any other source (a lambda, closure, `functools.partial`, bound
+    method, awaitable) by its identity, so its hash is only valid within the process.
+    """
+
+    def __init__(
+        self, source: DeferredSource, *, fallback: Children = (), tag: str = "div", **props: PropVal
+    ):
+        if not callable(source) and not inspect.isawaitable(source):
+            raise TypeError(f"deferred source must be callable or awaitable: {type(source)!r}")
+        if tag in VOID_TAGS:
+            raise ValueError(f"a void element cannot hold fallback content: {tag!r}")
+        if "id" in props:
+            raise ValueError("the placeholder id is assigned per response")
+        super().__init__(tag, fallback, children_kw=None, **props)
+        self._source = source
+
+    def with_props(self, **props: PropVal) -> _HDeferred:
+        if "id" in props:
+            raise ValueError("the placeholder id is assigned per response")
+        return super().with_props(**props)
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        return (_DeferredSlot("".join(_HBase.to_token(self)), self, None),)
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        markup = "".join(_HBase._minified_tokens(self, minify, parent, following))
+        return (_DeferredSlot(markup, self, minify),)
+
+    def _hash_parts(self) -> list[bytes]:
+        return [*super()._hash_parts(), b"D", _hash_text(_source_identity(self._source))]
+
+    async def _load(self) -> Children:
+        result = self._source() if callable(self._source) else self._source
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def __repr__(self) -> str:
+        return f"H.deferred({self._source!r}, fallback={self._children!r}, tag={self._tag!r})"
+
+
+def _source_identity(source: DeferredSource) -> str:
+    if inspect.isfunction(source) and source.__closure__ is None and "<" not in source.__qualname__:
+        return f"{source.__module__}.{source.__qualname__}"
+    return f"{type(source).__qualname__}@{id(source):x}"
+
+
+async def astream_tokens(
+    content: _HBase | Iterable[str] | AsyncIterable[str],
+    *,
+    minify: MinifyOptions | None = None,
+    id_prefix: str = "zh-",
+) -> AsyncIterator[str]:
+    """
+    Stream a document, loading its deferred nodes concurrently.
+
+    Placeholders are sent in place and every loader starts as soon as its placeholder is
+    reached. A `</body>` end tag (and what follows it) is held back while loaders are pending;
+    resolved subtrees are sent as `<template>` elements with a swap script, in completion order,
+    and may contain deferred nodes themselves. Before each wait for a loader, an empty flush
+    token tells `ASGIResponse` and `acompress_tokens` to send what they have buffered. A loader
+    that raises leaves its fallback in place (the error is logged). When the consumer stops
+    early, pending loaders are cancelled.
+
+    Args:
+        content (_HBase | Iterable[str] | AsyncIterable[str]): A node or a token stream, such as
+            a `Document`.
+        minify (MinifyOptions | None): Render a node minified.
+        id_prefix (str): Prefix of the placeholder and template ids; must be unique in the page.
+
+    Returns:
+        AsyncIterator[str]: The rendered tokens, usable as an `ASGIResponse` or `HResponse` body.
+    """
+    if not _ID_PREFIX.fullmatch(id_prefix):
+        raise ValueError(f"id_prefix must be a letter followed by letters, digits, '-' or '_': {id_prefix!r}")
+    tasks: dict[asyncio.Task[Children], tuple[int, _DeferredSlot]] = {}
+    numbers = count()
+
+    def placeholder(slot: _DeferredSlot) -> str:
+        number = next(numbers)
+        tasks[asyncio.ensure_future(slot.node._load())] = (number, slot)
+        start = f"<{slot.node._tag}"
+        return f"{start} id='{id_prefix}p{number}'" + slot.removeprefix(start)
+
+    tail: list[str] = []
+    try:
+        async for token in _source_tokens(content, minify):
+            if tail or (tasks and token.startswith("</body")):
+                tail.append(token)
+            elif type(token) is _DeferredSlot:
+                yield placeholder(token)
+            else:
+                yield token
+        swap_defined = False
+        while tasks:
+            # Send what is buffered downstream before waiting for the next loader.
+            yield _FLUSH
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                number, slot = tasks.pop(task)
+                try:
+                    children = task.result()
+                except Exception:
+                    _HBase.logger.exception(
+                        "Deferred content %d failed to load; keeping the fallback", number
+                    )
+                    continue
+                # The inline scripts carry the CSP nonce of the render, if one is set.
+                script = f"<script{_nonce_attr({})}>"
+                if not swap_defined:
+                    yield SWAP_SCRIPT.replace("<script>", script, 1)
+                    swap_defined = True
+                yield f"<template id='{id_prefix}t{number}'>"
+                loaded = _HFragment(children) if slot.pipeline is None else slot.pipeline.apply(children)
+                for token in loaded.to_token(slot.minify):
+                    yield placeholder(token) if type(token) is _DeferredSlot else token
+                yield f"</template>{script}__zenSwap('{id_prefix}',{number})</script>"
+        for token in tail:
+            yield token
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _source_tokens(
+    content: _HBase | Iterable[str] | AsyncIterable[str], minify: MinifyOptions | None
+) -> AsyncIterator[str]:
+    if isinstance(content, _HBase):
+        content = content.to_token(minify)
+    if isinstance(content, Iterable):
+        for i, token in enumerate(content, 1):
+            yield token
+            if i % _YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+    else:
+        async for token in content:
+            yield token
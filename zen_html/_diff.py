@@ -0,0 +1,152 @@
+"""
+_diff.py
+
+This module computes structural differences between two `H` trees as a list of JSON-serializable
+patch operations, so live views can ship small updates instead of the whole document.
+
+Operations are applied in order and address nodes by `path`, the list of child indices from the
+root (text children count as nodes). `examples/h_render.js` provides `HPatch`, which applies them
+to a DOM tree built by `HRender`.
+
+    {"op": "replace", "path": [...], "node": <dict_ or text>}
+    {"op": "text", "path": [...], "value": str}
+    {"op": "set_attr", "path": [...], "name": str, "value": str | bool}
+    {"op": "remove_attr", "path": [...], "name": str}
+    {"op": "insert", "path": [...parent], "index": int, "node": <dict_ or text>}
+    {"op": "remove", "path": [...parent], "index": int}
+    {"op": "move", "path": [...parent], "from": int, "to": int}
+
+Children carrying `key=` are matched by key, so reordering keyed rows produces `move` operations
+instead of rewriting every row. Unkeyed children are matched by their order among unkeyed siblings.
+
+Functions:
+    diff: Returns the patch operations turning one tree into another.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from ._base import Child, _HBase, _serialize_child, _serialize_prop_value
+
+PatchOp = dict[str, object]
+Path = list[int]
+
+
+def diff(old: _HBase, new: _HBase) -> list[PatchOp]:
+    """
+    Compute the patch operations that transform `old` into `new`.
+
+    Args:
+        old (_HBase): The tree currently shown to the client.
+        new (_HBase): The freshly rendered tree.
+
+    Returns:
+        list[PatchOp]: Operations to apply in order. Empty when the trees are equivalent.
+    """
+    ops: list[PatchOp] = []
+    _diff_node(old, new, [], ops)
+    return ops
+
+
+def _diff_node(old: Child, new: Child, path: Path, ops: list[PatchOp]) -> None:
+    if old is new:
+        return
+    if isinstance(old, _HBase) and isinstance(new, _HBase):
+        if old._hash is not None and old._hash == new._hash:
+            # Only trust hashes that are already cached; computing them here costs more than diffing.
+            return
+        if old._tag != new._tag or type(old) is not type(new):
+            ops.append({"op": "replace", "path": path, "node": _serialize_child(new)})
+            return
+        if old._props != new._props:
+            _diff_props(old._props, new._props, path, ops)
+        if not _same_children(old._children, new._children):
+            _diff_children(old._content_children(), new._content_children(), path, ops)
+        return
+    if isinstance(old, _HBase) or isinstance(new, _HBase):
+        ops.append({"op": "replace", "path": path, "node": _serialize_child(new)})
+        return
+    if old == new and type(old) is type(new):
+        return
+    old_value = _serialize_child(old)
+    new_value = _serialize_child(new)
+    if old_value != new_value:
+        ops.append({"op": "text", "path": path, "value": new_value})
+
+
+def _diff_props(
+    old: dict[str, str | bool], new: dict[str, str | bool], path: Path, ops: list[PatchOp]
+) -> None:
+    for name, value in new.items():
+        if name not in old or old[name] != value or type(old[name]) is not type(value):
+            ops.append({"op": "set_attr", "path": path, "name": name, "value": _serialize_prop_value(value)})
+    for name in old:
+        if name not in new:
+            ops.append({"op": "remove_attr", "path": path, "name": name})
+
+
+def _identities(children: tuple[Child, ...]) -> list[tuple[bool, object]]:
+    ids: list[tuple[bool, object]] = []
+    unkeyed = 0
+    for child in children:
+        key = child._key if isinstance(child, _HBase) else None
+        if key is None:
+            ids.append((False, unkeyed))
+            unkeyed += 1
+        else:
+            ids.append((True, key))
+    if len(set(ids)) != len(ids):
+        raise ValueError("Sibling nodes must have unique keys")
+    return ids
+
+
+def _same_children(old: tuple[Child, ...], new: tuple[Child, ...]) -> bool:
+    # Identity/text comparison only: `==` on nodes would compute content hashes of both subtrees.
+    if len(old) != len(new):
+        return False
+    for a, b in zip(old, new):
+        if a is not b and (isinstance(a, _HBase) or type(a) is not type(b) or a != b):
+            return False
+    return True
+
+
+def _has_keys(children: tuple[Child, ...]) -> bool:
+    for c in children:
+        if isinstance(c, _HBase) and c._key is not None:
+            return True
+    return False
+
+
+def _diff_children(old: tuple[Child, ...], new: tuple[Child, ...], path: Path, ops: list[PatchOp]) -> None:
+    if not _has_keys(old) and not _has_keys(new):
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff_node(old[i], new[i], [*path, i], ops)
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": path, "index": i})
+        for i in range(common, len(new)):
+            ops.append({"op": "insert", "path": path, "index": i, "node": _serialize_child(new[i])})
+        return
+
+    old_ids = _identities(old)
+    new_ids = _identities(new)
+    by_id = dict(zip(old_ids, old))
+    wanted = set(new_ids)
+
+    for i in range(len(old_ids) - 1, -1, -1):
+        if old_ids[i] not in wanted:
+            ops.append({"op": "remove", "path": path, "index": i})
+    current = [ident for ident in old_ids if ident in wanted]
+
+    for i, ident in enumerate(new_ids):
+        if i < len(current) and current[i] == ident:
+            _diff_node(by_id[ident], new[i], [*path, i], ops)
+        elif ident in by_id:
+            j = current.index(ident, i)
+            ops.append({"op": "move", "path": path, "from": j, "to": i})
+            current.insert(i, current.pop(j))
+            _diff_node(by_id[ident], new[i], [*path, i], ops)
+        else:
+            ops.append({"op": "insert", "path": path, "index": i, "node": _serialize_child(new[i])})
+            current.insert(i, ident)
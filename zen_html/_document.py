@@ -0,0 +1,173 @@
+"""
+_document.py
+
+This module provides `Document`, an HTML document streamed head first. The `<head>` (meta,
+CSS links, preload hints) is rendered when the document is created and is the first token of
+the stream (with the CSP nonce of the current render spliced in, see `zen_html._nonce`); the
+body is given as a deferred source that is only evaluated after the head has
+been yielded. With `ASGIResponse`, `WSGIResponse` or `compress_tokens`, the head is flushed
+before the body is built, so the browser starts fetching stylesheets and fonts while the
+server is still running queries for the body.
+
+Classes:
+    Document: A document whose body is produced after its head has been sent.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import inspect
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Union,
+    cast,
+)
+
+from ._base import (
+    _CSP_NONCE,
+    Child,
+    Children,
+    _escape_text,
+    _format_nonce_attr,
+    _HBase,
+    _is_markup,
+)
+from ._minify import UNKNOWN, MinifyOptions, collapse_whitespace
+from ._nonce import _render_with_slots
+from ._response_cache import DOCTYPE
+from ._table import _open_tag
+
+BodyResult = Union[Children, Awaitable[Children], AsyncIterable[Child]]
+BodySource = Union[BodyResult, Callable[[], BodyResult]]
+
+
+class Document:
+    """
+    An HTML document whose body is evaluated after its head has been yielded.
+
+    Iterate it with `for` or `async for` to get the rendered tokens: first the doctype, `<html>`
+    and the complete `<head>`, then the body. A document with an async body (a coroutine
+    function, an async generator function, an awaitable or an async iterable) is not `Iterable`
+    and only supports `async for`, like `TableStream`.
+
+    Args:
+        body (BodySource): The body children (`<body>` itself is added), or a deferred source:
+            a zero-argument callable returning children, an awaitable, or a sync or async
+            iterable (e.g. a generator) whose children are rendered as they are produced.
+        head (Children): Children of `<head>`, rendered immediately.
+        title (str | None): Appended to the head as `<title>`.
+        lang (str | None): The `lang` attribute of `<html>`.
+        body_attrs (Mapping[str, object] | None): Props for the `<body>` element.
+        include_doctype (bool): Start with ``<!DOCTYPE html>``.
+        minify (MinifyOptions | None): Render the document minified.
+        **props (object): Other props for the `<html>` element.
+    """
+
+    def __new__(cls, body: BodySource, *args: Any, **kwargs: Any) -> Document:
+        if cls is Document and _is_async_source(body):
+            cls = _AsyncDocument
+        return super().__new__(cls)
+
+    def __init__(
+        self,
+        body: BodySource,
+        *,
+        head: Children = (),
+        title: str | None = None,
+        lang: str | None = None,
+        body_attrs: Mapping[str, object] | None = None,
+        include_doctype: bool = True,
+        minify: MinifyOptions | None = None,
+        **props: object,
+    ):
+        self._body = body
+        self._minify = minify
+        head_node = _HBase("head", head, _HBase("title", title) if title is not None else ())
+        head_tokens = (
+            head_node.to_token() if minify is None else head_node._minified_tokens(minify, "html", "body")
+        )
+        html_attrs = {"lang": lang, **props}
+        # Rendered without a nonce; the nonce of each render goes between the segments.
+        self._head_segments = _render_with_slots(
+            lambda: (DOCTYPE if include_doctype else "")
+            + _open_tag("html", html_attrs, minify)
+            + "".join(head_tokens)
+        )
+        self._head = "".join(self._head_segments)
+        self._body_open = _open_tag("body", body_attrs, minify)
+        self._closing = "" if minify is not None and minify.omit_end_tags else "</body></html>"
+
+    @property
+    def head_html_(self) -> str:
+        """Everything up to and including `</head>`; the first token of the stream."""
+        nonce = _CSP_NONCE.get()
+        if nonce is None or len(self._head_segments) == 1:
+            return self._head
+        return _format_nonce_attr(nonce).join(self._head_segments)
+
+    def __iter__(self) -> Iterator[str]:
+        yield self.head_html_
+        yield self._body_open
+        # Only now, after the head has been handed out, is the body evaluated.
+        source = self._body() if callable(self._body) else self._body
+        if inspect.isawaitable(source) or (
+            isinstance(source, AsyncIterable) and not isinstance(source, (_HBase, Iterable))
+        ):
+            if inspect.iscoroutine(source):
+                source.close()
+            raise TypeError("The document body is asynchronous; iterate the document with `async for`")
+        for child in _HBase._flatten_children((source,)):
+            yield from self._render(child)
+        yield self._closing
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        yield self.head_html_
+        yield self._body_open
+        source = self._body() if callable(self._body) else self._body
+        if inspect.isawaitable(source):
+            source = await source
+        if isinstance(source, AsyncIterable) and not isinstance(source, (_HBase, Iterable)):
+            async for item in source:
+                for child in _HBase._flatten_children((item,)):
+                    for token in self._render(child):
+                        yield token
+        else:
+            for child in _HBase._flatten_children((cast(Children, source),)):
+                for token in self._render(child):
+                    yield token
+        yield self._closing
+
+    def _render(self, child: Child) -> Iterable[str]:
+        minify = self._minify
+        if _is_markup(child):
+            return (child,)
+        if isinstance(child, str):
+            text = _escape_text(child)
+            return (collapse_whitespace(text) if minify is not None and minify.collapse_whitespace else text,)
+        if minify is None:
+            return child.to_token()
+        # What follows a streamed child is not known yet, so its end tag is kept where it matters.
+        return child._minified_tokens(minify, "body", UNKNOWN)
+
+
+class _AsyncDocument(Document):
+    """A `Document` with an async body, which only supports `async for`."""
+
+    __iter__ = None  # type: ignore[assignment]
+
+
+def _is_async_source(body: object) -> bool:
+    return (
+        inspect.iscoroutinefunction(body)
+        or inspect.isasyncgenfunction(body)
+        or inspect.isawaitable(body)
+        or (isinstance(body, AsyncIterable) and not isinstance(body, (_HBase, Iterable)))
+    )
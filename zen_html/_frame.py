@@ -0,0 +1,183 @@
+"""
+_frame.py
+
+This module renders pandas DataFrames as `H` tables. Cells are formatted and escaped a whole
+column at a time, and rows are assembled with a single `str.join` each, instead of walking
+`DataFrame.iterrows()` and building a node per cell.
+
+pandas is optional: it is imported only when `dataframe_table` is called.
+
+Functions:
+    dataframe_table: Converts a DataFrame into an `H.table` node.
+
+`MultiIndex` rows and columns are grouped with `rowspan`/`colspan` by default; the spans come
+from a vectorized run-length encoding of the index codes.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Mapping, cast
+
+from ._base import PropVal, _escape_text, _HBase, _to_html_value
+from ._table import TableColumn, _cell_markup, _HColumnRows, escape_column
+from .h import H
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CellFormat = str | Callable[[Any], object]
+
+
+def dataframe_table(
+    df: pd.DataFrame,
+    *,
+    formatters: CellFormat | Mapping[Hashable, CellFormat] | None = None,
+    index: bool = True,
+    header: bool = True,
+    na_rep: str = "",
+    cell_attrs: Mapping[Hashable, Mapping[str, object]] | None = None,
+    sparsify: bool = True,
+    **props: PropVal,
+) -> H:
+    """
+    Render a DataFrame as an HTML table.
+
+    Args:
+        df (pd.DataFrame): The frame to render.
+        formatters (CellFormat | Mapping[Hashable, CellFormat] | None): A format string (e.g.
+            ``"{:,.0f}"``) or callable applied to every value, or a mapping of column label to one.
+        index (bool): Render the index as leading `<th>` cells (one per level).
+        header (bool): Render a `<thead>` with the column labels.
+        na_rep (str): Text used for missing values.
+        cell_attrs (Mapping[Hashable, Mapping[str, object]] | None): Props for the `<td>` cells of
+            each column.
+        sparsify (bool): Group repeated `MultiIndex` labels: outer row labels are rendered once with
+            `rowspan` and column levels become header rows with `colspan`. Only adjacent labels
+            under the same parent are merged, so unsorted and sparse indexes stay correct. When
+            False, every row repeats its labels and column levels are joined with " / ".
+        **props (PropVal): Props for the `<table>` element.
+
+    Returns:
+        H: The table node. Body rows are rendered without per-cell nodes.
+    """
+    column_formats = _column_formats(df, formatters)
+    attrs = cell_attrs or {}
+    columns: list[TableColumn] = []
+    if index:
+        row_spans = _level_spans(df.index) if sparsify else []
+        for level in range(df.index.nlevels):
+            labels = df.index.get_level_values(level)
+            spans = row_spans[level] if level < len(row_spans) else None
+            columns.append(TableColumn("th", {}, _format_values(labels, None, na_rep), spans))
+    for position, label in enumerate(df.columns):
+        series = df.iloc[:, position]
+        columns.append(
+            TableColumn("td", attrs.get(label, {}), _format_values(series, column_formats.get(label), na_rep))
+        )
+
+    children: list[_HBase] = []
+    if header:
+        children.append(H.thead(*_header_rows(df, index, sparsify)))
+    children.append(H.tbody(_HColumnRows(columns)))
+    return H.table(*children, **cast(dict[str, Any], props))
+
+
+def _column_formats(
+    df: pd.DataFrame, formatters: CellFormat | Mapping[Hashable, CellFormat] | None
+) -> dict[Hashable, CellFormat]:
+    if formatters is None:
+        return {}
+    if isinstance(formatters, Mapping):
+        unknown = set(formatters) - set(df.columns)
+        if unknown:
+            raise KeyError(f"Unknown columns: {sorted(map(str, unknown))}")
+        return dict(formatters)
+    return {label: formatters for label in df.columns}
+
+
+def _header_rows(df: pd.DataFrame, index: bool, sparsify: bool) -> list[H]:
+    depth = df.columns.nlevels if sparsify else 1
+    corner = [H.th(_label(name), rowspan=depth if depth > 1 else None) for name in df.index.names]
+    if depth == 1:
+        return [H.tr(*(corner if index else []), *(H.th(_label(label)) for label in df.columns))]
+
+    # One header row per column level; outer levels span the columns they group.
+    col_spans = _level_spans(df.columns)
+    rows = []
+    for level in range(depth):
+        labels = df.columns.get_level_values(level).tolist()
+        spans = col_spans[level] if level < len(col_spans) else [1] * len(labels)
+        cells = [
+            H.th(_label(label), colspan=span if span > 1 else None)
+            for label, span in zip(labels, spans)
+            if span
+        ]
+        rows.append(H.tr(*(corner if index and level == 0 else []), *cells))
+    return rows
+
+
+def _level_spans(index: pd.Index) -> list[list[int]]:
+    """
+    Run-length encode the outer levels of a MultiIndex.
+
+    A run of level `n` continues while the codes of levels `0..n` are all unchanged from the
+    previous entry. Returns one list per level except the innermost: the run length at the first
+    entry of each run and 0 for the entries it covers. Single-level indexes have no groups.
+    """
+    import numpy as np  # pandas depends on NumPy
+
+    if index.nlevels == 1:
+        return []
+    size = len(index)
+    if size == 0:
+        return [[] for _ in range(index.nlevels - 1)]
+    changed = np.zeros(size - 1, dtype=bool)
+    spans = []
+    for codes in index.codes[:-1]:
+        codes = np.asarray(codes)
+        changed |= codes[1:] != codes[:-1]
+        starts = np.flatnonzero(np.concatenate(([True], changed)))
+        level = np.zeros(size, dtype=np.intp)
+        level[starts] = np.diff(np.append(starts, size))
+        spans.append(level.tolist())
+    return spans
+
+
+def _label(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, tuple):
+        return " / ".join(map(str, value))
+    return str(value)
+
+
+def _format_values(values: Any, formatter: CellFormat | None, na_rep: str) -> list[str]:
+    """Format and escape one column (a Series or Index) into cell markup."""
+    items = values.tolist()
+    mask = values.isna()
+    missing = bool(mask.any())
+    kind = values.dtype.kind
+
+    if formatter is not None:
+        fmt = formatter.format if isinstance(formatter, str) else formatter
+        items = [None if m else fmt(v) for v, m in zip(items, mask)] if missing else list(map(fmt, items))
+    elif kind in "iubf":
+        # Numeric and boolean columns never contain characters that need escaping.
+        cells = list(map(str, items))
+        return _fill_missing(cells, mask, na_rep) if missing else cells
+    elif kind == "M":
+        return [_escape_text(na_rep) if m else str(_to_html_value(v)) for v, m in zip(items, mask)]
+
+    if missing:
+        items = [None if m else v for v, m in zip(items, mask)]
+    if all(type(v) is str for v in items if v is not None):
+        # Plain text: escape the whole column at once.
+        return escape_column([na_rep if v is None else v for v in items])
+    return [_escape_text(na_rep) if v is None else _cell_markup(v) for v in items]
+
+
+def _fill_missing(cells: list[str], mask: Any, na_rep: str) -> list[str]:
+    na = _escape_text(na_rep)
+    return [na if m else c for c, m in zip(cells, mask)]
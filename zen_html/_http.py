@@ -0,0 +1,441 @@
+"""
+_http.py
+
+This module serves rendered HTML over ASGI and WSGI without a web framework. A response is
+an application callable built from a node, a token stream or a pre-rendered body:
+
+    async def app(scope, receive, send):
+        await ASGIResponse(page(), include_doctype=True, compress=True)(scope, receive, send)
+
+Pre-rendered bodies (`str`, `bytes`, `CacheEntry`) are sent in one piece with
+`Content-Length`. Nodes and token streams are rendered while they are sent, in byte chunks of
+about `chunk_size` (one server write each), so the server applies backpressure per chunk rather
+than per token. The document head is always sent as a chunk of its own. When the client goes
+away, rendering stops: the ASGI response watches for `http.disconnect` and send errors, and the
+WSGI body closes the token stream when the server calls `close()`.
+
+Classes:
+    ASGIResponse: ASGI application sending one HTML response.
+    WSGIResponse: WSGI application sending one HTML response.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import zlib
+from http import HTTPStatus
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    cast,
+)
+
+from ._base import _HBase
+from ._compress import _Flush, acompress_tokens, compress_tokens, negotiate_encoding
+from ._minify import MinifyOptions
+from ._nonce import abind_nonce, bind_nonce
+from ._response_cache import DOCTYPE, CacheEntry
+
+ResponseContent = _HBase | str | bytes | CacheEntry | Iterable[str] | AsyncIterable[str]
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+StartResponse = Callable[..., Any]
+
+DEFAULT_CHUNK_SIZE = 16 * 1024
+# Body chunks are cut before these tokens, as `compress_tokens` flushes before them.
+_FLUSH_BEFORE = ("<body",)
+
+
+class _Plan(NamedTuple):
+    """What to send for one request; `body` is None when the content is streamed."""
+
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes | None
+    encoding: str | None
+
+
+class _Response:
+    """
+    Request-independent part of a response, shared by the ASGI and WSGI classes.
+
+    Args:
+        content (ResponseContent): A node (rendered with `to_token()`), a pre-rendered `str`,
+            `bytes` or `CacheEntry`, or a sync or async iterable of rendered tokens.
+        status_code (int): HTTP status.
+        headers (Mapping[str, str] | None): Extra response headers.
+        include_doctype (bool): Prepend ``<!DOCTYPE html>`` (not applied to a `CacheEntry`,
+            which stores the final body).
+        etag (bool): Send an `ETag` and answer a matching `If-None-Match` with 304 before
+            anything is rendered. Available for nodes (from `hash_`) and pre-rendered bodies.
+            A compressed body is a representation of its own: its tag ends in the coding,
+            e.g. ``"...-gzip"``.
+        minify (MinifyOptions | None): Render nodes minified.
+        compress (bool): Negotiate gzip or deflate with the client. Streams are compressed
+            while they render (`compress_tokens`); a `CacheEntry` uses its stored gzip body.
+        chunk_size (int): Approximate size of each uncompressed body chunk, in bytes.
+        media_type (str): The `Content-Type`.
+        nonce (str | None): CSP nonce added to the `<script>`, `<style>` and `<link>` tags of
+            nodes, token streams and `CacheEntry` bodies (see `csp_nonce`); `str` and `bytes`
+            bodies are sent as they are. A per-response nonce rules out `etag`.
+    """
+
+    def __init__(
+        self,
+        content: ResponseContent,
+        *,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        include_doctype: bool = False,
+        etag: bool = False,
+        minify: MinifyOptions | None = None,
+        compress: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        media_type: str = "text/html; charset=utf-8",
+        nonce: str | None = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if etag and nonce is not None:
+            raise ValueError("etag cannot be used with a per-response nonce")
+        self.content = content
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.include_doctype = include_doctype
+        self.minify = minify
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.media_type = media_type
+        self.nonce = nonce
+        self._bodies: dict[str | None, bytes] = {}
+        self.etag = self._compute_etag() if etag else None
+
+    def _compute_etag(self) -> str | None:
+        content = self.content
+        if isinstance(content, _HBase):
+            # The content hash covers the tree only, so mix in the doctype and minify flags.
+            suffix = "d" if self.include_doctype else ""
+            if self.minify is not None:
+                minify = self.minify
+                suffix += f"m{minify.unquoted_attrs:d}{minify.omit_end_tags:d}{minify.collapse_whitespace:d}"
+            return content.etag_ if not suffix else f'"{content.hash_.hex()}-{suffix}"'
+        if isinstance(content, (str, bytes, CacheEntry)):
+            return f'"{hashlib.blake2b(self._body(None), digest_size=16).hexdigest()}"'
+        return None
+
+    def _plan(self, method: str, accept_encoding: str, if_none_match: str) -> _Plan:
+        content = self.content
+        headers = [("Content-Type", self.media_type), *self.headers.items()]
+        varies = self.compress or (isinstance(content, CacheEntry) and content.gzip_body is not None)
+        if varies:
+            headers.append(("Vary", "Accept-Encoding"))
+        if isinstance(content, CacheEntry):
+            gzipped = (
+                content.gzip_body is not None and negotiate_encoding(accept_encoding, ("gzip",)) == "gzip"
+            )
+            encoding = "gzip" if gzipped else None
+        else:
+            encoding = negotiate_encoding(accept_encoding) if self.compress else None
+        if self.etag is not None:
+            etag = _coded_etag(self.etag, encoding)
+            headers.append(("ETag", etag))
+            if _etag_matches(if_none_match, etag):
+                return _Plan(304, headers[1:], b"", None)
+
+        if isinstance(content, (str, bytes, CacheEntry)):
+            if isinstance(content, CacheEntry):
+                body, encoding = content.select(accept_encoding, nonce=self.nonce)
+            else:
+                body = self._body(encoding)
+            if encoding is not None:
+                headers.append(("Content-Encoding", encoding))
+            headers.append(("Content-Length", str(len(body))))
+            return _Plan(self.status_code, headers, b"" if method == "HEAD" else body, encoding)
+
+        if encoding is not None:
+            headers.append(("Content-Encoding", encoding))
+        # A HEAD request gets the headers only; nothing is rendered.
+        return _Plan(self.status_code, headers, b"" if method == "HEAD" else None, encoding)
+
+    def _body(self, encoding: str | None) -> bytes:
+        """The pre-rendered body, encoded and cached per content coding."""
+        body = self._bodies.get(encoding)
+        if body is None:
+            content = self.content
+            if isinstance(content, CacheEntry):
+                return content.body
+            if encoding is not None:
+                body = _compress_body(self._body(None), encoding)
+            else:
+                body = content.encode() if isinstance(content, str) else cast(bytes, content)
+                if self.include_doctype:
+                    body = DOCTYPE.encode() + body
+            self._bodies[encoding] = body
+        return body
+
+    def _is_async(self) -> bool:
+        content = self.content
+        return isinstance(content, AsyncIterable) and not isinstance(content, (_HBase, Iterable))
+
+    def _tokens(self) -> Iterator[str]:
+        content = self.content
+        if self.nonce is not None:
+            tokens = bind_nonce(cast(_HBase | Iterable[str], content), self.nonce, minify=self.minify)
+        elif isinstance(content, _HBase):
+            tokens = iter(content.to_token(self.minify))
+        else:
+            tokens = iter(cast(Iterable[str], content))
+        return _with_doctype(tokens) if self.include_doctype else tokens
+
+    async def _atokens(self) -> AsyncIterator[str]:
+        tokens = aiter(cast(AsyncIterable[str], self.content))
+        if self.nonce is not None:
+            tokens = abind_nonce(tokens, self.nonce)
+        try:
+            if self.include_doctype:
+                yield DOCTYPE
+            async for token in tokens:
+                yield token
+        finally:
+            aclose = getattr(tokens, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+class ASGIResponse(_Response):
+    """
+    ASGI application sending one HTML response. See `_Response` for the arguments.
+
+    Synchronous rendering runs in the event loop's default executor, one chunk per call, so
+    the loop stays responsive while large pages render. Streaming stops when the client
+    disconnects (an `http.disconnect` message, or `send` raising `OSError`), and the token
+    stream is closed so no further rows or subtrees are rendered.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = {k.lower(): v for k, v in scope.get("headers") or ()}
+        plan = self._plan(
+            scope.get("method", "GET"),
+            request_headers.get(b"accept-encoding", b"").decode("latin-1"),
+            request_headers.get(b"if-none-match", b"").decode("latin-1"),
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": plan.status,
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in plan.headers],
+            }
+        )
+        if plan.body is not None:
+            await send({"type": "http.response.body", "body": plan.body})
+            return
+        await self._stream(plan.encoding, receive, send)
+
+    async def _stream(self, encoding: str | None, receive: Receive, send: Send) -> None:
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        next_chunk: Callable[[], Awaitable[bytes | None]]
+        if self._is_async():
+            tokens: Any = self._atokens()
+            achunks = (
+                acompress_tokens(tokens, encoding)
+                if encoding is not None
+                else _abyte_chunks(tokens, self.chunk_size)
+            )
+            closers = [getattr(achunks, "aclose", _anoop), tokens.aclose]
+
+            def next_chunk() -> Awaitable[bytes | None]:
+                return asyncio.ensure_future(_anext(achunks))
+
+        else:
+            tokens = self._tokens()
+            chunks = (
+                compress_tokens(tokens, encoding)
+                if encoding is not None
+                else _byte_chunks(tokens, self.chunk_size)
+            )
+            closers = [_async(getattr(chunks, "close", _noop)), _async(getattr(tokens, "close", _noop))]
+            loop = asyncio.get_running_loop()
+
+            def next_chunk() -> Awaitable[bytes | None]:
+                return loop.run_in_executor(None, next, chunks, None)
+
+        try:
+            while True:
+                pending = asyncio.ensure_future(next_chunk())
+                await asyncio.wait((pending, disconnected), return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    # The client is gone. An executor call cannot be interrupted, so wait for
+                    # the chunk in progress before the stream is closed.
+                    pending.cancel()
+                    await asyncio.wait((pending,))
+                    return
+                chunk = pending.result()
+                if chunk is None:
+                    break
+                try:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                except OSError:
+                    return
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            disconnected.cancel()
+            for close in closers:
+                await close()
+
+
+class WSGIResponse(_Response):
+    """
+    WSGI application sending one HTML response. See `_Response` for the arguments.
+
+    The returned body yields byte chunks of about `chunk_size` while rendering. Servers call
+    `close()` on it when the response ends or the client disconnects; that closes the token
+    stream, so rendering stops early. Async token streams are not supported.
+    """
+
+    def __call__(self, environ: Mapping[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        if self._is_async():
+            raise TypeError("WSGIResponse cannot send an async token stream")
+        plan = self._plan(
+            environ.get("REQUEST_METHOD", "GET"),
+            environ.get("HTTP_ACCEPT_ENCODING", ""),
+            environ.get("HTTP_IF_NONE_MATCH", ""),
+        )
+        start_response(f"{plan.status} {HTTPStatus(plan.status).phrase}", plan.headers)
+        if plan.body is not None:
+            return [plan.body] if plan.body else []
+        tokens = self._tokens()
+        if plan.encoding is not None:
+            return _WSGIBody(compress_tokens(tokens, plan.encoding), tokens)
+        return _WSGIBody(_byte_chunks(tokens, self.chunk_size), tokens)
+
+
+class _WSGIBody:
+    """Response iterable whose `close()` also closes the token stream behind it."""
+
+    def __init__(self, chunks: Iterator[bytes], tokens: Iterator[str]) -> None:
+        self._chunks = chunks
+        self._tokens = tokens
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        close = getattr(self._tokens, "close", None)
+        if close is not None:
+            close()
+
+
+def _with_doctype(tokens: Iterator[str]) -> Iterator[str]:
+    # `yield from` forwards close() to the token generator.
+    yield DOCTYPE
+    yield from tokens
+
+
+def _byte_chunks(tokens: Iterator[str], size: int) -> Iterator[bytes]:
+    # Tokens are coalesced, so one server write carries about `size` bytes instead of a tag. The
+    # head goes out on its own, before the token stream produces the body.
+    pending: list[str] = []
+    pending_chars = 0
+    for token in tokens:
+        if pending and token.startswith(_FLUSH_BEFORE):
+            yield "".join(pending).encode()
+            pending.clear()
+            pending_chars = 0
+        pending.append(token)
+        pending_chars += len(token)
+        if pending_chars >= size:
+            yield "".join(pending).encode()
+            pending.clear()
+            pending_chars = 0
+    if pending:
+        yield "".join(pending).encode()
+
+
+async def _abyte_chunks(tokens: AsyncIterable[str], size: int) -> AsyncIterator[bytes]:
+    pending: list[str] = []
+    pending_chars = 0
+    async for token in tokens:
+        if type(token) is _Flush:
+            if pending:
+                yield "".join(pending).encode()
+                pending.clear()
+                pending_chars = 0
+            continue
+        if pending and token.startswith(_FLUSH_BEFORE):
+            yield "".join(pending).encode()
+            pending.clear()
+            pending_chars = 0
+        pending.append(token)
+        pending_chars += len(token)
+        if pending_chars >= size:
+            yield "".join(pending).encode()
+            pending.clear()
+            pending_chars = 0
+    if pending:
+        yield "".join(pending).encode()
+
+
+async def _anext(chunks: AsyncIterator[bytes]) -> bytes | None:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    # Request body messages are not used by these responses and are discarded.
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _async(fn: Callable[[], object]) -> Callable[[], Awaitable[None]]:
+    async def call() -> None:
+        fn()
+
+    return call
+
+
+def _noop() -> None:
+    pass
+
+
+async def _anoop() -> None:
+    pass
+
+
+def _compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)
+    return zlib.compress(body)
+
+
+def _coded_etag(etag: str, encoding: str | None) -> str:
+    # Bytes sent with a content coding get an entity tag of their own, so that caches never
+    # take the compressed and the identity body for the same representation.
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,167 @@
+"""
+_minify.py
+
+This module holds the options and HTML syntax rules for minified rendering
+(`node.to_token(MinifyOptions())`, `node.minified_html_`).
+
+The end-tag rules follow the "Optional tags" section of the HTML Living Standard. An end tag is
+only dropped when the parser is guaranteed to close the element at the same place: the rules
+look at the parent element and the next sibling, and anything that cannot be known (raw HTML
+siblings, what follows the node being rendered) keeps the end tag.
+
+Classes:
+    MinifyOptions: Switches for the individual minification steps.
+
+Functions:
+    end_tag_omissible: Whether an element's end tag may be left out.
+    unquoted_attr_ok: Whether an escaped attribute value may be written without quotes.
+    collapse_whitespace: Collapses runs of ASCII whitespace in text.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Final
+
+
+@dataclass(frozen=True)
+class MinifyOptions:
+    """
+    Options for minified rendering. Every step is enabled by default.
+
+    Attributes:
+        unquoted_attrs (bool): Write attribute values without quotes where HTML allows it (no
+            whitespace, quotes, `=`, `<`, `>` or backticks, and not empty).
+        omit_end_tags (bool): Leave out end tags the HTML spec marks as optional in their
+            position (`</li>`, `</td>`, `</tr>`, `</option>`, `</p>`, ...).
+        collapse_whitespace (bool): Collapse runs of whitespace in text children to one space,
+            except inside `pre`, `textarea`, `script` and `style`. `RAW_STR` is never changed.
+
+    Void elements are always written without the trailing slash (`<br>`).
+    """
+
+    unquoted_attrs: bool = True
+    omit_end_tags: bool = True
+    collapse_whitespace: bool = True
+
+
+class _Unknown:
+    """Marker for a next sibling that cannot be known, e.g. after the node being rendered."""
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN: Final = _Unknown()
+
+# Elements whose whitespace is significant.
+WHITESPACE_PRESERVING: Final = frozenset({"pre", "textarea", "script", "style"})
+
+# Any element may follow (the rule only forbids whitespace or a comment right after the end tag).
+_ANY: Final = frozenset({"*"})
+
+# tag -> (tags of a next sibling that allow omission, whether the end of the parent allows it)
+_END_TAG_RULES: Final[dict[str, tuple[frozenset[str], bool]]] = {
+    "html": (_ANY, True),
+    "head": (_ANY, True),
+    "body": (_ANY, True),
+    "li": (frozenset({"li"}), True),
+    "dt": (frozenset({"dt", "dd"}), False),
+    "dd": (frozenset({"dt", "dd"}), True),
+    "p": (
+        frozenset(
+            "address article aside blockquote details dialog div dl fieldset figcaption figure footer form"
+            " h1 h2 h3 h4 h5 h6 header hgroup hr main menu nav ol p pre search section table ul".split()
+        ),
+        True,
+    ),
+    "rt": (frozenset({"rt", "rp"}), True),
+    "rp": (frozenset({"rt", "rp"}), True),
+    "optgroup": (frozenset({"optgroup", "hr"}), True),
+    "option": (frozenset({"option", "optgroup", "hr"}), True),
+    "caption": (_ANY, True),
+    "colgroup": (_ANY, True),
+    "thead": (frozenset({"tbody", "tfoot"}), False),
+    "tbody": (frozenset({"tbody", "tfoot"}), True),
+    "tfoot": (frozenset(), True),
+    "tr": (frozenset({"tr"}), True),
+    "td": (frozenset({"td", "th"}), True),
+    "th": (frozenset({"td", "th"}), True),
+}
+
+# Omission is only applied inside the parents these elements belong in: with invalid nesting the
+# parser would close them elsewhere. An unknown parent (a rendered fragment) is trusted.
+_EXPECTED_PARENTS: Final[dict[str, frozenset[str]]] = {
+    "head": frozenset({"html"}),
+    "body": frozenset({"html"}),
+    "li": frozenset({"ul", "ol", "menu"}),
+    "dt": frozenset({"dl", "div"}),
+    "dd": frozenset({"dl", "div"}),
+    "rt": frozenset({"ruby"}),
+    "rp": frozenset({"ruby"}),
+    "optgroup": frozenset({"select"}),
+    "option": frozenset({"select", "datalist", "optgroup"}),
+    "caption": frozenset({"table"}),
+    "colgroup": frozenset({"table"}),
+    "thead": frozenset({"table"}),
+    "tbody": frozenset({"table"}),
+    "tfoot": frozenset({"table"}),
+    "tr": frozenset({"table", "thead", "tbody", "tfoot"}),
+    "td": frozenset({"tr"}),
+    "th": frozenset({"tr"}),
+}
+
+# A `</p>` at the end of one of these parents, or of an autonomous custom element (a tag
+# containing "-"), must stay.
+_P_KEEP_AT_END_OF: Final = frozenset({"a", "audio", "del", "ins", "map", "noscript", "video"})
+
+_UNQUOTED_VALUE = re.compile(r"[^\s\"'=<>`]+")
+_WHITESPACE_RUN = re.compile(r"[ \t\n\f\r]+")
+
+
+def end_tag_omissible(tag: str, parent: str | None, following: str | None | _Unknown) -> bool:
+    """
+    Decide whether the end tag of `tag` may be omitted.
+
+    Args:
+        tag (str): The element whose end tag is being written.
+        parent (str | None): The parent element's tag, or None if it is not known.
+        following (str | None | _Unknown): The tag of the next sibling element, None at the end
+            of the parent, or `UNKNOWN` for text, raw HTML or anything that cannot be known.
+
+    Returns:
+        bool: True if the end tag can be left out without changing the parsed document.
+    """
+    rule = _END_TAG_RULES.get(tag)
+    if rule is None:
+        return False
+    followers, at_end = rule
+    expected = _EXPECTED_PARENTS.get(tag)
+    if expected is not None and parent is not None and parent not in expected:
+        return False
+    if following is None:
+        if tag == "p":
+            return parent is not None and parent not in _P_KEEP_AT_END_OF and "-" not in parent
+        return at_end and parent is not None
+    if isinstance(following, _Unknown):
+        # <html> is the document root; only a comment could follow it.
+        return tag == "html"
+    return followers is _ANY or following in followers
+
+
+def unquoted_attr_ok(escaped: str) -> bool:
+    """Whether an already escaped attribute value can be written as `name=value`."""
+    if escaped.isalnum():
+        return True
+    return _UNQUOTED_VALUE.fullmatch(escaped) is not None
+
+
+def collapse_whitespace(text: str) -> str:
+    """Replace every run of ASCII whitespace with a single space."""
+    if "  " not in text and "\n" not in text and "\t" not in text and "\r" not in text and "\f" not in text:
+        # Nothing to collapse (the common case); skip the regex.
+        return text
+    return _WHITESPACE_RUN.sub(" ", text)
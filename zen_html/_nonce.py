@@ -0,0 +1,141 @@
+"""
+_nonce.py
+
+This module supplies the Content Security Policy nonce of a response to the renderer. While a
+nonce is set (`csp_nonce()`, or `bind_nonce()` for a stream consumed elsewhere), every
+`<script>`, `<style>` and `<link>` start tag gets a `nonce` attribute, including the inline
+scripts of `astream_tokens`; elements with their own `nonce=` keep it.
+
+Cached markup stays the same for every response. `H.static` markup and `ResponseCache` entries
+are rendered once with a placeholder nonce whose attributes are cut out again, leaving the
+nonce-free markup and the offsets ("slots") where the attribute goes. Each response then sends
+the cached segments (and their cached deflate blocks) with its own nonce between them.
+
+Functions:
+    csp_nonce: Sets the nonce for rendering in the current thread or asyncio task.
+    new_nonce: Returns a fresh random nonce.
+    bind_nonce: Renders a node or token stream with a nonce, wherever it is consumed.
+    abind_nonce: The same for async token streams.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import secrets
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+
+from ._base import _CSP_NONCE, _format_nonce_attr, _HBase
+from ._minify import MinifyOptions
+
+# Placeholder nonce set while rendering markup that is cached. The NUL characters pass through
+# attribute escaping unchanged and the random part keeps it from occurring in real content.
+_NONCE_MARK = f"\x00zen-html-nonce-{secrets.token_hex(8)}\x00"
+
+
+def new_nonce() -> str:
+    """Return a fresh nonce: 128 random bits, base64url encoded."""
+    return secrets.token_urlsafe(16)
+
+
+@contextmanager
+def csp_nonce(nonce: str | None = None) -> Iterator[str]:
+    """
+    Render `<script>`, `<style>` and `<link>` tags with a CSP nonce inside the block.
+
+    The nonce is a context variable: it applies to the current thread or asyncio task only
+    (tasks created in the block inherit it). Token streams are lazy, so consume them inside the
+    block, or use `bind_nonce` for streams consumed elsewhere, e.g. by a response.
+
+    Args:
+        nonce (str | None): The nonce; a new one (`new_nonce()`) when None.
+
+    Returns:
+        Iterator[str]: A context manager yielding the nonce, for the
+        ``Content-Security-Policy`` header.
+    """
+    value = new_nonce() if nonce is None else nonce
+    token = _CSP_NONCE.set(value)
+    try:
+        yield value
+    finally:
+        _CSP_NONCE.reset(token)
+
+
+def bind_nonce(
+    content: _HBase | Iterable[str], nonce: str, *, minify: MinifyOptions | None = None
+) -> Iterator[str]:
+    """
+    Render a node or token stream with a CSP nonce, in whatever thread consumes the tokens.
+
+    The nonce is set only while each token is produced, so the stream can be handed to a
+    response or a thread pool (`ASGIResponse` renders in the event loop's executor).
+
+    Args:
+        content (_HBase | Iterable[str]): A node or a token stream such as a `Document`.
+        nonce (str): The nonce of this response.
+        minify (MinifyOptions | None): Render a node minified.
+
+    Returns:
+        Iterator[str]: The rendered tokens.
+    """
+    tokens = iter(content.to_token(minify) if isinstance(content, _HBase) else content)
+    try:
+        while True:
+            reset = _CSP_NONCE.set(nonce)
+            try:
+                token = next(tokens, None)
+            finally:
+                _CSP_NONCE.reset(reset)
+            if token is None:
+                return
+            yield token
+    finally:
+        close = getattr(tokens, "close", None)
+        if close is not None:
+            close()
+
+
+async def abind_nonce(content: AsyncIterable[str], nonce: str) -> AsyncIterator[str]:
+    """
+    Async version of `bind_nonce`, e.g. for the output of `astream_tokens`. Deferred loaders
+    started while a token is produced inherit the nonce.
+    """
+    tokens = aiter(content)
+    try:
+        while True:
+            reset = _CSP_NONCE.set(nonce)
+            try:
+                token = await anext(tokens, None)
+            finally:
+                _CSP_NONCE.reset(reset)
+            if token is None:
+                return
+            yield token
+    finally:
+        aclose = getattr(tokens, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _render_with_slots(render: Callable[[], str]) -> list[str]:
+    """
+    Call `render` with the placeholder nonce set and split its output at the nonce attributes.
+
+    Returns:
+        list[str]: The nonce-free segments; a nonce attribute goes between each two of them.
+    """
+    reset = _CSP_NONCE.set(_NONCE_MARK)
+    try:
+        markup = render()
+    finally:
+        _CSP_NONCE.reset(reset)
+    return markup.split(_format_nonce_attr(_NONCE_MARK))
+
+
+def _slot_offsets(lengths: Iterable[int]) -> tuple[int, ...]:
+    # Offsets of the slots between segments of the given lengths (the last one is not needed).
+    offsets = tuple(accumulate(lengths))
+    return offsets[:-1]
@@ -0,0 +1,179 @@
+"""
+_query.py
+
+This module provides lookups over node trees by id, tag, class and key. The first query on a
+node builds an index of its subtree and caches it on the node, so later lookups cost O(1) for an
+id and O(matches) for a tag, class or key instead of a walk over the whole tree.
+
+Nodes are immutable, so a cached index never goes stale. Nodes derived with `with_props`,
+`with_children` or `replace_at` start without one, and their untouched subtrees keep their own.
+
+Classes:
+    _TreeIndex: Index of the elements in a subtree.
+
+Functions:
+    walk_tree: Yields the elements of a subtree with their paths, in document order.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator
+
+from ._base import _HBase, _HFragment
+
+Path = tuple[int, ...]
+
+
+class _TreeIndex:
+    """
+    Index of the elements in the subtree of a node, in document order.
+
+    Every node is stored once per position with its parent's position and its child index, so
+    paths are rebuilt on demand and the index stays linear in the size of the tree, however deep
+    it is. Fragment-like nodes (`H.static`, table rows) take part in paths but are not elements.
+
+    Args:
+        root (_HBase): The node to index; its own path is `()`.
+    """
+
+    def __init__(self, root: _HBase):
+        nodes: list[_HBase] = []
+        parents: list[int] = []
+        indexes: list[int] = []
+        elements: list[int] = []
+        by_id: dict[str, list[int]] = {}
+        by_tag: dict[str, list[int]] = {}
+        by_class: dict[str, list[int]] = {}
+        by_key: dict[str | int, list[int]] = {}
+        positions: dict[int, int] = {}
+
+        stack: list[tuple[_HBase, int, int]] = [(root, -1, 0)]
+        while stack:
+            node, parent, index = stack.pop()
+            position = len(nodes)
+            nodes.append(node)
+            parents.append(parent)
+            indexes.append(index)
+            positions.setdefault(id(node), position)
+            if not isinstance(node, _HFragment):
+                elements.append(position)
+                by_tag.setdefault(node._tag, []).append(position)
+                props = node._props
+                value = props.get("id")
+                if isinstance(value, str):
+                    by_id.setdefault(value, []).append(position)
+                value = props.get("class")
+                if isinstance(value, str):
+                    for name in dict.fromkeys(value.split()):
+                        by_class.setdefault(name, []).append(position)
+                if node._key is not None:
+                    by_key.setdefault(node._key, []).append(position)
+            children = node._children
+            for i in range(len(children) - 1, -1, -1):
+                child = children[i]
+                if isinstance(child, _HBase):
+                    stack.append((child, position, i))
+
+        self._nodes = nodes
+        self._parents = parents
+        self._indexes = indexes
+        self._elements = elements
+        self._by_id = by_id
+        self._by_tag = by_tag
+        self._by_class = by_class
+        self._by_key = by_key
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def find_by_id(self, value: str) -> _HBase | None:
+        positions = self._by_id.get(value)
+        return self._nodes[positions[0]] if positions else None
+
+    def find_all(
+        self,
+        tag: str | None,
+        id: str | None,
+        classes: Iterable[str],
+        key: str | int | None,
+        where: Callable[[_HBase], bool] | None,
+    ) -> list[_HBase]:
+        # Start from the shortest position list of the indexed criteria and check the others
+        # on each candidate.
+        lists: list[list[int]] = []
+        if tag is not None:
+            lists.append(self._by_tag.get(tag, []))
+        if id is not None:
+            lists.append(self._by_id.get(id, []))
+        if key is not None:
+            lists.append(self._by_key.get(key, []))
+        wanted = set(classes)
+        for name in wanted:
+            lists.append(self._by_class.get(name, []))
+        candidates = min(lists, key=len) if lists else self._elements
+
+        matches: list[_HBase] = []
+        for position in candidates:
+            node = self._nodes[position]
+            if tag is not None and node._tag != tag:
+                continue
+            if id is not None and node._props.get("id") != id:
+                continue
+            if key is not None and node._key != key:
+                continue
+            if wanted and not wanted.issubset(str(node._props.get("class", "")).split()):
+                continue
+            if where is not None and not where(node):
+                continue
+            matches.append(node)
+        return matches
+
+    def path_of(self, node: _HBase) -> Path:
+        position = self._positions.get(id(node))
+        if position is None:
+            raise ValueError(f"{node!r} is not in this tree")
+        path: list[int] = []
+        while position > 0:
+            path.append(self._indexes[position])
+            position = self._parents[position]
+        path.reverse()
+        return tuple(path)
+
+
+def walk_tree(root: _HBase) -> Iterator[tuple[Path, _HBase]]:
+    """
+    Yield the elements of a subtree and their paths in document order, starting with `root`.
+
+    Args:
+        root (_HBase): The node to walk; its own path is `()`.
+
+    Returns:
+        Iterator[tuple[Path, _HBase]]: `(path, node)` pairs. Paths index the children each
+        node was built with, as `replace_at` does.
+    """
+    path: list[int] = []
+    stack: list[Iterator[tuple[int, object]]] = []
+    node: _HBase | None = root
+    while True:
+        if node is not None:
+            if not isinstance(node, _HFragment):
+                yield tuple(path), node
+            stack.append(enumerate(node._children))
+            path.append(-1)
+        node = None
+        while stack:
+            for i, child in stack[-1]:
+                if isinstance(child, _HBase):
+                    path[-1] = i
+                    node = child
+                    break
+            else:
+                stack.pop()
+                path.pop()
+                continue
+            break
+        if node is None:
+            return
@@ -0,0 +1,378 @@
+"""
+_response_cache.py
+
+This module provides a cache for whole rendered documents (e.g. the output of
+`HResponse(HtmlDocument(...), include_doctype=True)`). Entries hold the final UTF-8 body and,
+optionally, a gzip-compressed copy so cache hits never touch the node tree again. The body never
+contains a CSP nonce; entries record where `<script>`, `<style>` and `<link>` tags take one, so
+each response can add its own (see `zen_html._nonce`).
+
+Classes:
+    CacheEntry: Immutable rendered response stored in a backend.
+    CacheBackend: Protocol implemented by storage backends.
+    MemoryCacheBackend: In-process LRU backend bounded by a total byte budget.
+    ResponseCache: Render-or-fetch front end with tag invalidation and stale-while-revalidate.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Protocol
+
+from ._base import _format_nonce_attr, _HBase
+from ._compress import compress_tokens, negotiate_encoding
+from ._nonce import _render_with_slots, _slot_offsets
+from ._static import _StaticHTML, _with_nonce
+
+HtmlContent = _HBase | Iterable[str]
+DOCTYPE = "<!DOCTYPE html>"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """
+    A rendered response stored in a cache backend.
+
+    Attributes:
+        body (bytes): UTF-8 encoded document.
+        gzip_body (bytes | None): gzip-compressed copy of `body`, if compression is enabled.
+        tags (frozenset[str]): Dependency tags used for invalidation (e.g. ``"product:42"``).
+        created_at (float): Clock value at render time.
+        ttl (float | None): Seconds the entry stays fresh; None means fresh until evicted.
+        stale_ttl (float): Extra seconds during which the entry may be served while re-rendering.
+        nonce_slots (tuple[int, ...]): Byte offsets in `body` where a CSP nonce attribute goes.
+    """
+
+    body: bytes
+    gzip_body: bytes | None = None
+    tags: frozenset[str] = field(default_factory=frozenset)
+    created_at: float = 0.0
+    ttl: float | None = None
+    stale_ttl: float = 0.0
+    nonce_slots: tuple[int, ...] = ()
+    # The body split at the nonce slots, created on the first request with a nonce.
+    _segments: tuple[_StaticHTML, ...] | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip_body or b"")
+
+    def is_fresh(self, now: float) -> bool:
+        return self.ttl is None or now < self.created_at + self.ttl
+
+    def is_usable(self, now: float) -> bool:
+        return self.ttl is None or now < self.created_at + self.ttl + self.stale_ttl
+
+    def select(self, accept_encoding: str = "", nonce: str | None = None) -> tuple[bytes, str | None]:
+        """
+        Pick the body matching an ``Accept-Encoding`` header.
+
+        With a `nonce`, the body is assembled from the cached parts between the nonce slots and
+        the nonce attributes. A gzip body is assembled from the cached deflate blocks of those
+        parts, so only the attributes are compressed per request.
+
+        Args:
+            accept_encoding (str): The request's ``Accept-Encoding`` header.
+            nonce (str | None): The CSP nonce of the response.
+
+        Returns:
+            tuple[bytes, str | None]: The body and the ``Content-Encoding`` to send (or None).
+        """
+        gzipped = self.gzip_body is not None and _accepts_gzip(accept_encoding)
+        if nonce is not None and self.nonce_slots:
+            segments = self._nonce_segments()
+            if gzipped:
+                tokens = _with_nonce(segments, nonce)
+                return b"".join(compress_tokens(tokens, "gzip", flush_bytes=None, flush_before=())), "gzip"
+            return _format_nonce_attr(nonce).encode().join(segment.data for segment in segments), None
+        if gzipped:
+            assert self.gzip_body is not None
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+    def _nonce_segments(self) -> tuple[_StaticHTML, ...]:
+        segments = self._segments
+        if segments is None:
+            bounds = (0, *self.nonce_slots, len(self.body))
+            segments = tuple(
+                _StaticHTML(self.body[start:end].decode()) for start, end in zip(bounds, bounds[1:])
+            )
+            # Frozen dataclass: the cache is not part of the entry's value.
+            object.__setattr__(self, "_segments", segments)
+        return segments
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by `ResponseCache`. Implementations must be thread-safe."""
+
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def set(self, key: str, entry: CacheEntry) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """
+    In-process backend with LRU eviction under a total byte budget.
+
+    Args:
+        max_bytes (int): Upper bound for the summed `CacheEntry.size` of all entries.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tag_index: dict[str, set[str]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._remove(key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += entry.size
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys: set[str] = set()
+            for tag in tags:
+                keys |= self._tag_index.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tag_index[tag]
+
+
+class ResponseCache:
+    """
+    Cache of fully rendered documents keyed by an application-defined string.
+
+    Args:
+        backend (CacheBackend | None): Storage backend. Defaults to `MemoryCacheBackend(max_bytes)`.
+        max_bytes (int): Byte budget for the default in-process backend.
+        ttl (float | None): Default freshness lifetime in seconds; None keeps entries until evicted.
+        stale_while_revalidate (float): Seconds a stale entry may still be served while it is
+            re-rendered in the background.
+        compress (bool): Also store a gzip-compressed body.
+        compress_level (int): gzip compression level.
+        executor (Executor | None): Runs background re-renders. A daemon thread is used when None.
+        clock (Callable[[], float]): Time source, monotonic by default.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float | None = None,
+        stale_while_revalidate: float = 0.0,
+        compress: bool = True,
+        compress_level: int = 6,
+        executor: Executor | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backend: CacheBackend = backend if backend is not None else MemoryCacheBackend(max_bytes)
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.compress = compress
+        self.compress_level = compress_level
+        self._executor = executor
+        self._clock = clock
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self.backend.get(key)
+        if entry is None or not entry.is_usable(self._clock()):
+            return None
+        return entry
+
+    def get_or_render(
+        self,
+        key: str,
+        render: Callable[[], HtmlContent],
+        *,
+        tags: Iterable[str] = (),
+        include_doctype: bool = True,
+        ttl: float | None = None,
+    ) -> CacheEntry:
+        """
+        Return the cached entry for `key`, rendering and storing it on a miss.
+
+        A stale entry inside the stale-while-revalidate window is returned as-is while
+        `render` runs again in the background.
+
+        Args:
+            key (str): Cache key.
+            render (Callable[[], HtmlContent]): Builds the document (an `H` tree or token iterable).
+            tags (Iterable[str]): Dependency tags for `invalidate`.
+            include_doctype (bool): Prepend ``<!DOCTYPE html>`` to the rendered body.
+            ttl (float | None): Overrides the default freshness lifetime for this entry.
+
+        Returns:
+            CacheEntry: The fresh or stale-but-usable entry.
+        """
+        now = self._clock()
+        entry = self.backend.get(key)
+        if entry is not None:
+            if entry.is_fresh(now):
+                return entry
+            if entry.is_usable(now):
+                self._revalidate(key, render, tags, include_doctype, ttl)
+                return entry
+        return self._store(key, render, tags, include_doctype, ttl)
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry depending on any of `tags`. Returns the number of removed entries."""
+        return self.backend.invalidate_tags(tags)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def render_entry(
+        self,
+        content: HtmlContent,
+        *,
+        tags: Iterable[str] = (),
+        include_doctype: bool = True,
+        ttl: float | None = None,
+    ) -> CacheEntry:
+        parts = [
+            segment.encode()
+            for segment in _render_with_slots(lambda: _render_text(content, include_doctype=include_doctype))
+        ]
+        body = b"".join(parts)
+        gzip_body = gzip.compress(body, self.compress_level, mtime=0) if self.compress else None
+        return CacheEntry(
+            body=body,
+            gzip_body=gzip_body,
+            tags=frozenset(tags),
+            created_at=self._clock(),
+            ttl=self.ttl if ttl is None else ttl,
+            stale_ttl=self.stale_while_revalidate,
+            nonce_slots=_slot_offsets(map(len, parts)),
+        )
+
+    def _store(
+        self,
+        key: str,
+        render: Callable[[], HtmlContent],
+        tags: Iterable[str],
+        include_doctype: bool,
+        ttl: float | None,
+    ) -> CacheEntry:
+        entry = self.render_entry(render(), tags=tags, include_doctype=include_doctype, ttl=ttl)
+        self.backend.set(key, entry)
+        return entry
+
+    def _revalidate(
+        self,
+        key: str,
+        render: Callable[[], HtmlContent],
+        tags: Iterable[str],
+        include_doctype: bool,
+        ttl: float | None,
+    ) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        tags = tuple(tags)
+
+        def job() -> None:
+            try:
+                self._store(key, render, tags, include_doctype, ttl)
+            except Exception:
+                _HBase.logger.exception("Background re-render failed for %r", key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        if self._executor is not None:
+            self._executor.submit(job)
+        else:
+            threading.Thread(target=job, name=f"zen_html-revalidate-{key}", daemon=True).start()
+
+
+def render_bytes(content: HtmlContent, *, include_doctype: bool = False) -> bytes:
+    """
+    Render an `H` tree or token iterable to UTF-8 bytes.
+
+    Args:
+        content (HtmlContent): Node or iterable of already-rendered tokens.
+        include_doctype (bool): Prepend ``<!DOCTYPE html>``.
+
+    Returns:
+        bytes: The encoded document.
+    """
+    return _render_text(content, include_doctype=include_doctype).encode("utf-8")
+
+
+def _render_text(content: HtmlContent, *, include_doctype: bool) -> str:
+    tokens = content.to_token() if isinstance(content, _HBase) else content
+    text = "".join(tokens)
+    return DOCTYPE + text if include_doctype else text
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    return negotiate_encoding(accept_encoding, ("gzip",)) == "gzip"
@@ -0,0 +1,425 @@
+"""
+_shared_cache.py
+
+This module provides a fragment cache shared by every worker process on a host. Pre-rendered
+bytes for `H` subtrees live in a memory-mapped file laid out as a fixed open-addressing slot
+table followed by an append-only arena.
+
+Writers serialize on an advisory file lock (`fcntl.flock`). Readers never lock: each slot is
+guarded by a sequence counter (a seqlock) and arena bytes are immutable once published, so a
+reader can hand out a zero-copy `memoryview` into the mapping. Compaction writes a fresh file,
+atomically renames it over the old one and marks the old mapping as retired; mappings that are
+still referenced stay valid, and every cache instance reopens the path when it notices the flag.
+
+Rendered nodes are stored without a CSP nonce, next to the offsets of their nonce attributes;
+`get_or_render` splices in the nonce of the current render (see `zen_html._nonce`).
+
+Classes:
+    SharedFragmentCache: Cross-process cache of rendered fragments keyed by content hash.
+
+Functions:
+    fragment_key: Computes the 16-byte content key for a node, string or bytes.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import BinaryIO
+
+from ._base import _CSP_NONCE, _format_nonce_attr, _HBase
+from ._nonce import _render_with_slots, _slot_offsets
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+MAGIC = b"ZHFC"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQQQQ")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<IIQ16s")
+SEQ = struct.Struct("<I")
+FLAGS_OFFSET = 12
+FLAG_RETIRED = 1
+EMPTY = bytes(16)
+TOMBSTONE = b"\xff" * 16
+MAX_SPIN = 1000
+# Prefix of the key under which the nonce slots of a rendered node are stored.
+NONCE_SLOTS_KEY = b"zen_html nonce slots\x00"
+
+FragmentKey = _HBase | str | bytes
+
+
+def fragment_key(value: FragmentKey) -> bytes:
+    """
+    Compute the 16-byte content key used by `SharedFragmentCache`.
+
+    Args:
+        value (FragmentKey): A node (keyed by its content hash `hash_`), or a str/bytes key.
+
+    Returns:
+        bytes: A BLAKE2b digest, stable across processes.
+    """
+    if isinstance(value, _HBase):
+        data = value.hash_
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+    else:
+        data = value
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if digest in (EMPTY, TOMBSTONE):
+        digest = b"\x01" + digest[1:]
+    return digest
+
+
+class SharedFragmentCache:
+    """
+    Memory-mapped fragment cache shared between processes.
+
+    Args:
+        path (str | os.PathLike[str]): Backing file; created on first use.
+        capacity (int): Arena size in bytes.
+        slots (int): Number of hash-table slots, at least 2. At most three quarters of them hold
+            entries.
+        keep_ratio (float): Fraction of the arena retained (newest entries first) on compaction.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        capacity: int = 64 * 1024 * 1024,
+        slots: int = 65536,
+        keep_ratio: float = 0.5,
+    ) -> None:
+        if fcntl is None:
+            raise RuntimeError("SharedFragmentCache requires a POSIX platform (fcntl)")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if _max_entries(slots) < 1:
+            raise ValueError(f"slots must be at least 2: {slots}")
+        if not 0.0 <= keep_ratio <= 1.0:
+            raise ValueError("keep_ratio must be between 0 and 1")
+        self.path = os.fspath(path)
+        self.keep_ratio = keep_ratio
+        self._capacity = capacity
+        self._slots = slots
+        self._thread_lock = threading.Lock()
+        self._file: BinaryIO
+        self._mm: mmap.mmap
+        self._open()
+
+    def get(self, key: FragmentKey) -> memoryview | None:
+        """
+        Look up a fragment without taking any lock.
+
+        Returns:
+            memoryview | None: Zero-copy view of the stored bytes, or None on a miss.
+        """
+        # One reference throughout: a concurrent reopen swaps `self._mm` but leaves the old
+        # mapping open for as long as it is referenced.
+        mm = self._mm
+        if _is_retired(mm):
+            self._reopen()
+            mm = self._mm
+        return self._lookup(mm, fragment_key(key))
+
+    def put(self, key: FragmentKey, data: bytes | memoryview) -> memoryview:
+        """
+        Store a fragment (no-op if the key is already present) and return a view of it.
+
+        Raises:
+            ValueError: If `data` is larger than the arena.
+        """
+        digest = fragment_key(key)
+        size = len(data)
+        if size > self._capacity:
+            raise ValueError(f"Fragment of {size} bytes exceeds cache capacity {self._capacity}")
+        with self._thread_lock:
+            while True:
+                file, mm = self._file, self._mm
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                try:
+                    if self._is_retired():
+                        self._reopen_locked()
+                        continue
+                    found = self._lookup(mm, digest)
+                    if found is not None:
+                        return found
+                    _, _, slot_count, _, arena_size, write_offset, _, entries = HEADER.unpack_from(mm, 0)
+                    if write_offset + size > arena_size or entries + 1 > _max_entries(slot_count):
+                        self._compact_locked(reserve=size)
+                        continue
+                    return self._append(mm, digest, data, write_offset, entries)
+                finally:
+                    _unlock(file)
+
+    def get_or_render(self, node: _HBase) -> memoryview:
+        """
+        Return the cached bytes for `node`, rendering and storing them on a miss.
+
+        The stored bytes never contain a CSP nonce. With a nonce set (`csp_nonce`), the returned
+        view is a copy with the nonce added to its `<script>`, `<style>` and `<link>` tags.
+        """
+        found = self.get(node)
+        if found is None:
+            body, slots = _render_node(node)
+            if slots:
+                # Stored first, so a reader that finds the markup finds its slots as well.
+                self.put(NONCE_SLOTS_KEY + node.hash_, slots)
+            found = self.put(node, body)
+        nonce = _CSP_NONCE.get()
+        if nonce is None:
+            return found
+        packed = self.get(NONCE_SLOTS_KEY + node.hash_)
+        if packed is None:
+            markup = bytes(found)
+            if b"<script" not in markup and b"<style" not in markup and b"<link" not in markup:
+                return found
+            # Slots dropped by a compaction that kept the markup: render again to find them.
+            packed = self.put(NONCE_SLOTS_KEY + node.hash_, _render_node(node)[1])
+        if not packed:
+            return found
+        bounds = (0, *struct.unpack(f"<{len(packed) // 8}Q", packed), len(found))
+        attr = _format_nonce_attr(nonce).encode("utf-8")
+        return memoryview(attr.join(found[start:end] for start, end in zip(bounds, bounds[1:])))
+
+    def delete(self, key: FragmentKey) -> bool:
+        digest = fragment_key(key)
+        with self._thread_lock:
+            while True:
+                file, mm = self._file, self._mm
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                try:
+                    if self._is_retired():
+                        self._reopen_locked()
+                        continue
+                    pos = self._find_slot(mm, digest)
+                    if pos is None:
+                        return False
+                    seq, length, offset, _ = SLOT.unpack_from(mm, pos)
+                    SEQ.pack_into(mm, pos, seq + 1)
+                    SLOT.pack_into(mm, pos, seq + 1, length, offset, TOMBSTONE)
+                    SEQ.pack_into(mm, pos, seq + 2)
+                    header = list(HEADER.unpack_from(mm, 0))
+                    header[6] += length
+                    HEADER.pack_into(mm, 0, *header)
+                    return True
+                finally:
+                    _unlock(file)
+
+    def compact(self) -> None:
+        """Rewrite the file without deleted entries, keeping the newest `keep_ratio` of the arena."""
+        with self._thread_lock:
+            file = self._file
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                if self._is_retired():
+                    self._reopen_locked()
+                    return
+                self._compact_locked(reserve=0)
+            finally:
+                _unlock(file)
+
+    @property
+    def bytes_used(self) -> int:
+        _, _, _, _, _, write_offset, dead, _ = HEADER.unpack_from(self._mm, 0)
+        return int(write_offset - dead)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._live_slots(self._mm))
+
+    def close(self) -> None:
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # views handed to callers keep the mapping alive
+        self._file.close()
+
+    def __enter__(self) -> SharedFragmentCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- internals -------------------------------------------------------------------------------
+
+    @property
+    def _arena_start(self) -> int:
+        return HEADER_SIZE + self._slots * SLOT.size
+
+    def _open(self) -> None:
+        file = open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(file.fileno()).st_size == 0:
+                _initialize(file, self._slots, self._capacity)
+            mm = mmap.mmap(file.fileno(), 0)
+        finally:
+            _unlock(file)
+        magic, version, slot_count, _, arena_size, _, _, _ = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            file.close()
+            raise ValueError(f"{self.path} is not a zen_html fragment cache")
+        self._slots = slot_count
+        self._capacity = arena_size
+        self._file = file
+        self._mm = mm
+
+    def _reopen(self) -> None:
+        with self._thread_lock:
+            if self._is_retired():
+                self._reopen_locked()
+
+    def _reopen_locked(self) -> None:
+        # The old mapping is not closed: lock-free readers may still be using it. It is unmapped
+        # once the last reference (including views handed to callers) goes away.
+        old_file = self._file
+        self._open()
+        old_file.close()
+
+    def _is_retired(self) -> bool:
+        return _is_retired(self._mm)
+
+    def _slot_index(self, digest: bytes) -> int:
+        return int.from_bytes(digest[:8], "little") % self._slots
+
+    def _read_slot(self, mm: mmap.mmap, pos: int) -> tuple[int, int, bytes] | None:
+        for _ in range(MAX_SPIN):
+            seq, length, offset, digest = SLOT.unpack_from(mm, pos)
+            if seq & 1:
+                continue
+            if SEQ.unpack_from(mm, pos)[0] == seq:
+                return length, offset, digest
+        return None
+
+    def _lookup(self, mm: mmap.mmap, digest: bytes) -> memoryview | None:
+        index = self._slot_index(digest)
+        arena = self._arena_start
+        for _ in range(self._slots):
+            slot = self._read_slot(mm, HEADER_SIZE + index * SLOT.size)
+            if slot is None:
+                return None
+            length, offset, found = slot
+            if found == EMPTY:
+                return None
+            if found == digest:
+                start = arena + offset
+                end = start + length
+                return memoryview(mm)[start:end]
+            index = (index + 1) % self._slots
+        return None
+
+    def _find_slot(self, mm: mmap.mmap, digest: bytes) -> int | None:
+        index = self._slot_index(digest)
+        for _ in range(self._slots):
+            pos = HEADER_SIZE + index * SLOT.size
+            found = SLOT.unpack_from(mm, pos)[3]
+            if found == EMPTY:
+                return None
+            if found == digest:
+                return pos
+            index = (index + 1) % self._slots
+        return None
+
+    def _append(
+        self, mm: mmap.mmap, digest: bytes, data: bytes | memoryview, write_offset: int, entries: int
+    ) -> memoryview:
+        start = self._arena_start + write_offset
+        end = start + len(data)
+        mm[start:end] = data
+        index = self._slot_index(digest)
+        while True:
+            pos = HEADER_SIZE + index * SLOT.size
+            seq, _, _, found = SLOT.unpack_from(mm, pos)
+            if found in (EMPTY, TOMBSTONE):
+                break
+            index = (index + 1) % self._slots
+        SEQ.pack_into(mm, pos, seq + 1)
+        SLOT.pack_into(mm, pos, seq + 1, len(data), write_offset, digest)
+        SEQ.pack_into(mm, pos, seq + 2)
+        header = list(HEADER.unpack_from(mm, 0))
+        header[5] = write_offset + len(data)
+        header[7] = entries + 1
+        HEADER.pack_into(mm, 0, *header)
+        return memoryview(mm)[start:end]
+
+    def _live_slots(self, mm: mmap.mmap) -> list[tuple[int, int, bytes]]:
+        live = []
+        for index in range(self._slots):
+            _, length, offset, digest = SLOT.unpack_from(mm, HEADER_SIZE + index * SLOT.size)
+            if digest not in (EMPTY, TOMBSTONE):
+                live.append((offset, length, digest))
+        return live
+
+    def _compact_locked(self, *, reserve: int) -> None:
+        old_mm = self._mm
+        budget = int(self._capacity * self.keep_ratio)
+        budget = min(budget, self._capacity - reserve)
+        # Leave room for the entry that triggered the compaction.
+        max_entries = _max_entries(self._slots) - 1
+        kept: list[tuple[int, int, bytes]] = []
+        used = 0
+        for offset, length, digest in sorted(self._live_slots(old_mm), reverse=True):
+            if used + length > budget or len(kept) >= max_entries:
+                break
+            kept.append((offset, length, digest))
+            used += length
+
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w+b") as tmp:
+            _initialize(tmp, self._slots, self._capacity)
+            new_mm = mmap.mmap(tmp.fileno(), 0)
+            try:
+                write_offset = 0
+                arena = self._arena_start
+                for entries, (offset, length, digest) in enumerate(sorted(kept)):
+                    start = arena + offset
+                    end = start + length
+                    data = old_mm[start:end]
+                    self._append(new_mm, digest, data, write_offset, entries)
+                    write_offset += length
+                new_mm.flush()
+            finally:
+                new_mm.close()
+        os.replace(tmp_path, self.path)
+        flags = SEQ.unpack_from(old_mm, FLAGS_OFFSET)[0]
+        SEQ.pack_into(old_mm, FLAGS_OFFSET, flags | FLAG_RETIRED)
+        self._reopen_locked()
+
+
+def _render_node(node: _HBase) -> tuple[bytes, bytes]:
+    # The nonce-free markup of `node` and the packed byte offsets of its nonce slots.
+    parts = [part.encode("utf-8") for part in _render_with_slots(lambda: node.html_)]
+    slots = _slot_offsets(map(len, parts))
+    return b"".join(parts), struct.pack(f"<{len(slots)}Q", *slots)
+
+
+def _max_entries(slots: int) -> int:
+    # Entries a table of `slots` slots holds before exceeding a load factor of 3/4.
+    return slots * 3 // 4
+
+
+def _is_retired(mm: mmap.mmap) -> bool:
+    return bool(SEQ.unpack_from(mm, FLAGS_OFFSET)[0] & FLAG_RETIRED)
+
+
+def _unlock(file: BinaryIO) -> None:
+    # Reopening after a compaction closes the old file, which already released its lock.
+    if not file.closed:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def _initialize(file: BinaryIO, slots: int, capacity: int) -> None:
+    file.truncate(HEADER_SIZE + slots * SLOT.size + capacity)
+    file.seek(0)
+    file.write(HEADER.pack(MAGIC, VERSION, slots, 0, capacity, 0, 0, 0))
+    file.flush()
@@ -0,0 +1,167 @@
+"""
+_static.py
+
+This module provides static subtrees: nodes whose markup never changes between requests (site
+header, footer, head boilerplate). A static node renders its children once and then yields the
+cached markup as a single token. That token also caches its raw deflate encoding, so the
+streaming compressor (`zen_html._compress`) splices the precompressed bytes into the response
+instead of compressing the same markup again.
+
+Classes:
+    _StaticHTML: Rendered markup of a static subtree with its compressed forms cached.
+    _HStatic: Fragment-like node rendering its children from the cache.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import zlib
+from typing import TYPE_CHECKING, Callable, Iterable
+from weakref import WeakKeyDictionary
+
+from ._base import (
+    _CSP_NONCE,
+    Children,
+    _format_nonce_attr,
+    _HFragment,
+    _minified_children,
+)
+from ._minify import UNKNOWN, MinifyOptions, _Unknown
+from ._nonce import _render_with_slots, _slot_offsets
+
+if TYPE_CHECKING:
+    from ._transform import TransformPipeline
+
+
+class _StaticHTML(str):
+    """
+    Markup of a static subtree, as yielded by `to_token()`.
+
+    It is an ordinary string to everything that joins tokens. `StreamCompressor` recognizes the
+    type and writes `deflated(level)` instead of compressing the text.
+
+    Attributes:
+        data (bytes): The UTF-8 encoded markup.
+        nonce_slots (tuple[int, ...]): Offsets where a CSP nonce attribute goes (see
+            `zen_html._nonce`); the markup itself never holds a nonce.
+    """
+
+    nonce_slots: tuple[int, ...] = ()
+
+    def __init__(self, value: str) -> None:
+        super().__init__()
+        self.data = self.encode()
+        self._blocks: dict[int, bytes] = {}
+        self._segments: tuple[_StaticHTML, ...] | None = None
+
+    def deflated(self, level: int) -> bytes:
+        """
+        The markup as raw deflate blocks compressed at `level`, computed once per level.
+
+        The blocks are compressed without history and end with `Z_FULL_FLUSH`: they are not
+        final and end on a byte boundary, so they can be placed between the blocks of another
+        deflate stream that has been flushed.
+        """
+        block = self._blocks.get(level)
+        if block is None:
+            deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            block = self._blocks[level] = deflate.compress(self.data) + deflate.flush(zlib.Z_FULL_FLUSH)
+        return block
+
+    def with_nonce(self, nonce: str) -> tuple[str, ...]:
+        """
+        The markup as tokens with a nonce attribute in each slot.
+
+        The parts between the slots are `_StaticHTML` tokens themselves, created once, so their
+        deflate blocks are cached across responses like those of the whole markup.
+        """
+        segments = self._segments
+        if segments is None:
+            bounds = (0, *self.nonce_slots, len(self))
+            segments = self._segments = tuple(
+                _StaticHTML(self[start:end]) for start, end in zip(bounds, bounds[1:])
+            )
+        return _with_nonce(segments, nonce)
+
+
+def _render_static(render: Callable[[], str]) -> _StaticHTML:
+    # Rendered with the placeholder nonce, so the markup and its slots do not depend on the nonce
+    # (if any) of the request that renders it first.
+    segments = _render_with_slots(render)
+    html = _StaticHTML("".join(segments))
+    if len(segments) > 1:
+        html.nonce_slots = _slot_offsets(map(len, segments))
+    return html
+
+
+def _with_nonce(segments: tuple[_StaticHTML, ...], nonce: str) -> tuple[str, ...]:
+    attr = _format_nonce_attr(nonce)
+    tokens: list[str] = [segments[0]]
+    for segment in segments[1:]:
+        tokens.append(attr)
+        tokens.append(segment)
+    return tuple(tokens)
+
+
+def _static_tokens(html: _StaticHTML) -> tuple[str, ...]:
+    # The cached markup, with the current render's nonce in its slots.
+    if html.nonce_slots:
+        nonce = _CSP_NONCE.get()
+        if nonce is not None:
+            return html.with_nonce(nonce)
+    return (html,)
+
+
+class _HStatic(_HFragment):
+    """
+    Children rendered once and reused by every later render.
+
+    The node behaves like a fragment for `dict_`, `hash_`, `diff` and the pretty printers, but
+    it is not spliced into its parent: it stays a single child so that it renders as one cached
+    token. Minified output is cached per `MinifyOptions` and parent tag; the end of the static
+    markup is rendered as if an unknown sibling followed, so the cache never depends on what
+    comes after the node. Markup rendered through a `TransformPipeline` is cached per pipeline.
+    `<script>`, `<style>` and `<link>` tags in the markup get the nonce of each render.
+
+    The children must not change after construction (nodes are immutable; this only matters
+    for custom node types).
+    """
+
+    def __init__(self, *children: Children, children_kw: Children | None = None):
+        super().__init__(*children, children_kw=children_kw)
+        self._html: _StaticHTML | None = None
+        self._minified: dict[tuple[MinifyOptions, str | None], _StaticHTML] = {}
+        # Markup rendered through a `TransformPipeline`, filled by the pipeline.
+        self._transformed: WeakKeyDictionary[
+            TransformPipeline, dict[tuple[MinifyOptions | None, str | None], _StaticHTML]
+        ] = WeakKeyDictionary()
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        html = self._html
+        if html is None:
+            html = self._html = _render_static(lambda: "".join(self._children_tokens()))
+        return _static_tokens(html)
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        html = self._minified.get((minify, parent))
+        if html is None:
+            html = _render_static(
+                lambda: "".join(_minified_children(self._children, minify, parent, UNKNOWN))
+            )
+            self._minified[(minify, parent)] = html
+        return _static_tokens(html)
+
+    def _derive(self) -> _HStatic:
+        clone = super()._derive()
+        clone._html = None
+        clone._minified = {}
+        clone._transformed = WeakKeyDictionary()
+        return clone
+
+    def __repr__(self) -> str:
+        return f"H.static(children={self._children!r})"
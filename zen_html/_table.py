@@ -0,0 +1,635 @@
+"""
+_table.py
+
+This module renders tabular data straight into `<tr>`/`<td>` markup without creating a node per
+row or cell. The result is a fragment-like node: `to_token()` formats each row directly into an
+escaped string, while `dict_`, `hash_`, `diff` and the pretty printers see the equivalent
+`H.tr`/`H.td` tree, which is only built on demand.
+
+Classes:
+    _HTableRows: Node rendering a sequence of rows as table rows.
+    TableColumn: A column of pre-rendered cell markup.
+    _HColumnRows: Node assembling rows from pre-rendered columns.
+    TableStream: A table rendered in chunks from a lazily consumed row source.
+
+Functions:
+    format_column: Formats a column of raw values into cell markup in bulk.
+    escape_column: Escapes a column of cell text in bulk.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+import array
+import asyncio
+import html
+from datetime import date, time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Union,
+    cast,
+)
+
+from ._base import (
+    Child,
+    Children,
+    _escape_text,
+    _HBase,
+    _HFragment,
+    _is_markup,
+    _markup_of,
+    _to_html_value,
+)
+from ._minify import (
+    UNKNOWN,
+    MinifyOptions,
+    _Unknown,
+    collapse_whitespace,
+    end_tag_omissible,
+)
+
+ColumnKey = Union[str, int]
+Row = Union[Sequence[object], Mapping[str, object]]
+CellFormatter = Callable[[object], object]
+
+
+class _HTableRows(_HFragment):
+    """
+    Rows of a table rendered directly from data.
+
+    Args:
+        rows (Iterable[Row]): Sequences (indexed by position) or mappings (indexed by key).
+            All rows must share the same shape. The iterable is consumed once.
+        columns (Sequence[ColumnKey] | None): Keys/indices to render, in order. Defaults to the
+            keys (or positions) of the first row.
+        formatters (Mapping[ColumnKey, CellFormatter] | None): Per-column callables applied to raw
+            values. They may return text, `RAW_STR`, a node, or any value accepted below.
+        cell_attrs (Mapping[ColumnKey, Mapping[str, object]] | None): Per-column props for the cell
+            tag, validated and rendered exactly like `H.td(**props)`.
+        cell_tag (str): Cell element name, `"td"` or `"th"`.
+
+    Cell values are rendered like `H.td(value)`: text is escaped, `RAW_STR` and nodes are inserted
+    as-is, None renders an empty cell, and other values go through the same conversion as
+    attribute values (ISO dates and times, `str()` otherwise).
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Row],
+        *,
+        columns: Sequence[ColumnKey] | None = None,
+        formatters: Mapping[ColumnKey, CellFormatter] | None = None,
+        cell_attrs: Mapping[ColumnKey, Mapping[str, object]] | None = None,
+        cell_tag: str = "td",
+    ):
+        self._tag = ""
+        self._props = {}
+        self._rows: list[Row] = list(rows)
+        if columns is None:
+            columns = _default_columns(self._rows[0]) if self._rows else ()
+            if not self._rows:
+                # No rows to infer the columns from (an empty query result): there is nothing to
+                # format, so the per-column options are not checked against the empty columns.
+                formatters = cell_attrs = None
+        formatters = formatters or {}
+        cell_attrs = cell_attrs or {}
+        self._render_row = _row_renderer(columns, formatters, cell_attrs, cell_tag)
+        self._columns: tuple[ColumnKey, ...] = tuple(columns)
+        self._formatters = formatters
+        self._cell_attrs = cell_attrs
+        self._cell_tag = cell_tag
+        self._materialized: tuple[Child, ...] | None = None
+
+    @property
+    def _children(self) -> tuple[Child, ...]:
+        # The node tree is only needed for dict_/hash_/diff/pretty output; rendering skips it.
+        if self._materialized is None:
+            self._materialized = tuple(self._row_node(row) for row in self._rows)
+        return self._materialized
+
+    @_children.setter
+    def _children(self, value: tuple[Child, ...]) -> None:
+        self._materialized = value
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        return map(self._render_row, self._rows)
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        return self._row_tokens(minify, parent, following)
+
+    def _row_tokens(
+        self,
+        minify: MinifyOptions | None,
+        parent: str | None,
+        following: str | None | _Unknown,
+        render_node: Callable[[_HBase], Iterable[str]] | None = None,
+    ) -> Iterator[str]:
+        # `render_node` renders node cells, e.g. through a `TransformPipeline`.
+        render = _row_renderer(
+            self._columns, self._formatters, self._cell_attrs, self._cell_tag, minify, render_node
+        )
+        yield from map(render, self._rows)
+        if minify is not None and self._rows:
+            yield _last_row_end(minify, parent, following)
+
+    def _leading_tag(self) -> str | None | _Unknown:
+        return "tr" if self._rows else UNKNOWN
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def with_children(self, *children: Children) -> _HTableRows:
+        raise TypeError("table_rows nodes render from their row data; create a new one instead")
+
+    def __repr__(self) -> str:
+        return f"H.table_rows(<{len(self._rows)} rows>, columns={list(self._columns)!r})"
+
+    def _row_node(self, row: Row) -> _HBase:
+        cells = []
+        for key in self._columns:
+            value = row[key]  # type: ignore[index]
+            fmt = self._formatters.get(key)
+            if fmt is not None:
+                value = fmt(value)
+            child = _cell_child(value)
+            attrs = cast(dict[str, Any], self._cell_attrs.get(key) or {})
+            cells.append(_HBase(self._cell_tag, *([] if child is None else [child]), **attrs))
+        return _HBase("tr", *cells)
+
+
+def _row_renderer(
+    columns: Sequence[ColumnKey],
+    formatters: Mapping[ColumnKey, CellFormatter],
+    cell_attrs: Mapping[ColumnKey, Mapping[str, object]],
+    cell_tag: str,
+    minify: MinifyOptions | None = None,
+    render_node: Callable[[_HBase], Iterable[str]] | None = None,
+) -> Callable[[Row], str]:
+    """
+    Validate the column options and return a function rendering one row to `<tr>` markup.
+
+    When `minify` omits end tags, rows end without `</tr>`; see `_last_row_end`. Node cells are
+    rendered with `render_node` when given, with their own `to_token` otherwise.
+    """
+    unknown = (set(formatters) | set(cell_attrs)) - set(columns)
+    if unknown:
+        raise KeyError(f"Unknown columns: {sorted(map(str, unknown))}")
+    cells = tuple(
+        (key, _open_tag(cell_tag, cell_attrs.get(key), minify), formatters.get(key)) for key in columns
+    )
+    # Cells are always followed by another cell or the end of the row.
+    close = "" if minify is not None and minify.omit_end_tags else f"</{cell_tag}>"
+    row_end = "" if minify is not None and minify.omit_end_tags else "</tr>"
+    escape: Callable[[str], str] = _escape_text
+    if minify is not None and minify.collapse_whitespace:
+        escape = _escape_collapsed
+
+    def render(row: Row) -> str:
+        parts = ["<tr>"]
+        for key, open_tag, fmt in cells:
+            value = row[key]  # type: ignore[index]
+            if fmt is not None:
+                value = fmt(value)
+            parts.append(open_tag)
+            parts.append(escape(value) if type(value) is str else _cell_markup(value, minify, render_node))
+            parts.append(close)
+        parts.append(row_end)
+        return "".join(parts)
+
+    return render
+
+
+def _default_columns(row: Row) -> Sequence[ColumnKey]:
+    if isinstance(row, Mapping):
+        return list(row.keys())
+    return range(len(row))
+
+
+def _escape_collapsed(value: str) -> str:
+    return collapse_whitespace(_escape_text(value))
+
+
+def _last_row_end(minify: MinifyOptions, parent: str | None, following: str | None | _Unknown) -> str:
+    # Rows rendered with omitted end tags are followed by another row, except the last one.
+    if not minify.omit_end_tags or end_tag_omissible("tr", parent, following):
+        return ""
+    return "</tr>"
+
+
+def _open_tag(tag: str, attrs: Mapping[str, object] | None, minify: MinifyOptions | None = None) -> str:
+    if not attrs:
+        return f"<{tag}>"
+    # Build one real node so props go through the usual normalization and validation. Minified
+    # output may already have dropped the (optional) end tag.
+    markup = "".join(_HBase(tag, **cast(dict[str, Any], dict(attrs))).to_token(minify))
+    return markup.removesuffix(f"</{tag}>")
+
+
+def _cell_child(value: object) -> Child | None:
+    if value is None:
+        return None
+    if isinstance(value, (str, _HBase)):
+        return value
+    if hasattr(type(value), "__html__"):
+        return _markup_of(value)
+    return str(_to_html_value(value))
+
+
+def _cell_markup(
+    value: object,
+    minify: MinifyOptions | None = None,
+    render_node: Callable[[_HBase], Iterable[str]] | None = None,
+) -> str:
+    if value is None:
+        return ""
+    if _is_markup(value):
+        return value
+    if isinstance(value, str):
+        return _escape_text(value)
+    if isinstance(value, _HBase):
+        return "".join(value.to_token(minify) if render_node is None else render_node(value))
+    if hasattr(type(value), "__html__"):
+        return _markup_of(value)
+    return _escape_text(str(_to_html_value(value)))
+
+
+class TableColumn(NamedTuple):
+    """
+    One column of pre-rendered cell markup.
+
+    Attributes:
+        tag (str): Cell element name (`"td"` or `"th"`).
+        attrs (Mapping[str, object]): Props applied to every cell of the column.
+        cells (Sequence[str]): Escaped cell contents, one per row.
+        spans (Sequence[int] | None): Optional row span of each cell: 1 renders the cell normally,
+            n > 1 renders it with `rowspan=n`, and 0 omits it (it is covered by a span above).
+    """
+
+    tag: str
+    attrs: Mapping[str, object]
+    cells: Sequence[str]
+    spans: Sequence[int] | None = None
+
+
+class _HColumnRows(_HFragment):
+    """
+    Table rows assembled from columns of already escaped cell markup.
+
+    Rows are joined with one `str.join` per row while streaming; the equivalent node tree is only
+    built for `dict_`, `hash_`, `diff` and pretty output. Its cells hold the column markup as
+    `RAW_STR`, unless `cell_values` describes them: per column, None for escaped text, or the
+    formatted values, which become cell children as in `_HTableRows`.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[TableColumn],
+        cell_values: Sequence[Sequence[object] | None] | None = None,
+    ):
+        self._tag = ""
+        self._props = {}
+        lengths = {len(col.cells) for col in columns}
+        lengths.update(len(col.spans) for col in columns if col.spans is not None)
+        if len(lengths) > 1:
+            raise ValueError(f"All columns must have the same length: {sorted(lengths)}")
+        self._columns = tuple(columns)
+        self._row_count = lengths.pop() if lengths else 0
+        self._spanned = any(col.spans is not None for col in columns)
+        self._cell_values = cell_values
+        self._materialized: tuple[Child, ...] | None = None
+
+    @property
+    def _children(self) -> tuple[Child, ...]:
+        if self._materialized is None:
+            children: list[list[Child | None]]
+            if self._cell_values is None:
+                children = [list(map(_HBase.RAW_STR, col.cells)) for col in self._columns]
+            else:
+                children = [
+                    list(map(html.unescape, col.cells)) if values is None else list(map(_cell_child, values))
+                    for col, values in zip(self._columns, self._cell_values)
+                ]
+            self._materialized = tuple(
+                _HBase(
+                    "tr",
+                    *(
+                        cell
+                        for col, cells in zip(self._columns, children)
+                        if (cell := _column_cell(col, i, cells[i])) is not None
+                    ),
+                )
+                for i in range(self._row_count)
+            )
+        return self._materialized
+
+    @_children.setter
+    def _children(self, value: tuple[Child, ...]) -> None:
+        self._materialized = value
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        return self._rows(None)
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        yield from self._rows(minify)
+        if self._row_count:
+            yield _last_row_end(minify, parent, following)
+
+    def _leading_tag(self) -> str | None | _Unknown:
+        return "tr" if self._row_count else UNKNOWN
+
+    def _rows(self, minify: MinifyOptions | None) -> Iterator[str]:
+        omit = minify is not None and minify.omit_end_tags
+        row_end = "" if omit else "</tr>"
+        if not self._columns:
+            yield from ("<tr>" + row_end for _ in range(self._row_count))
+            return
+        if self._spanned:
+            # Cells covered by a row span are left out, so every cell carries its own tags.
+            for row in zip(*(_spanned_markup(col, minify) for col in self._columns)):
+                yield "<tr>" + "".join(row) + row_end
+            return
+        opens = [_open_tag(col.tag, col.attrs, minify) for col in self._columns]
+        closes = ["" if omit else f"</{col.tag}>" for col in self._columns]
+        seps = [closes[i - 1] + opens[i] for i in range(1, len(opens))]
+        prefix = "<tr>" + opens[0]
+        suffix = closes[-1] + row_end
+        cells = [col.cells for col in self._columns]
+        if len(set(seps)) <= 1:
+            sep = seps[0] if seps else ""
+            for row in zip(*cells):
+                yield prefix + sep.join(row) + suffix
+            return
+        # Mixed cell tags/attrs: fold the separators into every cell but the first.
+        wrapped = [cells[0]] + [[sep + c for c in col] for sep, col in zip(seps, cells[1:])]
+        for row in zip(*wrapped):
+            yield prefix + "".join(row) + suffix
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def with_children(self, *children: Children) -> _HColumnRows:
+        raise TypeError("table_columns nodes render from their column data; create a new one instead")
+
+    def __repr__(self) -> str:
+        return f"<table rows: {self._row_count} rows x {len(self._columns)} columns>"
+
+
+def _column_cell(col: TableColumn, i: int, child: Child | None) -> _HBase | None:
+    span = 1 if col.spans is None else col.spans[i]
+    if span == 0:
+        return None
+    attrs = cast(dict[str, Any], col.attrs)
+    if span > 1:
+        attrs = {**attrs, "rowspan": span}
+    return _HBase(col.tag, *([] if child is None else [child]), **attrs)
+
+
+def _spanned_markup(col: TableColumn, minify: MinifyOptions | None = None) -> list[str]:
+    close = "" if minify is not None and minify.omit_end_tags else f"</{col.tag}>"
+    if col.spans is None:
+        open_tag = _open_tag(col.tag, col.attrs, minify)
+        return [open_tag + cell + close for cell in col.cells]
+    opens: dict[int, str] = {}
+    markup = []
+    for cell, span in zip(col.cells, col.spans):
+        if span == 0:
+            markup.append("")
+            continue
+        if span not in opens:
+            attrs = {**col.attrs, "rowspan": span} if span > 1 else col.attrs
+            opens[span] = _open_tag(col.tag, attrs, minify)
+        markup.append(opens[span] + cell + close)
+    return markup
+
+
+def format_column(values: Iterable[object], formatter: CellFormatter | None = None) -> list[str]:
+    """
+    Format a column of raw values into escaped cell markup.
+
+    The whole column is converted in one pass chosen by its element type: numbers go through
+    `str()` without escaping, dates and times through the same ISO conversion as
+    `_to_html_value`, text is escaped in bulk, and anything else (None, `RAW_STR`, nodes, mixed
+    types) is rendered per cell like `H.td(value)`. `array.array`, `memoryview` and NumPy arrays
+    are converted with their own `tolist()`, so NumPy is never required; NumPy floats narrower or
+    wider than 64 bits, which `tolist()` would widen or round, are formatted element by element.
+
+    Args:
+        values (Iterable[object]): The column: a list, `array.array`, buffer, NumPy array, ...
+        formatter (CellFormatter | None): Callable applied to every value first.
+
+    Returns:
+        list[str]: Cell markup, one string per value.
+    """
+    return _format_column(values, formatter)[0]
+
+
+def _format_column(
+    values: Iterable[object], formatter: CellFormatter | None = None
+) -> tuple[list[str], list[object] | None]:
+    # `format_column`, also returning the formatted values of a column rendered per cell (None
+    # when every cell is escaped text).
+    dtype = getattr(values, "dtype", None)
+    kind = getattr(dtype, "kind", None)
+    # `str()` of these elements is the same after `tolist()` converts them to Python numbers.
+    exact = kind in ("i", "u", "b") or (kind == "f" and getattr(dtype, "itemsize", None) == 8)
+    if formatter is None:
+        if isinstance(values, array.array) and values.typecode not in "uwf":
+            return list(map(str, values)), None
+        if exact:
+            return list(map(str, cast(Any, values).tolist())), None
+        if kind == "M":
+            # Day (or coarser) units become dates, finer ones datetimes; NaT becomes None.
+            unit = "D" if str(dtype).endswith(("[D]", "[W]", "[M]", "[Y]")) else "us"
+            values = cast(Any, values).astype(f"datetime64[{unit}]")
+    if hasattr(values, "tolist") and (exact or kind != "f"):
+        items = cast(Any, values).tolist()
+    else:
+        items = values if isinstance(values, list) else list(values)
+    if formatter is not None:
+        items = list(map(formatter, items))
+
+    types = set(map(type, items))
+    if types <= {int, float}:
+        return list(map(str, items)), None
+    if types == {str}:
+        return escape_column(items), None
+    if types and all(issubclass(t, (date, time)) for t in types):
+        return [str(_to_html_value(v)) for v in items], None
+    return list(map(_cell_markup, items)), items
+
+
+def escape_column(cells: list[str]) -> list[str]:
+    """Escape a column of text, skipping the per-cell pass when nothing needs escaping."""
+    joined = "".join(cells)
+    if "&" not in joined and "<" not in joined and ">" not in joined:
+        return cells
+    return list(map(_escape_text, cells))
+
+
+class TableStream:
+    """
+    A `<table>` rendered incrementally from a lazily consumed source of rows.
+
+    Rows are pulled one at a time from any iterable (a `sqlite3` cursor, a generator) or async
+    iterable (an async database driver), rendered exactly like `H.table_rows`, and yielded in
+    chunks. The opening tag and header are yielded before the first row is fetched, and a chunk
+    is emitted whenever `flush_rows` rows or `flush_bytes` bytes of markup have accumulated, so
+    the browser receives the first rows immediately and memory use does not grow with the
+    number of rows. The rows themselves are never stored; a stream can be iterated once.
+
+    Iterate it with `for` or `async for` (for example as the body of a streaming response).
+    A stream over an async source is not `Iterable` and only supports `async for`. With `async
+    for`, a sync source (which may block on every row, like a DB cursor) is read in the default
+    executor, one chunk per call, so the event loop is never blocked by it.
+
+    Args:
+        rows (Iterable[Row] | AsyncIterable[Row]): The row source.
+        header (Sequence[object] | bool): Labels for a `<thead>` row. True takes the names from
+            the DB-API `description` of the source (e.g. a cursor after `execute()`).
+        columns, formatters, cell_attrs, cell_tag: As for `H.table_rows`. Without `columns`, the
+            columns are taken from the first row.
+        flush_rows (int): Maximum number of rows buffered before a chunk is emitted.
+        flush_bytes (int): Maximum UTF-8 size of the buffered markup before a chunk is emitted.
+        minify (MinifyOptions | None): Render the table minified (see `MinifyOptions`).
+        **props (object): Props for the `<table>` element.
+    """
+
+    def __new__(cls, rows: Iterable[Row] | AsyncIterable[Row], *args: Any, **kwargs: Any) -> TableStream:
+        if cls is TableStream and not isinstance(rows, Iterable):
+            cls = _AsyncTableStream
+        return super().__new__(cls)
+
+    def __init__(
+        self,
+        rows: Iterable[Row] | AsyncIterable[Row],
+        *,
+        header: Sequence[object] | bool = False,
+        columns: Sequence[ColumnKey] | None = None,
+        formatters: Mapping[ColumnKey, CellFormatter] | None = None,
+        cell_attrs: Mapping[ColumnKey, Mapping[str, object]] | None = None,
+        cell_tag: str = "td",
+        flush_rows: int = 100,
+        flush_bytes: int = 32 * 1024,
+        minify: MinifyOptions | None = None,
+        **props: object,
+    ):
+        if flush_rows < 1 or flush_bytes < 1:
+            raise ValueError("flush_rows and flush_bytes must be positive")
+        self._rows = rows
+        self._columns = columns
+        self._formatters = formatters or {}
+        self._cell_attrs = cell_attrs or {}
+        self._cell_tag = cell_tag
+        self._flush_rows = flush_rows
+        self._flush_bytes = flush_bytes
+        self._minify = minify
+        self._render_row: Callable[[Row], str] | None = None
+        if columns is not None:
+            self._render_row = _row_renderer(columns, self._formatters, self._cell_attrs, cell_tag, minify)
+        if header is True:
+            description = getattr(rows, "description", None)
+            if not description:
+                raise ValueError("header=True requires a source with a DB-API `description`")
+            header = [column[0] for column in description]
+        head = ""
+        if header:
+            thead = _HBase(
+                "thead", _HBase("tr", *(_HBase("th", _cell_child(label) or "") for label in header))
+            )
+            tokens = thead.to_token() if minify is None else thead._minified_tokens(minify, "table", "tbody")
+            head = "".join(tokens)
+        self._opening = _open_tag("table", props, minify) + head + "<tbody>"
+        # Rows are followed by the end of the <tbody>, whose own end tag is optional there.
+        self._closing = "</table>" if minify is not None and minify.omit_end_tags else "</tbody></table>"
+
+    def __iter__(self) -> Iterator[str]:
+        assert isinstance(self._rows, Iterable)
+        batch = _Batch(self._flush_rows, self._flush_bytes)
+        yield self._opening
+        for row in self._rows:
+            if batch.add(self._render(row)):
+                yield batch.flush()
+        yield batch.flush() + self._closing
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if not isinstance(self._rows, AsyncIterable):
+            async for chunk in self._executor_chunks():
+                yield chunk
+            return
+        batch = _Batch(self._flush_rows, self._flush_bytes)
+        yield self._opening
+        async for row in self._rows:
+            if batch.add(self._render(row)):
+                yield batch.flush()
+        yield batch.flush() + self._closing
+
+    async def _executor_chunks(self) -> AsyncIterator[str]:
+        chunks = cast(Generator[str, None, None], TableStream.__iter__(self))
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Future[str | None] | None = None
+        try:
+            while True:
+                pending = loop.run_in_executor(None, next, chunks, None)
+                # Shielded: a cancelled consumer must not lose track of the running call.
+                chunk = await asyncio.shield(pending)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            if pending is not None and not pending.done():
+                # An executor call cannot be interrupted; let it finish before closing the rows.
+                await asyncio.wait((pending,))
+            chunks.close()
+
+    def _render(self, row: Row) -> str:
+        if self._render_row is None:
+            columns = _default_columns(row)
+            self._render_row = _row_renderer(
+                columns, self._formatters, self._cell_attrs, self._cell_tag, self._minify
+            )
+        return self._render_row(row)
+
+
+class _AsyncTableStream(TableStream):
+    """A `TableStream` over an async source, which only supports `async for`."""
+
+    __iter__ = None  # type: ignore[assignment]
+
+
+class _Batch:
+    """Buffer of rendered rows that reports when it should be flushed."""
+
+    def __init__(self, max_rows: int, max_bytes: int):
+        self._parts: list[str] = []
+        self._size = 0
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+
+    def add(self, markup: str) -> bool:
+        self._parts.append(markup)
+        self._size += len(markup) if markup.isascii() else len(markup.encode())
+        return len(self._parts) >= self._max_rows or self._size >= self._max_bytes
+
+    def flush(self) -> str:
+        chunk = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return chunk
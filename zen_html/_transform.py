@@ -0,0 +1,399 @@
+"""
+_transform.py
+
+This module provides render-time rewrites. A `TransformPipeline` holds `Transformer`s that
+receive the elements of a tree as events while it is rendered (the start tag with its
+attributes, the text children, the end tag) and may change the attributes and text. The tree
+itself is neither copied nor rebuilt, so cross-cutting rewrites such as CDN URLs or
+`rel="noopener"` on external links cost one pass over the markup that is rendered anyway.
+
+Each transformer declares the tags it handles. The pipeline dispatches by tag, so elements no
+transformer asks for render as usual, without copying their attributes.
+
+Classes:
+    Transformer: Base class of render-time rewrites.
+    TransformPipeline: An ordered set of transformers, applied to the children it wraps.
+    PrefixURLs: Prefixes root-relative asset URLs, e.g. with a CDN origin.
+    ExternalLinkRel: Adds `rel` tokens such as `noopener` to links to other hosts.
+    LazyLoading: Adds `loading="lazy"` to images and iframes.
+    _HTransformed: Fragment-like node rendering its children through a pipeline.
+"""
+
+# Copyright (c) 2025 Yusuke KITAGAWA (tonosama_kaeru@icloud.com)
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Collection, Iterable, Iterator, Mapping, Sequence
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+from ._base import (
+    NONCE_TAGS,
+    VOID_TAGS,
+    Child,
+    Children,
+    _attr_markup,
+    _escape_text,
+    _HBase,
+    _HFragment,
+    _is_markup,
+    _nonce_attr,
+    _sibling_tag,
+)
+from ._deferred import _DeferredSlot, _HDeferred
+from ._minify import (
+    UNKNOWN,
+    WHITESPACE_PRESERVING,
+    MinifyOptions,
+    _Unknown,
+    collapse_whitespace,
+    end_tag_omissible,
+    unquoted_attr_ok,
+)
+from ._static import _HStatic, _render_static, _static_tokens
+from ._table import _HColumnRows, _HTableRows
+
+Attrs = dict[str, str | bool]
+
+# Attributes holding asset URLs that `PrefixURLs` rewrites by default.
+ASSET_URL_ATTRS: Mapping[str, tuple[str, ...]] = {
+    "img": ("src",),
+    "script": ("src",),
+    "link": ("href",),
+    "source": ("src",),
+    "video": ("src", "poster"),
+    "audio": ("src",),
+    "track": ("src",),
+    "embed": ("src",),
+    "input": ("src",),
+}
+
+# `rel` tokens of `<link>` elements that load assets; other links (canonical, alternate, next,
+# ...) point to pages and keep their URLs.
+ASSET_LINK_RELS: frozenset[str] = frozenset(
+    {"stylesheet", "preload", "prefetch", "modulepreload", "icon", "apple-touch-icon", "manifest"}
+)
+
+
+class Transformer:
+    """
+    Base class of render-time rewrites. Subclasses override any of `start`, `text` and `end`.
+
+    Transformers see the processed attributes (HTML names, normalized values) and are not
+    validated again. The markup of `H.static` children is transformed once per pipeline and
+    reused, so a transformer should give the same output for the same input.
+
+    Attributes:
+        tags (Collection[str] | None): The elements the transformer handles; None for all.
+            Elements outside every transformer's tags render without any overhead beyond a
+            dict lookup.
+    """
+
+    tags: Collection[str] | None = None
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        """
+        Rewrite the attributes of a start tag in place.
+
+        Args:
+            tag (str): The element's tag name.
+            attrs (Attrs): A copy of the element's attributes, in rendering order. Values are
+                strings (`H.RAW_STR` is not escaped) or True for boolean attributes; delete a
+                name or set it to False to leave the attribute out.
+        """
+
+    def text(self, parent: str, text: str) -> str:
+        """
+        Rewrite a text child of an element (`parent`) before it is escaped. Raw HTML is not
+        passed to transformers.
+        """
+        return text
+
+    def end(self, tag: str) -> None:
+        """Called after the children of an element have been rendered (also for void elements)."""
+
+
+class TransformPipeline:
+    """
+    Transformers applied, in order, while the children given to `apply` are rendered.
+
+    The pipeline works with every renderer: `to_token()` (plain and minified), `html_`,
+    `Document`, the compressors and HTTP responses, `write_html` and `astream_tokens` (which
+    also transforms loaded deferred content). Structural views (`dict_`, `hash_`, `diff`) show
+    the tree as built. A pipeline inside another one applies its own transformers first.
+
+    Args:
+        *transformers (Transformer): The rewrites, applied in this order to each element.
+    """
+
+    def __init__(self, *transformers: Transformer):
+        self.transformers = transformers
+        self._starts, self._start_any = _dispatch(transformers, "start")
+        self._texts, self._text_any = _dispatch(transformers, "text")
+        self._ends, self._end_any = _dispatch(transformers, "end")
+        # Weakly keyed, so pipelines created per request do not accumulate here.
+        self._nested: WeakKeyDictionary[TransformPipeline, TransformPipeline] = WeakKeyDictionary()
+
+    def apply(self, *_children: Children, children: Children | None = None) -> _HTransformed:
+        """
+        Wrap children so that they render through this pipeline.
+
+        Returns:
+            _HTransformed: A fragment-like node to render, or to place in a tree, instead of
+            the children.
+        """
+        return _HTransformed(self, *_children, children_kw=children)
+
+    def __repr__(self) -> str:
+        return f"TransformPipeline({', '.join(map(repr, self.transformers))})"
+
+    def _node_tokens(
+        self, node: _HBase, minify: MinifyOptions | None, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        if isinstance(node, _HFragment):
+            if isinstance(node, _HStatic):
+                return self._static_tokens(node, minify, parent)
+            if isinstance(node, _HTransformed):
+                return self._inner(node._pipeline)._children_tokens(node._children, minify, parent, following)
+            # Table rows render from their data unless a transformer handles their row or cell
+            # tags; only then is the row node tree built. Node cells still go through the pipeline.
+            if isinstance(node, _HTableRows) and not self._handles("tr", node._cell_tag):
+                cell_tag = node._cell_tag
+                return node._row_tokens(
+                    minify, parent, following, lambda cell: self._node_tokens(cell, minify, cell_tag, None)
+                )
+            if isinstance(node, _HColumnRows) and not self._handles(
+                "tr", *(col.tag for col in node._columns)
+            ):
+                return node.to_token() if minify is None else node._minified_tokens(minify, parent, following)
+            return self._children_tokens(node._children, minify, parent, following)
+        if isinstance(node, _HDeferred):
+            markup = "".join(self._element_tokens(node, minify, parent, following))
+            return (_DeferredSlot(markup, node, minify, self),)
+        return self._element_tokens(node, minify, parent, following)
+
+    def _element_tokens(
+        self, node: _HBase, minify: MinifyOptions | None, parent: str | None, following: str | None | _Unknown
+    ) -> Iterator[str]:
+        tag = node._tag
+        attrs = node._props
+        starts = self._starts.get(tag, self._start_any)
+        if starts:
+            attrs = dict(attrs)
+            for transformer in starts:
+                transformer.start(tag, attrs)
+        yield _start_tag(tag, attrs, minify)
+        if tag not in VOID_TAGS:
+            if minify is not None and minify.collapse_whitespace and tag in WHITESPACE_PRESERVING:
+                minify = replace(minify, collapse_whitespace=False)
+            yield from self._children_tokens(node._children, minify, tag, None)
+        for transformer in self._ends.get(tag, self._end_any):
+            transformer.end(tag)
+        if tag in VOID_TAGS:
+            return
+        if minify is None or not (minify.omit_end_tags and end_tag_omissible(tag, parent, following)):
+            yield f"</{tag}>"
+
+    def _children_tokens(
+        self,
+        children: Sequence[Child],
+        minify: MinifyOptions | None,
+        parent: str | None,
+        following: str | None | _Unknown,
+    ) -> Iterator[str]:
+        # `following` is the sibling after the last child, as in `_minified_children`.
+        texts = self._texts.get(parent, self._text_any) if parent else self._text_any
+        last = len(children) - 1
+        for i, child in enumerate(children):
+            if _is_markup(child):
+                yield child
+            elif isinstance(child, str):
+                for transformer in texts:
+                    child = transformer.text(parent or "", child)
+                text = _escape_text(child)
+                yield collapse_whitespace(text) if minify is not None and minify.collapse_whitespace else text
+            else:
+                next_tag = _sibling_tag(children[i + 1]) if i < last else following
+                yield from self._node_tokens(child, minify, parent, next_tag)
+
+    def _static_tokens(
+        self, node: _HStatic, minify: MinifyOptions | None, parent: str | None
+    ) -> Iterable[str]:
+        # Cached on the node per pipeline, like its untransformed markup. The node keys the
+        # pipeline weakly, so the entries go away with the pipeline.
+        cache = node._transformed.get(self)
+        if cache is None:
+            cache = node._transformed.setdefault(self, {})
+        key = (minify, parent)
+        html = cache.get(key)
+        if html is None:
+            following = None if minify is None else UNKNOWN
+            html = _render_static(
+                lambda: "".join(self._children_tokens(node._children, minify, parent, following))
+            )
+            cache[key] = html
+        return _static_tokens(html)
+
+    def _handles(self, *tags: str) -> bool:
+        return any(
+            self._starts.get(tag, self._start_any)
+            or self._texts.get(tag, self._text_any)
+            or self._ends.get(tag, self._end_any)
+            for tag in tags
+        )
+
+    def _inner(self, pipeline: TransformPipeline) -> TransformPipeline:
+        combined = self._nested.get(pipeline)
+        if combined is None:
+            combined = self._nested[pipeline] = TransformPipeline(*pipeline.transformers, *self.transformers)
+        return combined
+
+
+class _HTransformed(_HFragment):
+    """
+    Children rendered through a `TransformPipeline`; see `TransformPipeline.apply`.
+
+    Like `H.static`, the node is not spliced into its parent, and it behaves like a fragment for
+    `dict_`, `hash_`, `diff` and the pretty printers.
+    """
+
+    def __init__(self, pipeline: TransformPipeline, *children: Children, children_kw: Children | None = None):
+        super().__init__(*children, children_kw=children_kw)
+        self._pipeline = pipeline
+
+    def to_token(self, minify: MinifyOptions | None = None) -> Iterable[str]:
+        if minify is not None:
+            return self._minified_tokens(minify, None, UNKNOWN)
+        return self._pipeline._children_tokens(self._children, None, None, None)
+
+    def _minified_tokens(
+        self, minify: MinifyOptions, parent: str | None, following: str | None | _Unknown
+    ) -> Iterable[str]:
+        return self._pipeline._children_tokens(self._children, minify, parent, following)
+
+    def __repr__(self) -> str:
+        return f"{self._pipeline!r}.apply(children={self._children!r})"
+
+
+class PrefixURLs(Transformer):
+    """
+    Prefix root-relative URLs (`/static/app.css`) in asset attributes, e.g. with a CDN origin.
+
+    Relative URLs, protocol-relative ones (`//host/...`) and absolute URLs are left alone, and so
+    are `<link>` elements that do not load an asset (`rel="canonical"`, `"alternate"`, ...).
+
+    Args:
+        prefix (str): Prepended to each matching URL; a trailing slash is dropped.
+        attrs (Mapping[str, Sequence[str]]): Attributes to rewrite per tag. Defaults to
+            `ASSET_URL_ATTRS`.
+        link_rels (Collection[str]): `rel` tokens of the `<link>` elements to rewrite. Defaults
+            to `ASSET_LINK_RELS`.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        attrs: Mapping[str, Sequence[str]] = ASSET_URL_ATTRS,
+        link_rels: Collection[str] = ASSET_LINK_RELS,
+    ):
+        self.prefix = prefix.rstrip("/")
+        self.attrs = dict(attrs)
+        self.link_rels = frozenset(rel.lower() for rel in link_rels)
+        self.tags = frozenset(self.attrs)
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        if tag == "link":
+            rel = attrs.get("rel")
+            if not isinstance(rel, str) or self.link_rels.isdisjoint(rel.lower().split()):
+                return
+        for name in self.attrs[tag]:
+            value = attrs.get(name)
+            if isinstance(value, str) and value.startswith("/") and not value.startswith("//"):
+                prefixed = self.prefix + value
+                attrs[name] = _HBase.RAW_STR(prefixed) if _is_markup(value) else prefixed
+
+    def __repr__(self) -> str:
+        return f"PrefixURLs({self.prefix!r})"
+
+
+class ExternalLinkRel(Transformer):
+    """
+    Add `rel` tokens to links whose `href` points to another host.
+
+    Args:
+        rel (str): Space-separated tokens to add; existing tokens are kept.
+        hosts (Collection[str]): Host names of the site itself, whose links are left alone.
+        tags (Collection[str]): The link elements to handle.
+    """
+
+    def __init__(
+        self, rel: str = "noopener", *, hosts: Collection[str] = (), tags: Collection[str] = ("a", "area")
+    ):
+        self.rel = rel.split()
+        self.hosts = frozenset(host.lower() for host in hosts)
+        self.tags = frozenset(tags)
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        href = attrs.get("href")
+        if not isinstance(href, str) or not href.startswith(("http:", "https:", "//")):
+            return
+        host = urlsplit(href).hostname
+        if not host or host in self.hosts:
+            return
+        current = attrs.get("rel")
+        tokens = current.split() if isinstance(current, str) else []
+        missing = [token for token in self.rel if token not in tokens]
+        if missing:
+            attrs["rel"] = " ".join(tokens + missing)
+
+    def __repr__(self) -> str:
+        return f"ExternalLinkRel({' '.join(self.rel)!r}, hosts={sorted(self.hosts)!r})"
+
+
+class LazyLoading(Transformer):
+    """
+    Add `loading="lazy"` to elements that do not set `loading` themselves.
+
+    Args:
+        tags (Collection[str]): The elements to handle.
+    """
+
+    def __init__(self, tags: Collection[str] = ("img", "iframe")):
+        self.tags = frozenset(tags)
+
+    def start(self, tag: str, attrs: Attrs) -> None:
+        attrs.setdefault("loading", "lazy")
+
+    def __repr__(self) -> str:
+        return f"LazyLoading({sorted(self.tags or ())!r})"
+
+
+def _dispatch(
+    transformers: Sequence[Transformer], event: str
+) -> tuple[dict[str, tuple[Transformer, ...]], tuple[Transformer, ...]]:
+    # Per tag, the transformers overriding `event` that handle the tag, in pipeline order, and
+    # those handling every tag (used for the tags missing from the dict).
+    handling = [t for t in transformers if getattr(type(t), event) is not getattr(Transformer, event)]
+    tags = {tag for t in handling if t.tags is not None for tag in t.tags}
+    by_tag = {tag: tuple(t for t in handling if t.tags is None or tag in t.tags) for tag in tags}
+    return by_tag, tuple(t for t in handling if t.tags is None)
+
+
+def _start_tag(tag: str, attrs: Mapping[str, str | bool], minify: MinifyOptions | None) -> str:
+    parts = [f"<{tag}"]
+    for k, v in attrs.items():
+        if v is True:
+            parts.append(f" {k}")
+            continue
+        if v is False or v is None:
+            continue
+        escaped = _attr_markup(v)
+        if minify is not None and minify.unquoted_attrs and unquoted_attr_ok(escaped):
+            parts.append(f" {k}={escaped}")
+        else:
+            parts.append(f" {k}='{escaped}'")
+    if tag in NONCE_TAGS:
+        parts.append(_nonce_attr(attrs))
+    parts.append("/>" if minify is None and tag in VOID_TAGS else ">")
+    return "".join(parts)